@@ -1,15 +1,27 @@
+import datetime
+import os
+
 from django.contrib import messages
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import Group
+from django.core.exceptions import PermissionDenied
 from django.db.models import Q
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
 from django.utils.html import format_html
 from django.utils.text import capfirst, format_lazy
 from django.utils.translation import gettext_lazy as _
 from django.utils.translation import ngettext_lazy
 
+from apps.employees import reports
+from apps.employees.models import Employee
+from apps.extras import counters
+from apps.extras.models import Job
 from base.options import admin
-from base.options.decorators import as_html
+from base.options.decorators import as_html, run_as_job
 
+from . import photos
 from .models import User
 
 
@@ -23,16 +35,12 @@ class MissingDataFilter(admin.SimpleListFilter):
         """Return the filter lookups."""
         return [(True, _("Tak")), (False, _("Nie"))]
 
-    def queryset(self, request, queryset):
-        """Update the changelist queryset based on the filter lookup selected."""
-        if (value := self.value()) in ["True", "False"]:
-            checked_fields, lookup = ["first_name", "last_name", "email"], Q()
-            for field in checked_fields:
-                lookup = lookup | Q(**{f"{field}__exact": ""})
-            if value == "True":
-                return queryset.filter(lookup)
-            else:
-                return queryset.exclude(lookup)
+    def get_lookup_q(self, value):
+        """Return the Q object of the lookup value, None if not filtering."""
+        checked_fields, lookup = ["first_name", "last_name", "email"], Q()
+        for field in checked_fields:
+            lookup = lookup | Q(**{f"{field}__exact": ""})
+        return {"True": lookup, "False": ~lookup}.get(value)
 
 
 class HasPhotoFilter(admin.SimpleListFilter):
@@ -45,13 +53,10 @@ class HasPhotoFilter(admin.SimpleListFilter):
         """Return the filter lookups."""
         return [(True, _("Tak")), (False, _("Nie"))]
 
-    def queryset(self, request, queryset):
-        """Update the changelist queryset based on the filter lookup selected."""
-        if (value := self.value()) in ["True", "False"]:
-            if value == "True":
-                return queryset.exclude(photo__exact="")
-            else:
-                return queryset.filter(photo__exact="")
+    def get_lookup_q(self, value):
+        """Return the Q object of the lookup value, None if not filtering."""
+        lookup = Q(photo__exact="")
+        return {"True": ~lookup, "False": lookup}.get(value)
 
 
 @admin.register(User)
@@ -118,7 +123,12 @@ class UserAdmin(admin.ModelAdmin, UserAdmin):
         HasPhotoFilter,
     )
     list_editable = ("is_active", "is_staff", "is_superuser")
-    actions = ("activate_selected", "deactivate_selected", "delete_photo_of_selected")
+    actions = (
+        "activate_selected",
+        "deactivate_selected",
+        "delete_photo_of_selected",
+        "generate_report_of_selected",
+    )
 
     @admin.display(description=_("Nazwisko i imiona"))
     def full_name(self, obj):
@@ -141,6 +151,7 @@ class UserAdmin(admin.ModelAdmin, UserAdmin):
     def activate_selected(self, request, queryset):
         """Activate selected users."""
         queryset.filter(is_active=False).update(is_active=True)
+        counters.bump(User)
 
         self.message_user(
             request,
@@ -176,6 +187,7 @@ class UserAdmin(admin.ModelAdmin, UserAdmin):
                 )
             else:
                 queryset.filter(is_superuser=False).update(is_active=False)
+                counters.bump(User)
 
                 self.message_user(
                     request,
@@ -197,6 +209,7 @@ class UserAdmin(admin.ModelAdmin, UserAdmin):
                 )
         else:
             queryset.update(is_active=False)
+            counters.bump(User)
 
             self.message_user(
                 request,
@@ -211,16 +224,15 @@ class UserAdmin(admin.ModelAdmin, UserAdmin):
     @admin.action(description=_("Usuń zdjęcia wybranych użytkowników"))
     def delete_photo_of_selected(self, request, queryset):
         """Delete photo files of the selected users."""
-        users_with_photo = queryset.exclude(photo__exact="")
-
-        for user in users_with_photo:
-            user.photo = None  # icon is removed automatically by the post_save signal
-            user.save()
-
-        if users_with_photo.exists():
+        if count := photos.delete_photos(queryset):
             self.message_user(
                 request,
-                message=_("Usunięto zdjęcia wybranych użytkowników."),
+                message=ngettext_lazy(
+                    "Usunięto zdjęcie %d użytkownika.",
+                    "Usunięto zdjęcia %d użytkowników.",
+                    count,
+                )
+                % count,
                 level=messages.SUCCESS,
             )
         else:
@@ -230,6 +242,60 @@ class UserAdmin(admin.ModelAdmin, UserAdmin):
                 level=messages.WARNING,
             )
 
+    @admin.action(description=_("Generuj sprawozdania roczne wybranych użytkowników"))
+    @run_as_job
+    def generate_report_of_selected(self, request, queryset):
+        """Add the previous year reports of the selected users to the job's archive."""
+        employees = Employee.objects.filter(user__in=queryset)
+
+        if not employees.exists():
+            self.message_user(
+                request,
+                message=_("Wybrani użytkownicy nie są powiązani z pracownikami."),
+                level=messages.WARNING,
+            )
+            return None
+
+        year = datetime.date.today().year - 1
+        path = reports.archive_path(request.job.pk)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        reports.generate(year, path, employees, mode="a")
+
+        self.message_user(
+            request,
+            message=_("Wygenerowano sprawozdania za rok %d.") % year,
+            level=messages.SUCCESS,
+        )
+
+    def get_urls(self):
+        """Override the base class method."""
+        return [
+            path(
+                "reports/<int:job_id>/",
+                view=self.admin_site.admin_view(self.reports_view),
+                name="accounts_user_reports",
+            ),
+        ] + super().get_urls()
+
+    def get_job_result_url(self, job):
+        """Override the base class method."""
+        if job.action == "generate_report_of_selected":
+            return reverse("admin:accounts_user_reports", args=[job.pk])
+        return None
+
+    def reports_view(self, request, job_id):
+        """A view to download the archive of the reports generated by the job."""
+        job = get_object_or_404(Job, pk=job_id, action="generate_report_of_selected")
+        if job.user_id != request.user.pk and not request.user.is_superuser:
+            raise PermissionDenied
+        try:
+            file = open(reports.archive_path(job.pk), "rb")
+        except FileNotFoundError:
+            raise Http404(_("Archiwum sprawozdań zostało już usunięte."))
+        return FileResponse(
+            file, as_attachment=True, filename=f"sprawozdania-{job.pk}.zip"
+        )
+
 
 # Grouping users is not relevant for the project, therefore the built-in
 # django.contrib.auth.models.Group model is unregistered from the admin site.
@@ -0,0 +1,87 @@
+"""Authentication backend caching the users' permissions across the requests.
+
+Django's model backend reads the permissions of the user (and of the user's
+groups) once per request, and the admin checks them for each of the models on
+every page. Here, the set of the permissions is kept in the shared cache, keyed
+by the user and by the versions of the user's and of all the permissions, so
+that it is read from the database only once changed.
+
+The version of the user is incremented when the user's permissions, groups or
+flags change, and the global one when those of the groups or the permissions
+themselves do (see the `signals` module). The versions are incremented once the
+transaction commits, so that no outdated permissions are cached again.
+
+The versions are of use only if all the processes share them, so with a cache
+kept in the memory of each process (e.g. the default `LocMemCache`) the
+permissions are read from the database, as the model backend does.
+"""
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from base.options.transaction import CommitBuffer
+
+CACHE_KEY = "accounts:permissions:{user_id}:{version}:{user_version}"
+VERSION_CACHE_KEY = "accounts:permissions:version"
+USER_VERSION_CACHE_KEY = "accounts:permissions:version:{user_id}"
+
+
+class CachedPermissionsBackend(ModelBackend):
+    """A class to represent the model backend with the permissions cached."""
+
+    def get_all_permissions(self, user_obj, obj=None):
+        """Override the base class method."""
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not is_cache_shared():
+            return super().get_all_permissions(user_obj)
+
+        # The permissions are kept on the user for the rest of the request too
+        if not hasattr(user_obj, "_perm_cache"):
+            version_key = USER_VERSION_CACHE_KEY.format(user_id=user_obj.pk)
+            versions = cache.get_many([VERSION_CACHE_KEY, version_key])
+            key = CACHE_KEY.format(
+                user_id=user_obj.pk,
+                version=versions.get(VERSION_CACHE_KEY, 0),
+                user_version=versions.get(version_key, 0),
+            )
+            if (permissions := cache.get(key)) is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, permissions, settings.PERMISSIONS_CACHE_TIMEOUT)
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
+
+
+def is_cache_shared():
+    """Check if the cache is shared by the processes (not kept by each one)."""
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def _increment(key):
+    """Increment the version stored under the key."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def _invalidate(pending):
+    """Increment the versions of the users and the global one, as pending."""
+    if pending.get(None):
+        _increment(VERSION_CACHE_KEY)
+    for user_id in pending.get("users", ()):
+        _increment(USER_VERSION_CACHE_KEY.format(user_id=user_id))
+
+
+_buffer = CommitBuffer(_invalidate)
+
+
+def invalidate(user_ids=None):
+    """Mark the permissions of the users (or of all the users) outdated."""
+    if user_ids is None:
+        _buffer.add(None, [True])
+    else:
+        _buffer.add("users", user_ids)
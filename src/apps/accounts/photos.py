@@ -0,0 +1,120 @@
+"""Processing of the users' photos and icons, including bulk operations."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.db.models import Q
+
+from apps.extras import counters
+from base.options import transaction
+from base.utils import chunked
+
+from PIL import Image
+
+from .models import USER_ICON_SIZE, USER_PHOTO_SIZE, User, icon_upload_path
+
+# Number of the threads removing the files from the storage
+DELETE_WORKERS = 8
+
+
+def crop_box(size):
+    """Return the box of the largest centered square within the image size."""
+    width, height = size
+    if height > width:  # portrait
+        return (0, int((height - width) / 2), width, int((height + width) / 2))
+    elif height < width:  # landscape
+        return (int((width - height) / 2), 0, int((width + height) / 2), height)
+    return (0, 0, width, height)
+
+
+def process_photo(path):
+    """Crop and resize the photo file in place, unless already processed."""
+    with Image.open(path) as photo:
+        if photo.size == USER_PHOTO_SIZE:
+            return None
+
+        # Crop & resize, then overwrite the original photo
+        with photo.crop(crop_box(photo.size)).resize(USER_PHOTO_SIZE) as new_photo:
+            new_photo.save(path, format=photo.format)
+
+
+def render_icon(path):
+    """Return the content of the icon made of the photo file."""
+    with Image.open(path) as photo:
+        with photo.resize(size=USER_ICON_SIZE) as icon, BytesIO() as icon_file:
+            icon.save(icon_file, format=photo.format)
+            return icon_file.getvalue()
+
+
+def reprocess(job):
+    """Process the photo and (re)write its icon; return the job's result.
+
+    The job is a tuple of the user's PK, the photo and icon paths and the name
+    of the icon to create, if the user has none. The result is a tuple of the
+    user's PK, the name of the icon created (if any) and the error (if any).
+    """
+    pk, photo_path, icon_path, icon_name = job
+    try:
+        process_photo(photo_path)
+        icon = render_icon(photo_path)
+        os.makedirs(os.path.dirname(icon_path), exist_ok=True)
+        with open(icon_path, "wb") as file:
+            file.write(icon)
+    except OSError as error:
+        return pk, None, str(error)
+    return pk, icon_name, None
+
+
+def reprocess_jobs(rows, storage=None):
+    """Return the reprocessing jobs of the (PK, photo, icon) rows of the users."""
+    storage = storage or User._meta.get_field("photo").storage
+    names = set()
+    for pk, photo, icon in rows:
+        icon_name = None
+        if not icon:
+            # Unique among both the files stored and the icons of the other jobs
+            icon_name = storage.get_available_name(
+                storage.generate_filename(icon_upload_path(None, photo))
+            )
+            while icon_name in names:
+                icon_name = storage.get_available_name(
+                    storage.get_alternative_name(*os.path.splitext(icon_name))
+                )
+            names.add(icon_name)
+        yield pk, storage.path(photo), storage.path(icon or icon_name), icon_name
+
+
+def delete_files(names, storage=None):
+    """Delete the files from the storage, in parallel."""
+    storage = storage or User._meta.get_field("photo").storage
+    with ThreadPoolExecutor(DELETE_WORKERS) as executor:
+        # Consume the results to raise the exceptions, if any
+        list(executor.map(storage.delete, filter(None, names)))
+
+
+def delete_photos(queryset, batch_size=1000):
+    """Remove the photos and icons of the users; return the number of users.
+
+    The fields are cleared with a single UPDATE per batch of users, with no
+    signals sent; the files are deleted once the transaction commits.
+    """
+    rows = list(
+        queryset.exclude(
+            (Q(photo="") | Q(photo__isnull=True)) & (Q(icon="") | Q(icon__isnull=True))
+        )
+        .order_by()
+        .values_list("pk", "photo", "icon")
+    )
+
+    count, names = 0, []
+    with transaction.atomic():
+        for batch in chunked(rows, batch_size):
+            count += User.objects.filter(pk__in=[pk for pk, *_ in batch]).update(
+                photo=None, icon=None
+            )
+            names += [name for _, *files in batch for name in files]
+        transaction.on_commit(lambda: delete_files(names))
+        counters.bump(User)
+
+    return count
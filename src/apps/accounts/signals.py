@@ -1,61 +1,77 @@
-from io import BytesIO
-
+from django.contrib.auth.models import Group, Permission
 from django.core.files.base import ContentFile
 from django.db.models import signals
 from django.dispatch import receiver
 
-from PIL import Image
+from base.options.decorators import bulk_receiver
 
-from .models import USER_ICON_SIZE, USER_PHOTO_SIZE, User
+from . import backends, photos
+from .models import User
 
 
 @receiver(signals.post_save, sender=User)
 def post_process_user_photo(sender, instance, **kwargs):
     """Post process the user photo."""
-    if not instance.photo:
+    if not instance.photo or not instance.has_changed("photo"):
         return None
 
-    with Image.open(instance.photo.path) as photo:
-        # Determine the cropping area coordinates depending on the photo shape
-        width, height = photo.size
-        if height > width:  # portrait
-            box = (0, int((height - width) / 2), width, int((height + width) / 2))
-        elif height < width:  # landscape
-            box = (int((width - height) / 2), 0, int((width + height) / 2), height)
-        else:
-            box = (0, 0, width, height)
-
-        # Crop & resize, then overwrite the original photo
-        with photo.crop(box).resize(USER_PHOTO_SIZE) as new_photo:
-            new_photo.save(instance.photo.path)
+    photos.process_photo(instance.photo.path)
 
 
 @receiver(signals.post_save, sender=User)
 def create_user_icon(sender, instance, **kwargs):
     """Create and save the user icon."""
+    if not instance.has_changed("photo", "icon"):
+        return None
+
     if instance.photo:
         if instance.icon:
+            # Note that instance has been just saved within post_save signal.
+            # Therefore, do nothing if the icon field has been already
+            # populated. Otherwise, RecursionError is raised.
             return None
 
-        with Image.open(instance.photo.path) as photo:
-            icon = photo.resize(size=USER_ICON_SIZE)
-
-            with BytesIO() as icon_file:
-                icon.save(icon_file, format=photo.format)
-                icon_file.seek(0)
-
-                if not instance.icon:
-                    instance.icon.save(
-                        instance.photo.name,  # only to retrieve the file extension
-                        ContentFile(icon_file.read()),
-                        save=True,
-                    )
-                else:
-                    # Note that instance has been just saved within post_save
-                    # signal. Therefore, do nothing if the icon field has been
-                    # already populated. Otherwise, RecursionError is raised.
-                    pass
+        instance.icon.save(
+            instance.photo.name,  # only to retrieve the file extension
+            ContentFile(photos.render_icon(instance.photo.path)),
+            save=True,
+        )
     else:
         # If there is no photo but icon, remove the icon file as well
         if instance.icon:
             instance.icon.delete(save=True)
+
+
+@receiver(signals.post_save, sender=User)
+def invalidate_user_permissions(sender, instance, **kwargs):
+    """Mark the permissions of the user outdated if the flags have changed."""
+    if instance.has_changed("is_active", "is_staff", "is_superuser"):
+        backends.invalidate([instance.pk])
+
+
+@receiver(signals.m2m_changed, sender=User.groups.through)
+@receiver(signals.m2m_changed, sender=User.user_permissions.through)
+def invalidate_member_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """Mark the permissions of the users whose groups or permissions changed."""
+    if not action.startswith("post_"):
+        return None
+
+    if not reverse:
+        backends.invalidate([instance.pk])
+    elif pk_set is not None:
+        backends.invalidate(pk_set)
+    else:
+        # The relations of the group or the permission cleared
+        backends.invalidate()
+
+
+@receiver(signals.m2m_changed, sender=Group.permissions.through)
+@receiver(signals.post_save, sender=Permission)
+@receiver(signals.post_delete, sender=Permission)
+@receiver(signals.post_delete, sender=Group)
+@receiver(signals.post_migrate)
+@bulk_receiver
+def invalidate_permissions(sender, **kwargs):
+    """Mark the permissions of all the users outdated."""
+    if kwargs.get("action", "post_").startswith("post_"):
+        backends.invalidate()
@@ -1,3 +1,10 @@
+from django.urls import path
+
+from . import views
+
 app_name = "accounts"
 
-urlpatterns = []
+urlpatterns = [
+    path("api/users/", views.UserApiView.as_view(), name="user_list"),
+    path("api/users/<int:pk>/", views.UserApiView.as_view(), name="user_detail"),
+]
@@ -0,0 +1,27 @@
+from apps.employees.models import Employee
+from base.options.views import ApiView
+
+from .models import User
+
+
+class UserApiView(ApiView):
+    """JSON API of the User objects."""
+
+    model = User
+    fields = (
+        "id",
+        "username",
+        "first_name",
+        "last_name",
+        "email",
+        "slug",
+        "sex",
+        "is_active",
+        "employee",
+    )
+    filters = ("is_active",)
+
+    def get_models(self):
+        """Override the base class method."""
+        # The users' employees are listed by their PKs, set on the employees
+        return super().get_models() + [Employee]
@@ -0,0 +1,20 @@
+from base.options import admin
+
+from .models import Employee, Employment
+
+
+@admin.register(Employee)
+class EmployeeAdmin(admin.ModelAdmin):
+    """Admin options and functionalities for the Employee model."""
+
+    class EmploymentInline(admin.TabularInline):
+        model = Employment
+        autocomplete_fields = ("department",)
+        extra = 1
+
+    inlines = (EmploymentInline,)
+
+    list_display = ("last_name", "first_name", "user", "hr_id", "is_active")
+    list_filter = ("is_active",)
+    search_fields = ("last_name", "first_name", "user__username", "hr_id")
+    autocomplete_fields = ("user",)
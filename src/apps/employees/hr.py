@@ -0,0 +1,234 @@
+"""Incremental synchronization of the employees with the HR system exports.
+
+The export lists all the employees currently employed, one per row. Each row is
+reduced to a content hash compared against the hash stored at the last sync, so
+only the employees added, changed or missing from the export are written to the
+database, in bulk. An unchanged export ends up with no writes at all.
+"""
+
+import datetime
+import hashlib
+from collections import namedtuple
+
+from apps.extras import counters
+from apps.units.models import Department
+from base.options import transaction
+from base.utils import chunked, csv_reader
+
+from .models import Employee, Employment
+
+# Accepted names of the CSV columns (lower-cased)
+CSV_COLUMNS = {
+    "hr_id": "hr_id",
+    "id": "hr_id",
+    "identyfikator": "hr_id",
+    "first_name": "first_name",
+    "imiona": "first_name",
+    "imię": "first_name",
+    "last_name": "last_name",
+    "nazwisko": "last_name",
+    "department": "department",
+    "jednostka": "department",
+    "katedra": "department",
+    "position": "position",
+    "stanowisko": "position",
+}
+
+FIELDS = ("first_name", "last_name", "department", "position")
+
+Changes = namedtuple(
+    "Changes", ["created", "updated", "terminated", "unchanged", "skipped"]
+)
+
+
+def read_csv(path):
+    """Generate the employee records read from the HR export CSV file."""
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv_reader(file)
+        columns = [CSV_COLUMNS.get(name.strip().lower()) for name in next(reader, [])]
+        for row in reader:
+            yield {
+                column: " ".join(value.split())
+                for column, value in zip(columns, row)
+                if column is not None
+            }
+
+
+def record_hash(record):
+    """Return the content hash of the employee record."""
+    return hashlib.sha1(
+        "\x1f".join(record.get(field, "") for field in FIELDS).encode()
+    ).hexdigest()
+
+
+def department_paths():
+    """Return a dict mapping the departments' full abbreviations to their PKs."""
+    return {
+        "/".join(abbrs).casefold(): pk
+        for pk, *abbrs in Department.objects.values_list(
+            "pk", "ancestor__ancestor__abbr", "ancestor__abbr", "abbr"
+        )
+    }
+
+
+class Sync:
+    """A class to represent a single sync of the employees with the HR export."""
+
+    def __init__(self, date=None):
+        """Overwrite the base constructor."""
+        self.date = date or datetime.date.today()
+        self.departments = department_paths()
+        self.existing = {
+            hr_id: (pk, hr_hash, is_active)
+            for hr_id, pk, hr_hash, is_active in Employee.objects.filter(
+                hr_id__isnull=False
+            ).values_list("hr_id", "pk", "hr_hash", "is_active")
+        }
+        self.created, self.updated, self.skipped = {}, {}, []
+        self.seen = set()
+        self.unchanged = 0
+
+    def feed(self, records):
+        """Compare the records of the export with the state of the last sync."""
+        for record in records:
+            if not (hr_id := record.get("hr_id")) or hr_id in self.seen:
+                continue
+            self.seen.add(hr_id)
+
+            pk, hr_hash, is_active = self.existing.get(hr_id, (None, None, False))
+            digest = record_hash(record)
+            if is_active and hr_hash == digest:
+                self.unchanged += 1
+                continue
+
+            department = self.departments.get(record.get("department", "").casefold())
+            if department is None:
+                self.skipped.append(hr_id)
+                continue
+
+            record = {**record, "department": department, "hr_hash": digest}
+            (self.created if pk is None else self.updated)[hr_id] = (pk, record)
+
+    @property
+    def terminated(self):
+        """Return the PKs of the active employees missing from the export."""
+        return [
+            pk
+            for hr_id, (pk, _, is_active) in self.existing.items()
+            if is_active and hr_id not in self.seen
+        ]
+
+    def changes(self):
+        """Return the counts of the changes found."""
+        return Changes(
+            len(self.created),
+            len(self.updated),
+            len(self.terminated),
+            self.unchanged,
+            len(self.skipped),
+        )
+
+    def apply(self, batch_size=1000):
+        """Write the changes found to the database; return their counts."""
+        changes = self.changes()
+        if not any(changes[:3]):
+            return changes
+
+        with transaction.atomic():
+            Employee.objects.bulk_create(
+                [
+                    Employee(
+                        hr_id=hr_id,
+                        hr_hash=record["hr_hash"],
+                        first_name=record.get("first_name", ""),
+                        last_name=record.get("last_name", ""),
+                    )
+                    for hr_id, (_, record) in self.created.items()
+                ],
+                batch_size=batch_size,
+            )
+            Employee.objects.bulk_update(
+                [
+                    Employee(
+                        pk=pk,
+                        hr_hash=record["hr_hash"],
+                        first_name=record.get("first_name", ""),
+                        last_name=record.get("last_name", ""),
+                        is_active=True,
+                    )
+                    for pk, record in self.updated.values()
+                ],
+                ["hr_hash", "first_name", "last_name", "is_active"],
+                batch_size=batch_size,
+            )
+            for batch in chunked(self.terminated, batch_size):
+                Employee.objects.filter(pk__in=batch).update(
+                    is_active=False, hr_hash=""
+                )
+
+            # Employments: the new employees start theirs on the sync date; the
+            # changed ones do if their department or position has changed. The
+            # PKs of the new employees are read back, as not every database
+            # returns them from the bulk insert (e.g. MySQL)
+            records = {}
+            for batch in chunked(self.created, batch_size):
+                records.update(
+                    {
+                        pk: self.created[hr_id][1]
+                        for hr_id, pk in Employee.objects.filter(
+                            hr_id__in=batch
+                        ).values_list("hr_id", "pk")
+                    }
+                )
+            closed = list(self.terminated)
+            for batch in chunked(self.updated.values(), batch_size):
+                batch = dict(batch)
+                current = {
+                    employee: (department, position)
+                    for employee, department, position in Employment.objects.filter(
+                        employee__in=batch, end_date__isnull=True
+                    ).values_list("employee", "department", "position")
+                }
+                for pk, record in batch.items():
+                    if current.get(pk) != (
+                        record["department"],
+                        record.get("position", ""),
+                    ):
+                        records[pk] = record
+                        closed += [pk] if pk in current else []
+            self._close_employments(closed, batch_size)
+            Employment.objects.bulk_create(
+                [
+                    Employment(
+                        employee_id=pk,
+                        department_id=record["department"],
+                        position=record.get("position", ""),
+                        start_date=self.date,
+                    )
+                    for pk, record in records.items()
+                ],
+                batch_size=batch_size,
+            )
+
+            # The bulk operations send no signals; count the changes explicitly
+            counters.bump(Employee, Employment)
+
+        return changes
+
+    def _close_employments(self, employees, batch_size):
+        """End the open employments of the employees on the day before the sync."""
+        last_day = self.date - datetime.timedelta(days=1)
+        for batch in chunked(employees, batch_size):
+            employments = Employment.objects.filter(
+                employee__in=batch, end_date__isnull=True
+            )
+            # Employments started on the sync date itself end on the same day
+            employments.filter(start_date__gt=last_day).update(end_date=self.date)
+            employments.filter(start_date__lte=last_day).update(end_date=last_day)
+
+
+def sync(records, date=None, dry_run=False, batch_size=1000):
+    """Synchronize the employees with the HR export records; return the changes."""
+    state = Sync(date)
+    state.feed(records)
+    return state.changes() if dry_run else state.apply(batch_size)
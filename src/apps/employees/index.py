@@ -0,0 +1,126 @@
+"""In-memory interval index of the employment history.
+
+The employments are held in NumPy arrays sorted by the employee and the start
+date, which lets a whole batch of (employee, date) questions be answered with a
+single binary search, followed by a few vectorized steps back over the earlier
+employments still lasting on the dates. The index is shared by the process and
+rebuilt lazily after any employment has changed, as told by the change counter
+of the employments (see `apps.extras.counters`), which all the processes share.
+"""
+
+import datetime
+
+from apps.extras import counters
+
+import numpy as np
+
+from .models import Employment
+
+# Ordinal of the date far enough to represent the employments still lasting
+OPEN_END = datetime.date.max.toordinal()
+
+# Multiplier combining the employee PK and the date ordinal into a single key
+KEY_SCALE = OPEN_END + 1
+
+
+def _ordinals(dates):
+    """Return an array of the dates' ordinals (open end for None)."""
+    return np.array(
+        [date.toordinal() if date else OPEN_END for date in dates], dtype=np.int64
+    )
+
+
+class EmploymentIndex:
+    """A class to represent the employment history as an interval index."""
+
+    def __init__(self, rows):
+        """Build the index from (employee, department, start, end) rows."""
+        employees, departments, starts, ends = zip(*rows) if rows else ([],) * 4
+        self.employees = np.array(employees, dtype=np.int64)
+        self.departments = np.array(departments, dtype=np.int64)
+        self.starts = _ordinals(starts)
+        self.ends = _ordinals(ends)
+
+        order = np.argsort(self.employees * KEY_SCALE + self.starts, kind="stable")
+        for name in ("employees", "departments", "starts", "ends"):
+            setattr(self, name, getattr(self, name)[order])
+        self.keys = self.employees * KEY_SCALE + self.starts
+
+        # The latest end of the employee's employments started so far (the
+        # employees' offsets keep the maximum from spilling over to the next one)
+        offsets = self.employees * KEY_SCALE
+        self.max_ends = np.maximum.accumulate(offsets + self.ends) - offsets
+
+    @classmethod
+    def load(cls):
+        """Build the index of all the employments in the database."""
+        return cls(
+            list(
+                Employment.objects.order_by().values_list(
+                    "employee", "department", "start_date", "end_date"
+                )
+            )
+        )
+
+    def departments_as_of(self, pairs):
+        """Return the departments of the employees on the dates, for many pairs.
+
+        For each (employee, date) pair, the department of the latest employment
+        started by the date and lasting on it is returned, or None if there is none.
+        """
+        if not len(self.keys):
+            return [None] * len(pairs)
+        if not pairs:
+            return []
+
+        employees, dates = zip(*pairs)
+        employees = np.array(employees, dtype=np.int64)
+        dates = _ordinals(dates)
+
+        # The last employment of the employee started by the date, if any of the
+        # employments started by then lasts on the date
+        rows = np.searchsorted(self.keys, employees * KEY_SCALE + dates, side="right")
+        rows = np.maximum(rows - 1, 0)
+        found = (self.employees[rows] == employees) & (self.starts[rows] <= dates)
+        found &= self.max_ends[rows] >= dates
+
+        # Step back to the latest of the employments lasting on the date
+        pending = found & (self.ends[rows] < dates)
+        while pending.any():
+            rows[pending] -= 1
+            pending &= self.ends[rows] < dates
+
+        return [
+            department if ok else None
+            for department, ok in zip(self.departments[rows].tolist(), found.tolist())
+        ]
+
+    def employed(self, departments, start_date, end_date=None):
+        """Return the PKs of the employees employed in the departments in the range."""
+        start = start_date.toordinal()
+        end = (end_date or start_date).toordinal()
+        mask = (
+            np.isin(self.departments, list(departments))
+            & (self.starts <= end)
+            & (self.ends >= start)
+        )
+        return set(self.employees[mask].tolist())
+
+    def employed_in(self, unit, start_date, end_date=None):
+        """Return the PKs of the employees employed in the unit (or its sub-units)."""
+        departments = unit.get_departments().values_list("pk", flat=True)
+        return self.employed(departments, start_date, end_date)
+
+
+_index = None
+_index_version = None
+
+
+def get_index():
+    """Return the employment index, rebuilding it if the history has changed."""
+    global _index, _index_version
+
+    version = counters.state(Employment)[0]
+    if _index is None or version != _index_version:
+        _index, _index_version = EmploymentIndex.load(), version
+    return _index
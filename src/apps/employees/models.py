@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+from apps.units.models import Department
+from base.options import models
+
+
+class Employee(models.Model):
+    """A class to represent Employee objects."""
+
+    first_name = models.CharField(_("imiona"), max_length=255)
+    last_name = models.CharField(_("nazwisko"), max_length=255)
+    user = models.OneToOneField(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        verbose_name=_("konto"),
+        related_name="employee",
+        blank=True,
+        null=True,
+    )
+    hr_id = models.CharField(
+        _("identyfikator kadrowy"),
+        max_length=64,
+        unique=True,
+        blank=True,
+        null=True,
+    )
+    hr_hash = models.CharField(
+        _("skrót danych kadrowych"),
+        max_length=40,
+        blank=True,
+        editable=False,
+    )
+    is_active = models.BooleanField(_("zatrudniony"), default=True)
+
+    class Meta:
+        verbose_name = _("pracownik")
+        verbose_name_plural = _("pracownicy")
+
+    def __str__(self):
+        """Define how to print the object."""
+        return self.get_short_name()
+
+    def get_short_name(self):
+        """Return the employee's short name."""
+        return "{} {}".format(
+            self.last_name,
+            " ".join([f"{first_name[:1]}." for first_name in self.first_name.split()]),
+        ).strip()
+
+
+class EmploymentQuerySet(models.QuerySet):
+    """A class to represent querysets of Employment objects."""
+
+    def overlapping(self, start_date, end_date=None):
+        """Filter the employments lasting at any time in the date range."""
+        return self.filter(
+            models.Q(end_date__isnull=True) | models.Q(end_date__gte=start_date),
+            start_date__lte=end_date or start_date,
+        )
+
+    def as_of(self, date):
+        """Filter the employments lasting on the date."""
+        return self.overlapping(date)
+
+    def in_unit(self, unit):
+        """Filter the employments in the unit, including all of its sub-units."""
+        return self.filter(department__in=unit.get_departments())
+
+
+class Employment(models.Model):
+    """A class to represent Employment objects, i.e. the employment history."""
+
+    employee = models.ForeignKey(
+        to=Employee,
+        on_delete=models.CASCADE,
+        verbose_name=Employee._meta.verbose_name,
+        related_name="employments",
+    )
+    department = models.ForeignKey(
+        to=Department,
+        on_delete=models.CASCADE,
+        verbose_name=Department._meta.verbose_name,
+        related_name="employments",
+    )
+    position = models.CharField(_("stanowisko"), max_length=255, blank=True)
+    start_date = models.DateField(_("data zatrudnienia"))
+    end_date = models.DateField(_("data zakończenia"), blank=True, null=True)
+
+    objects = EmploymentQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("zatrudnienie")
+        verbose_name_plural = _("zatrudnienia")
+        indexes = [
+            models.Index(fields=["department", "start_date", "end_date"]),
+            models.Index(fields=["employee", "start_date"]),
+        ]
+
+    def __str__(self):
+        """Define how to print the object."""
+        return f"{self.employee}: {self.department.abbr}"
@@ -0,0 +1,291 @@
+"""Matching of the author names of the imported records with the employees.
+
+The index holds the employees (and the users with no employee profile) keyed by
+the folded surname and the first initial, the form in which the bibliographies
+cite the authors (see `User.get_short_name`). The keys of the hyphenated
+surnames are indexed by each of their parts too, and the author names are read
+in both the "Lastname F." and the "F. Lastname" orders, so the candidates of a
+name are found with a few dict lookups.
+
+The candidates are scored by how well the names agree and by the context of the
+record: the co-authors the candidate has already worked with and the units
+named by the record. Whole batches of records are matched at once, with a fixed
+number of queries.
+"""
+
+import datetime
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+
+from django.apps import apps
+from django.conf import settings
+
+from apps.extras import counters
+
+from .models import Employee
+
+# Letters that do not decompose into the base letter and a diacritic
+FOLDED_LETTERS = str.maketrans({"ł": "l", "ø": "o", "ß": "ss", "đ": "d", "æ": "ae"})
+
+# Scores of the agreement of the surnames and the initials, and of the context
+FULL_SURNAME_SCORE = 2
+SURNAME_PART_SCORE = 1
+FULL_INITIALS_SCORE = 2
+FIRST_INITIAL_SCORE = 1
+CO_AUTHOR_SCORE = 2
+MAX_CO_AUTHORS_SCORED = 2
+UNIT_SCORE = 1
+
+Candidate = namedtuple("Candidate", ["employee", "user", "surname", "initials"])
+
+Match = namedtuple("Match", ["employee", "user", "score"])
+
+Record = namedtuple("Record", ["authors", "year", "departments"], defaults=(None, ()))
+
+
+def fold(value):
+    """Return the name case- and diacritic-folded, with no punctuation but hyphens."""
+    value = unicodedata.normalize("NFKD", value.casefold().translate(FOLDED_LETTERS))
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w\s-]|_", " ", value).replace(" -", "-").split())
+
+
+def surname_forms(surname):
+    """Return the full surname and, if hyphenated, its parts."""
+    parts = [part for part in re.split(r"[-\s]+", surname) if part]
+    return ["-".join(parts)] + (parts if len(parts) > 1 else [])
+
+
+def parse(name):
+    """Return the possible (surname, initials) readings of the author name."""
+    if "," in name:
+        surname, _, given = name.partition(",")
+        return [(fold(surname), "".join(word[0] for word in fold(given).split()))]
+
+    # Initials written together ("JM") and with no spaces ("J.M.") are separated;
+    # in the names written in capitals ("KOWALSKI JAN", "LI WEI"), the short words
+    # are taken for the initials only if followed by a dot ("KOWALSKI JM.")
+    if any(not word.isupper() and not word.islower() for word in name.split()):
+        pattern = r"\b[A-Z]{2,3}\b"
+    else:
+        pattern = r"\b[A-Z]{2,3}(?=\.)"
+    name = re.sub(pattern, lambda m: " ".join(m[0]) + " ", name)
+    tokens = fold(name.replace(".", ". ")).split()
+
+    # The initials are the tokens of a single letter
+    initials = "".join(token for token in tokens if len(token) == 1)
+    words = [token for token in tokens if len(token) > 1]
+    if initials and words:
+        return [(" ".join(words), initials)]
+    if len(words) < 2:
+        return [(words[0], "")] if words else []
+
+    # Full names with no initials: "Lastname Firstname" or "Firstname Lastname"
+    return [
+        (words[0], "".join(word[0] for word in words[1:])),
+        (words[-1], "".join(word[0] for word in words[:-1])),
+    ]
+
+
+def name_score(candidate, surname, initials):
+    """Return the score of the candidate's agreement with the name, 0 if none."""
+    if candidate.surname == surname:
+        score = FULL_SURNAME_SCORE
+    elif surname in surname_forms(candidate.surname) or candidate.surname in (
+        surname_forms(surname)
+    ):
+        score = SURNAME_PART_SCORE
+    else:
+        return 0
+
+    if not initials or not candidate.initials:
+        return score
+    if candidate.initials == initials:
+        return score + FULL_INITIALS_SCORE
+    if candidate.initials.startswith(initials) or initials.startswith(
+        candidate.initials
+    ):
+        return score + FIRST_INITIAL_SCORE
+    return 0
+
+
+class NameIndex:
+    """A class to represent the index of the employees' and users' names."""
+
+    def __init__(self, rows):
+        """Build the index from (employee, user, first name, last name) rows."""
+        self.candidates = []
+        self.keys = defaultdict(set)
+
+        for employee, user, first_name, last_name in rows:
+            candidate = Candidate(
+                employee,
+                user,
+                "-".join(re.split(r"[-\s]+", fold(last_name))),
+                "".join(word[0] for word in fold(first_name).split()),
+            )
+            self.candidates.append(candidate)
+            for surname in surname_forms(candidate.surname):
+                self.keys[(surname, candidate.initials[:1])].add(len(self) - 1)
+
+    def __len__(self):
+        """Return the number of the candidates indexed."""
+        return len(self.candidates)
+
+    @classmethod
+    def load(cls):
+        """Build the index of all the employees and the users with no employee."""
+        rows = list(
+            Employee.objects.values_list("pk", "user", "first_name", "last_name")
+        )
+        rows += [
+            (None, *row)
+            for row in apps.get_model(settings.AUTH_USER_MODEL)
+            .objects.filter(employee__isnull=True)
+            .exclude(last_name="")
+            .values_list("pk", "first_name", "last_name")
+        ]
+        return cls(rows)
+
+    def lookup(self, name):
+        """Return a dict mapping the candidates of the name to their name scores."""
+        scores = {}
+        for surname, initials in parse(name):
+            forms = surname_forms(surname)
+            surname = forms[0]
+            for form in forms:
+                for i in self.keys.get((form, initials[:1]), ()):
+                    if score := name_score(self.candidates[i], surname, initials):
+                        scores[i] = max(scores.get(i, 0), score)
+        return scores
+
+    def match(self, records):
+        """Return the best matches of the records' authors (None if ambiguous).
+
+        The records are `Record` tuples, or just lists of the author names; the
+        result has a list of the matches for each record.
+        """
+        records = [
+            record if isinstance(record, Record) else Record(record)
+            for record in records
+        ]
+        lookups = [[self.lookup(name) for name in record.authors] for record in records]
+
+        employees = {
+            self.candidates[i].employee
+            for authors in lookups
+            for scores in authors
+            for i in scores
+        } - {None}
+        co_authors = co_author_pairs(employees)
+        departments = self._departments(records, lookups)
+
+        result = []
+        for r, (record, authors) in enumerate(zip(records, lookups)):
+            matches = []
+            for a, scores in enumerate(authors):
+                others = {
+                    self.candidates[i].employee
+                    for b, other in enumerate(authors)
+                    if b != a
+                    for i in other
+                }
+                ranked = sorted(
+                    (
+                        score
+                        + self._co_authors_score(self.candidates[i], others, co_authors)
+                        + UNIT_SCORE * (departments.get((r, i)) in record.departments),
+                        i,
+                    )
+                    for i, score in scores.items()
+                )
+                # The best candidate must be scored higher than the others
+                if not ranked or len(ranked) > 1 and ranked[-1][0] == ranked[-2][0]:
+                    matches.append(None)
+                else:
+                    score, i = ranked[-1]
+                    matches.append(Match(*self.candidates[i][:2], score))
+            result.append(_drop_repeated(matches))
+        return result
+
+    def _co_authors_score(self, candidate, others, co_authors):
+        """Return the score of the candidate's past work with the co-authors."""
+        known = sum((candidate.employee, other) in co_authors for other in others)
+        return CO_AUTHOR_SCORE * min(known, MAX_CO_AUTHORS_SCORED)
+
+    def _departments(self, records, lookups):
+        """Return the departments of the candidates in the years of the records."""
+        from .index import get_index
+
+        keys = [
+            (r, i)
+            for r, (record, authors) in enumerate(zip(records, lookups))
+            if record.departments
+            for scores in authors
+            for i in scores
+            if self.candidates[i].employee is not None
+        ]
+        today = datetime.date.today()
+        dates = [
+            datetime.date(records[r].year, 12, 31) if records[r].year else today
+            for r, _ in keys
+        ]
+        departments = get_index().departments_as_of(
+            [(self.candidates[i].employee, date) for (_, i), date in zip(keys, dates)]
+        )
+        return dict(zip(keys, departments))
+
+
+def _drop_repeated(matches):
+    """Keep only the best of the matches of the same person within a record."""
+    scores = defaultdict(list)
+    for match in filter(None, matches):
+        scores[match[:2]].append(match.score)
+
+    def is_best(match):
+        person = scores[match[:2]]
+        return match.score == max(person) and person.count(match.score) == 1
+
+    return [match if match and is_best(match) else None for match in matches]
+
+
+def co_author_pairs(employees):
+    """Return the set of (employee, employee) pairs having a common output."""
+    from apps.outputs.contributions.engine import contribution_models
+
+    if not employees:
+        return set()
+
+    outputs = defaultdict(set)
+    for model in contribution_models():
+        for output, employee in (
+            model.objects.filter(
+                output__in=model.objects.filter(employee__in=employees).values("output")
+            )
+            .order_by()
+            .values_list("output", "employee")
+        ):
+            outputs[(model, output)].add(employee)
+
+    return {
+        (a, b)
+        for authors in outputs.values()
+        for a in authors & employees
+        for b in authors
+        if a != b
+    }
+
+
+_index = None
+_index_version = None
+
+
+def get_index():
+    """Return the name index, rebuilding it if any employee or user has changed."""
+    global _index, _index_version
+
+    version = counters.state(Employee, apps.get_model(settings.AUTH_USER_MODEL))[0]
+    if _index is None or version != _index_version:
+        _index, _index_version = NameIndex.load(), version
+    return _index
@@ -0,0 +1,216 @@
+"""Annual reports of the employees' outputs.
+
+The data of all the reports is collected with a few queries, and each report
+is identified by the hash of its data (and of the template). The reports are
+rendered in a pool of processes and cached on disk under their hashes, so that
+only the reports of the employees whose data has changed are rendered again.
+The reports are delivered as a ZIP archive. The cached reports (and archives)
+not used for `settings.REPORTS_CACHE_DAYS` days are evicted.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import time
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template.loader import get_template, render_to_string
+from django.utils.text import capfirst, slugify
+
+from apps.units.models import Department
+
+from .index import get_index
+from .models import Employee
+
+TEMPLATE_NAME = "employees/report.html"
+
+# Number of the reports passed to a worker process at once
+CHUNK_SIZE = 16
+
+
+def collect(year, employees=None):
+    """Return the data of the employees' reports, keyed by the employees' PKs."""
+    from apps.outputs.contributions.engine import contribution_models
+
+    if employees is None:
+        employees = Employee.objects.filter(is_active=True)
+    employees = {
+        pk: f"{last_name} {first_name}".strip()
+        for pk, first_name, last_name in employees.values_list(
+            "pk", "first_name", "last_name"
+        )
+    }
+    units = {
+        pk: "/".join(filter(None, abbrs))
+        for pk, *abbrs in Department.objects.values_list(
+            "pk", "ancestor__ancestor__abbr", "ancestor__abbr", "abbr"
+        )
+    }
+    current = dict(
+        zip(
+            employees,
+            get_index().departments_as_of(
+                [(pk, datetime.date(year, 12, 31)) for pk in employees]
+            ),
+        )
+    )
+
+    sections = defaultdict(lambda: defaultdict(list))
+    for model in contribution_models():
+        output_model = model._meta.get_field("output").related_model
+        queryset = model.objects.filter(employee__in=employees, output__year=year)
+        if output_model.requires_approval():
+            queryset = queryset.filter(
+                **{f"output__{output_model.APPROVAL_STATUS_FIELD_NAME}": True}
+            )
+        title = str(capfirst(output_model._meta.verbose_name_plural))
+        for employee, *row in queryset.order_by("output__title").values_list(
+            "employee", "output__title", "department", "discipline", "share", "points"
+        ):
+            sections[employee][title].append(row)
+
+    reports = {}
+    for pk, name in employees.items():
+        report = {
+            "year": year,
+            "employee": {"name": name, "unit": units.get(current[pk])},
+            "sections": [],
+            "points": 0,
+        }
+        for title, rows in sections[pk].items():
+            outputs = [
+                {
+                    "title": output_title,
+                    "unit": units.get(department),
+                    "discipline": discipline,
+                    "share": share or 0,
+                    "points": points or 0,
+                }
+                for output_title, department, discipline, share, points in rows
+            ]
+            report["sections"].append(
+                {
+                    "title": title,
+                    "outputs": outputs,
+                    "share": sum(output["share"] for output in outputs),
+                    "points": sum(output["points"] for output in outputs),
+                }
+            )
+            report["points"] += report["sections"][-1]["points"]
+        reports[pk] = report
+    return reports
+
+
+def content_hash(report, template_hash=""):
+    """Return the hash identifying the report's content."""
+    data = json.dumps(report, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{template_hash}:{data}".encode()).hexdigest()
+
+
+def template_hash():
+    """Return the hash of the report template's source."""
+    return hashlib.sha256(
+        get_template(TEMPLATE_NAME).template.source.encode()
+    ).hexdigest()
+
+
+def cache_path(digest):
+    """Return the path of the cached report."""
+    return os.path.join(settings.REPORTS_CACHE_DIR, f"{digest}.html")
+
+
+def archive_path(job_id):
+    """Return the path of the archive of the reports generated by the job."""
+    return os.path.join(settings.REPORTS_CACHE_DIR, "archives", f"job-{job_id}.zip")
+
+
+def evict(days=None):
+    """Remove the files of the cache not used for the days; return their number."""
+    days = settings.REPORTS_CACHE_DAYS if days is None else days
+    deadline = time.time() - days * 24 * 60 * 60
+
+    count = 0
+    for directory in (settings.REPORTS_CACHE_DIR, os.path.dirname(archive_path(0))):
+        if not os.path.isdir(directory):
+            continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.stat().st_mtime < deadline:
+                    try:
+                        os.remove(entry.path)
+                    except FileNotFoundError:
+                        continue  # evicted by another process
+                    count += 1
+    return count
+
+
+def render(job):
+    """Render the report and save it in the cache; return its hash."""
+    digest, report = job
+    path = cache_path(digest)
+    with open(f"{path}.{os.getpid()}.tmp", "w", encoding="utf-8") as file:
+        file.write(render_to_string(TEMPLATE_NAME, report))
+    os.replace(f"{path}.{os.getpid()}.tmp", path)
+    return digest
+
+
+def _setup_worker():
+    """Set up Django in the worker process (if not inherited from the parent)."""
+    if not apps.ready:
+        django.setup()
+
+
+def archive_name(pk, report):
+    """Return the name of the report file within the archive."""
+    return f"{report['year']}/{slugify(report['employee']['name'])}-{pk}.html"
+
+
+def generate(year, file, employees=None, workers=None, progress=None, mode="w"):
+    """Write the ZIP archive of the employees' reports; return the counts.
+
+    The counts are of the reports rendered and taken from the cache. If given,
+    the `progress` function is called with the numbers of the reports rendered
+    and to render. With the "a" mode, the reports are appended to the archive,
+    except for those already in it.
+    """
+    reports = collect(year, employees)
+    template = template_hash()
+    digests = {pk: content_hash(report, template) for pk, report in reports.items()}
+
+    os.makedirs(settings.REPORTS_CACHE_DIR, exist_ok=True)
+    jobs = {}
+    for pk, digest in digests.items():
+        try:
+            # Mark the cached report used, not to be evicted
+            os.utime(cache_path(digest))
+        except FileNotFoundError:
+            jobs[digest] = reports[pk]
+
+    def track(results):
+        for done, _ in enumerate(results, start=1):
+            if progress is not None:
+                progress(done, len(jobs))
+
+    if workers == 1 or len(jobs) <= CHUNK_SIZE:
+        track(map(render, jobs.items()))
+    else:
+        # The workers must not inherit the open database connections
+        connections.close_all()
+        with ProcessPoolExecutor(workers, initializer=_setup_worker) as executor:
+            track(executor.map(render, jobs.items(), chunksize=CHUNK_SIZE))
+
+    with zipfile.ZipFile(file, mode, zipfile.ZIP_DEFLATED) as archive:
+        names = set(archive.namelist())
+        for pk, digest in digests.items():
+            if (name := archive_name(pk, reports[pk])) not in names:
+                archive.write(cache_path(digest), name)
+
+    evict()
+    return len(jobs), len(reports) - len(jobs)
@@ -1,3 +1,14 @@
+from django.urls import path
+
+from . import views
+
 app_name = "employees"
 
-urlpatterns = []
+urlpatterns = [
+    path("api/employees/", views.EmployeeApiView.as_view(), name="employee_list"),
+    path(
+        "api/employees/<int:pk>/",
+        views.EmployeeApiView.as_view(),
+        name="employee_detail",
+    ),
+]
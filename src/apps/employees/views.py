@@ -0,0 +1,25 @@
+from base.options.views import ApiView
+
+from .models import Employee
+
+
+class EmployeeApiView(ApiView):
+    """JSON API of the Employee objects, along with their employment history."""
+
+    model = Employee
+    fields = (
+        "id",
+        "first_name",
+        "last_name",
+        "user",
+        "hr_id",
+        "is_active",
+        "employments",
+    )
+    related = {
+        "employments": (
+            "employments",
+            ("department", "position", "start_date", "end_date"),
+        ),
+    }
+    filters = ("is_active",)
@@ -0,0 +1,119 @@
+from django.contrib import messages
+from django.utils.html import format_html, format_html_join
+from django.utils.translation import gettext_lazy as _
+
+from base.options import admin
+
+from .models import AuditEntry, Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Admin options and functionalities for the Job model."""
+
+    list_display = (
+        "description",
+        "content_type",
+        "user",
+        "status",
+        "progress_display",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status", "content_type")
+    fields = (
+        "description",
+        "content_type",
+        "user",
+        "status",
+        "progress_display",
+        "messages_display",
+        "result_display",
+        "error",
+        "worker",
+        "created_at",
+        "started_at",
+        "finished_at",
+    )
+    readonly_fields = fields
+    actions = ("requeue_selected",)
+
+    def has_add_permission(self, request):
+        """Override the base class method."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Override the base class method."""
+        return False
+
+    @admin.display(description=_("postęp"))
+    def progress_display(self, obj):
+        """Return the job's progress."""
+        percent = 100 * obj.progress // obj.total if obj.total else 100
+        return f"{obj.progress} / {obj.total} ({percent}%)"
+
+    @admin.display(description=_("komunikaty"))
+    def messages_display(self, obj):
+        """Return HTML code listing the messages left by the action."""
+        return format_html_join(
+            "", '<p class="{}">{}</p>', ((level, text) for level, text in obj.messages)
+        )
+
+    @admin.display(description=_("wynik"))
+    def result_display(self, obj):
+        """Return HTML code linking the result of the action, if any."""
+        model_admin = self.admin_site._registry.get(obj.content_type.model_class())
+        if obj.status == Job.DONE and model_admin is not None:
+            if url := model_admin.get_job_result_url(obj):
+                return format_html('<a href="{}">{}</a>', url, _("Pobierz"))
+        return "-"
+
+    @admin.action(description=_("Dodaj wybrane zadania ponownie do kolejki"))
+    def requeue_selected(self, request, queryset):
+        """Queue the selected failed jobs again."""
+        count = queryset.filter(status=Job.FAILED).update(
+            status=Job.QUEUED, error="", worker=""
+        )
+        self.message_user(
+            request,
+            message=_("Dodano ponownie do kolejki zadań: %d.") % count,
+            level=messages.SUCCESS,
+        )
+
+
+@admin.register(AuditEntry)
+class AuditEntryAdmin(admin.ModelAdmin):
+    """Admin options and functionalities for the AuditEntry model."""
+
+    # The log is large; the objects are neither counted nor faceted
+    show_objects_count = False
+    show_facet_counts = False
+
+    list_display = (
+        "created_at",
+        "action",
+        "content_type",
+        "object_id",
+        "object_repr",
+        "user",
+        "repeated",
+    )
+    list_filter = ("action", "content_type")
+    list_select_related = ("content_type", "user")
+    search_fields = ("=object_id", "object_repr")
+    date_hierarchy = "created_at"
+    fields = list_display + ("changes",)
+    readonly_fields = fields
+    actions = None
+
+    def has_add_permission(self, request):
+        """Override the base class method."""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Override the base class method."""
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        """Override the base class method."""
+        return False
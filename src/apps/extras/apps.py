@@ -8,3 +8,7 @@ class ExtrasConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.extras"
     verbose_name = _("Dodatki")
+
+    def ready(self):
+        """Run this code when the Django starts."""
+        from . import signals  # NOQA
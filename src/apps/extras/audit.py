@@ -0,0 +1,160 @@
+"""Append-only audit log of the changes and approvals made in the admin.
+
+The entries are added once the transaction of the change commits, to a buffer
+of the process, which is saved with a single `bulk_create` once it holds
+`settings.AUDIT_BUFFER_SIZE` entries or its oldest entry is older than
+`settings.AUDIT_FLUSH_INTERVAL` seconds (a timer thread flushes the buffers of
+the idle processes), so that the requests and the bulk actions wait for no
+writes of their own. The entries still buffered are saved when the process exits.
+
+The old entries are compacted and deleted by the `compact_audit` command.
+"""
+
+import atexit
+import itertools
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, connections
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from base.options import deletion, transaction
+from base.utils import chunked
+
+from .models import AuditEntry
+
+logger = logging.getLogger(__name__)
+
+# Number of the entries read or deleted at once by the compaction
+BATCH_SIZE = 5000
+
+_lock = threading.Lock()
+_entries = []
+_since = None  # monotonic time of the oldest entry buffered
+_timer = None
+
+
+def log(user, objects, action, changes=None):
+    """Add the entries of the action on the objects, once committed."""
+    now = timezone.now()
+    entries = [
+        AuditEntry(
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=str(obj.pk),
+            object_repr=str(obj)[:255],
+            action=action,
+            changes=changes or [],
+            user_id=getattr(user, "pk", None),
+            created_at=now,
+        )
+        for obj in objects
+    ]
+    if entries:
+        transaction.on_commit(lambda: add(entries))
+
+
+def approval_action(approve):
+    """Return the action of approving (or disapproving) the objects."""
+    return AuditEntry.APPROVAL if approve else AuditEntry.DISAPPROVAL
+
+
+def add(entries):
+    """Add the entries to the buffer, flushing it if full or old enough."""
+    global _since, _timer
+
+    with _lock:
+        if not _entries:
+            _since = time.monotonic()
+        _entries.extend(entries)
+        full = len(_entries) >= settings.AUDIT_BUFFER_SIZE
+        old = time.monotonic() - _since >= settings.AUDIT_FLUSH_INTERVAL
+        if not (full or old) and _timer is None:
+            _timer = threading.Timer(settings.AUDIT_FLUSH_INTERVAL, _flush_on_timer)
+            _timer.daemon = True
+            _timer.start()
+
+    if full or old:
+        flush()
+
+
+def flush():
+    """Save the buffered entries; return the number of them."""
+    global _entries, _since
+
+    with _lock:
+        entries, _entries = _entries, []
+    if not entries:
+        return 0
+
+    try:
+        AuditEntry.objects.bulk_create(entries, batch_size=BATCH_SIZE)
+    except DatabaseError:
+        # Keep the entries to save them with the next ones
+        logger.exception("Failed to save %d audit entries.", len(entries))
+        with _lock:
+            _entries[:0] = entries
+            _since = time.monotonic()
+        return 0
+    return len(entries)
+
+
+def _flush_on_timer():
+    """Flush the buffer from the timer thread."""
+    global _timer
+
+    with _lock:
+        _timer = None
+    try:
+        flush()
+    finally:
+        # The thread's own connections
+        connections.close_all()
+
+
+atexit.register(flush)
+
+
+def compact(before, batch_size=BATCH_SIZE):
+    """Merge the entries of the same object, action, user and day before the time.
+
+    The latest entry of each group is kept, with the number of the entries
+    merged into it. Return the number of the entries deleted.
+    """
+    key = ("content_type_id", "object_id", "action", "user_id", "day")
+    rows = (
+        AuditEntry.objects.filter(created_at__lt=before)
+        .annotate(day=TruncDate("created_at"))
+        .order_by(*key, "created_at", "pk")
+        .values_list(*key, "pk", "repeated")
+        .iterator(chunk_size=batch_size)
+    )
+
+    kept, merged = [], []
+    for _group, entries in itertools.groupby(rows, key=lambda row: row[:5]):
+        *older, latest = [row[5:] for row in entries]
+        if older:
+            merged += [pk for pk, _repeated in older]
+            kept.append(
+                AuditEntry(
+                    pk=latest[0],
+                    repeated=sum(repeated for _pk, repeated in [*older, latest]),
+                )
+            )
+
+    deleted = 0
+    with transaction.atomic():
+        AuditEntry.objects.bulk_update(kept, ["repeated"], batch_size=batch_size)
+        for pks in chunked(merged, batch_size):
+            queryset = AuditEntry.objects.filter(pk__in=pks)
+            deleted += deletion.Deletion(queryset).delete()[0]
+    return deleted
+
+
+def purge(before):
+    """Delete the entries before the time; return the number of them."""
+    queryset = AuditEntry.objects.filter(created_at__lt=before)
+    return deletion.Deletion(queryset).delete()[0]
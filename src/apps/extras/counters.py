@@ -0,0 +1,72 @@
+"""Per-model counters of the changes of the objects.
+
+The counter of a model is incremented once per transaction in which any of the
+model's objects has been saved or deleted: by the signals for the objects saved
+one by one and explicitly (`bump`) by the bulk operations, which send no
+signals. The counters tell the clients (and the caches) whether the data of the
+models may have changed, without reading the data itself.
+"""
+
+import hashlib
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F
+from django.utils import timezone
+
+from base.options import transaction
+
+from .models import ChangeCounter
+
+# Models of the data derived from the others, hence not counted
+UNTRACKED_MODELS = ["outputs.aggregate", "outputs.fundingseries"]
+
+
+def tracked_models():
+    """Return the models whose changes are counted."""
+    return [
+        model
+        for model in apps.get_models()
+        if model.__module__.startswith("apps.")
+        and model._meta.app_label != ChangeCounter._meta.app_label
+        and model._meta.label_lower not in UNTRACKED_MODELS
+    ]
+
+
+def _increment(pending):
+    """Increment the counters of the models changed in the transaction."""
+    content_types = ContentType.objects.get_for_models(
+        *(apps.get_model(label) for label in pending[None])
+    ).values()
+    ChangeCounter.objects.bulk_create(
+        [ChangeCounter(content_type=content_type) for content_type in content_types],
+        ignore_conflicts=True,
+    )
+    ChangeCounter.objects.filter(content_type__in=content_types).update(
+        version=F("version") + 1, changed_at=timezone.now()
+    )
+
+
+_pending = transaction.CommitBuffer(_increment)
+
+
+def bump(*models):
+    """Increment the counters of the models after the transaction commits."""
+    _pending.add(None, [model._meta.label_lower for model in models])
+
+
+def state(*models):
+    """Return the ETag and the last modification time of the models' data."""
+    content_types = ContentType.objects.get_for_models(*models)
+    counters = {
+        content_type: (version, changed_at)
+        for content_type, version, changed_at in ChangeCounter.objects.filter(
+            content_type__in=content_types.values()
+        ).values_list("content_type", "version", "changed_at")
+    }
+    versions = sorted(
+        (model._meta.label_lower, counters.get(content_type.pk, (0,))[0])
+        for model, content_type in content_types.items()
+    )
+    etag = hashlib.md5(repr(versions).encode()).hexdigest()
+    return etag, max(filter(None, (row[1] for row in counters.values())), default=None)
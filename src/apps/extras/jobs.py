@@ -0,0 +1,172 @@
+"""Local, database-backed queue of the long-running admin actions.
+
+The admin actions run on more objects than `settings.ADMIN_JOB_THRESHOLD` (and
+those marked with `run_as_job`) are stored as jobs instead of being run within
+the request. The jobs are claimed by
+the worker processes (see the `run_jobs` command) with a conditional update, so
+that each is run by exactly one worker, and the actions are then run on batches
+of the selected objects, with the progress saved after each of them.
+"""
+
+import datetime
+import os
+import socket
+import time
+import traceback
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.messages.storage.base import BaseStorage
+from django.db.models import F
+from django.http import HttpRequest, HttpResponseBase, QueryDict
+from django.utils import timezone
+from django.utils.html import format_html, strip_tags
+from django.utils.translation import gettext_lazy as _
+
+from base.utils import chunked
+
+from .models import Job
+
+# Number of the objects the action is run on at once
+BATCH_SIZE = 500
+
+
+def should_enqueue(func, name, request, queryset):
+    """Check if the action should be queued rather than run within the request."""
+    if getattr(func, "run_in_request", False) or hasattr(request, "job"):
+        return False
+    if getattr(func, "run_as_job", False):
+        return True
+
+    # Deleting is queued only once confirmed
+    if name == "delete_selected" and not request.POST.get("post"):
+        return False
+
+    return queryset.count() > settings.ADMIN_JOB_THRESHOLD
+
+
+def enqueue(model_admin, name, description, request, queryset):
+    """Queue the action on the objects and notify the user."""
+    object_ids = list(queryset.order_by().values_list("pk", flat=True))
+    job = Job.objects.create(
+        content_type=ContentType.objects.get_for_model(model_admin.model),
+        action=name,
+        description=str(description),
+        object_ids=object_ids,
+        total=len(object_ids),
+        user=request.user if request.user.is_authenticated else None,
+    )
+    model_admin.message_user(
+        request,
+        message=format_html(
+            _("Akcja obejmuje %d obiektów i została dodana do kolejki zadań: %s.")
+            % (len(object_ids), job.get_admin_change_link())
+        ),
+        level=messages.INFO,
+    )
+
+
+class JobMessages(BaseStorage):
+    """A class to represent the messages left by the actions run as jobs."""
+
+    def _get(self, *args, **kwargs):
+        """Override the base class method."""
+        return [], True
+
+    def _store(self, messages, response, *args, **kwargs):
+        """Override the base class method."""
+        return []
+
+
+def job_request(job):
+    """Return the request the job's action is run with."""
+    request = HttpRequest()
+    request.method = "POST"
+    request.POST = QueryDict(mutable=True)
+    request.POST["post"] = "yes"  # the deletion has been confirmed
+    request.user = job.user
+    request.job = job
+    request._messages = JobMessages(request)
+    return request
+
+
+def claim(worker):
+    """Claim the oldest queued job for the worker; return it or None."""
+    for pk in (
+        Job.objects.filter(status=Job.QUEUED)
+        .order_by("pk")
+        .values_list("pk", flat=True)[:10]
+    ):
+        # Only one worker can succeed in changing the status
+        if Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, started_at=timezone.now()
+        ):
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run(job):
+    """Run the job's action on the batches of the objects."""
+    # The actions check the permissions of the user who queued them
+    if job.user is None:
+        job.status, job.error = Job.FAILED, str(_("Zlecający zadanie nie istnieje."))
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+        return
+
+    model = job.content_type.model_class()
+    model_admin = admin.site._registry[model]
+    func = model_admin.get_action(job.action)[0]
+    request = job_request(job)
+
+    try:
+        # Resume after the objects already processed (if queued again)
+        done = job.progress
+        for batch in chunked(job.object_ids[done:], BATCH_SIZE):
+            queryset = model_admin.get_queryset(request).filter(pk__in=batch)
+            if isinstance(func(model_admin, request, queryset), HttpResponseBase):
+                raise RuntimeError("The action requires the user's interaction.")
+            Job.objects.filter(pk=job.pk).update(
+                progress=F("progress") + len(batch), updated_at=timezone.now()
+            )
+    except Exception:
+        job.status, job.error = Job.FAILED, traceback.format_exc()
+    else:
+        job.status = Job.DONE
+
+    # Leave each message once, even though left by the action on each batch
+    job.messages = list(
+        dict.fromkeys(
+            (message.level_tag, strip_tags(str(message)))
+            for message in request._messages
+        )
+    )
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "messages", "finished_at", "updated_at"])
+
+
+def requeue_stale(timeout):
+    """Queue again the jobs whose workers have been inactive for the timeout."""
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        updated_at__lt=timezone.now() - datetime.timedelta(seconds=timeout),
+    ).update(status=Job.QUEUED, worker="")
+
+
+def work(poll=2, once=False, stale_after=None):
+    """Run the queued jobs, waiting for new ones unless `once` is set.
+
+    The jobs of the workers inactive for `stale_after` seconds (e.g. killed) are
+    queued again on each poll.
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    while True:
+        if stale_after:
+            requeue_stale(stale_after)
+        if job := claim(worker):
+            run(job)
+        elif once:
+            return
+        else:
+            time.sleep(poll)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.outputs.contributions import affiliations, engine
+
+
+class Command(BaseCommand):
+    """Credit the contributions with no affiliation to the employees' departments."""
+
+    help = (
+        "Przypisuje udziały bez afiliacji do katedr, w których pracownicy byli "
+        "zatrudnieni w roku powstania osiągnięcia."
+    )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        for model in engine.contribution_models():
+            updated = affiliations.assign_departments(model)
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {updated}")
@@ -0,0 +1,48 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.outputs.elements.articles import journals
+from apps.outputs.models import Article
+
+
+class Command(BaseCommand):
+    """Compile the ministerial journal list into the memory-mapped index."""
+
+    help = "Kompiluje wykaz czasopism z pliku CSV do indeksu punktacji artykułów."
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument("path", help="Plik CSV z wykazem czasopism.")
+        parser.add_argument(
+            "--year",
+            type=int,
+            required=True,
+            help="Rok, od którego obowiązuje wykaz.",
+        )
+        parser.add_argument(
+            "--update-articles",
+            action="store_true",
+            help="Przelicz punkty artykułów objętych wykazem.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        try:
+            count = journals.build_index(
+                journals.read_csv(options["path"]),
+                year=options["year"],
+                path=journals.index_path(options["year"]),
+            )
+        except (OSError, ValueError, csv.Error) as error:
+            raise CommandError(error)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Wykaz {options['year']}: {count} czasopism.")
+        )
+
+        if options["update_articles"]:
+            updated = Article.objects.filter(year__gte=options["year"]).update_points()
+            self.stdout.write(
+                self.style.SUCCESS(f"Zaktualizowano {updated} artykułów.")
+            )
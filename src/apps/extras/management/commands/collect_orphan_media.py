@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.extras import media
+
+
+class Command(BaseCommand):
+    """Find (and remove) the media files not referenced by any object."""
+
+    help = (
+        "Wyszukuje pliki multimedialne, do których nie odwołuje się żaden obiekt, "
+        "i opcjonalnie je usuwa lub przenosi do kwarantanny. Zgłasza też obiekty "
+        "odwołujące się do nieistniejących plików."
+    )
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "dirs",
+            nargs="*",
+            help="Przeszukiwane katalogi; domyślnie katalogi przesyłanych plików.",
+        )
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--delete", action="store_true", help="Usuń znalezione pliki."
+        )
+        group.add_argument(
+            "--quarantine", help="Przenieś znalezione pliki do podanego katalogu."
+        )
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=24,
+            help="Pomijaj pliki zmodyfikowane w ciągu podanej liczby godzin.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        with media.Scan(dirs=options["dirs"]) as scan:
+            files, refs = scan.load()
+            self.stdout.write(
+                f"Katalogi: {', '.join(scan.dirs)}; plików: {files}, odwołań: {refs}."
+            )
+
+            missing = 0
+            for name, label, pk in scan.missing():
+                missing += 1
+                self.stderr.write(f"Brak pliku {name} ({label}, ID {pk}).")
+
+            orphans = scan.orphans(options["min_age"] * 3600)
+            if options["delete"] or options["quarantine"]:
+                try:
+                    removed = media.remove(scan.root, orphans, options["quarantine"])
+                except OSError as error:
+                    raise CommandError(error)
+                action = "Usunięto" if options["delete"] else "Przeniesiono"
+                summary = f"{action} {removed} nieużywanych plików"
+            else:
+                count = 0
+                for name in orphans:
+                    count += 1
+                    self.stdout.write(name)
+                summary = f"Znaleziono {count} nieużywanych plików (nie usunięto)"
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{summary}; obiektów z brakującymi plikami: {missing}.")
+        )
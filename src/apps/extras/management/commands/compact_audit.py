@@ -0,0 +1,44 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.extras import audit
+
+
+class Command(BaseCommand):
+    """Compact and delete the old entries of the audit log."""
+
+    help = (
+        "Łączy powtórzone wpisy audytu starsze niż podana liczba dni (ten sam "
+        "obiekt, akcja, użytkownik i dzień) i usuwa wpisy starsze niż okres "
+        "przechowywania."
+    )
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "--compact-after",
+            type=int,
+            default=settings.AUDIT_COMPACTION_DAYS,
+            help="Wiek wpisów (w dniach), od którego są łączone.",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=settings.AUDIT_RETENTION_DAYS,
+            help="Okres przechowywania wpisów (w dniach).",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        # Save the entries buffered by this process first
+        audit.flush()
+
+        now = timezone.now()
+        purged = audit.purge(now - datetime.timedelta(days=options["keep"]))
+        merged = audit.compact(now - datetime.timedelta(days=options["compact_after"]))
+        self.stdout.write(
+            self.style.SUCCESS(f"Usunięto {purged} i połączono {merged} wpisów audytu.")
+        )
@@ -0,0 +1,45 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.extras import snapshot
+
+
+class Command(BaseCommand):
+    """Export the data to the denormalized SQLite snapshot for the analysts."""
+
+    help = (
+        "Eksportuje jednostki, użytkowników, pracowników, osiągnięcia i udziały "
+        "do zdenormalizowanej migawki SQLite; istniejąca migawka jest odświeżana "
+        "przyrostowo."
+    )
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=settings.SNAPSHOT_PATH,
+            help="Ścieżka pliku migawki; domyślnie SNAPSHOT_PATH.",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Porównaj też tabele niezmienione od ostatniego eksportu.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        os.makedirs(os.path.dirname(os.path.abspath(options["path"])), exist_ok=True)
+
+        def progress(table, counts):
+            if counts is None:
+                self.stdout.write(f"{table}: bez zmian.")
+            else:
+                self.stdout.write(
+                    f"{table}: zapisano {counts[0]}, usunięto {counts[1]} wierszy."
+                )
+
+        snapshot.export(options["path"], options["full"], progress)
+        self.stdout.write(self.style.SUCCESS(f"Zapisano migawkę {options['path']}."))
@@ -0,0 +1,48 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from apps.employees import reports
+
+
+class Command(BaseCommand):
+    """Generate the annual reports of the employees' outputs."""
+
+    help = "Generuje roczne sprawozdania z osiągnięć pracowników (archiwum ZIP)."
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "year",
+            type=int,
+            nargs="?",
+            default=datetime.date.today().year - 1,
+            help="Rok sprawozdawczy; domyślnie poprzedni.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Ścieżka archiwum; domyślnie sprawozdania-<rok>.zip.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Liczba procesów renderujących; domyślnie liczba procesorów.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        path = options["output"] or f"sprawozdania-{options['year']}.zip"
+
+        def progress(done, total):
+            if done == total or not done % 100:
+                self.stdout.write(f"Wygenerowano {done} z {total} sprawozdań.")
+
+        rendered, cached = reports.generate(
+            options["year"], path, workers=options["workers"], progress=progress
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Zapisano {rendered + cached} sprawozdań w {path} "
+                f"(wygenerowano {rendered}, z pamięci podręcznej {cached})."
+            )
+        )
@@ -0,0 +1,75 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.units import orgchart
+
+
+class Command(BaseCommand):
+    """Import the org chart of the units."""
+
+    help = (
+        "Importuje strukturę organizacyjną (uczelnie, wydziały i katedry) z pliku "
+        "CSV, zapisując zbiorczo jednostki dodane, zmienione i przeniesione."
+    )
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument("path", help="Plik CSV struktury organizacyjnej.")
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Usuń jednostki nieobecne w pliku.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Wyświetl zmiany bez zapisywania ich w bazie danych.",
+        )
+        parser.add_argument(
+            "--export",
+            action="store_true",
+            help="Zapisz bieżącą strukturę do pliku zamiast ją importować.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        try:
+            if options["export"]:
+                with open(options["path"], "w", newline="", encoding="utf-8") as f:
+                    orgchart.write_csv(f)
+                self.stdout.write(self.style.SUCCESS("Wyeksportowano strukturę."))
+                return
+
+            with open(options["path"], newline="", encoding="utf-8-sig") as f:
+                chart = orgchart.Import(orgchart.read_csv(f))
+        except (OSError, UnicodeError, csv.Error) as error:
+            raise CommandError(error)
+
+        if chart.errors:
+            for error in chart.errors:
+                self.stderr.write(error)
+            raise CommandError("Nie zaimportowano struktury z powodu błędów.")
+
+        if options["dry_run"]:
+            created, updated, deleted = chart.changes()
+        else:
+            created, updated, deleted = chart.apply(
+                options["delete"], options["batch_size"]
+            )
+
+        for change in updated:
+            self.stdout.write(f"{change.previous} -> {change.path}: {change.name}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Dodano {}, zmieniono {}, {} {} jednostek.".format(
+                    len(created),
+                    len(updated),
+                    "usunięto" if options["delete"] else "pominięto",
+                    len(deleted),
+                )
+            )
+        )
+        if options["dry_run"]:
+            self.stdout.write("Tryb próbny: nie zapisano zmian.")
@@ -0,0 +1,66 @@
+import xml.etree.ElementTree as ET
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.employees import names
+from apps.outputs.elements.patents import importers
+from base.utils import chunked
+
+
+class Command(BaseCommand):
+    """Import the patents from a patent-office XML bulk file."""
+
+    help = "Importuje patenty z pliku XML urzędu patentowego."
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument("path", help="Plik XML z danymi patentów.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Liczba patentów zapisywanych w jednej transakcji.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Importuj plik od początku, pomijając zapisany punkt kontrolny.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        try:
+            checkpoint = importers.Checkpoint(options["path"])
+        except OSError as error:
+            raise CommandError(error)
+
+        done = 0 if options["restart"] else checkpoint.load()
+        if done:
+            self.stdout.write(f"Wznawianie importu od rekordu {done}.")
+
+        index = names.get_index()
+        totals = [0, 0, 0]
+        records = importers.parse(options["path"])
+
+        try:
+            # Skip the records imported before the interruption (still parsing
+            # them one by one, so that the memory use stays flat)
+            for _ in zip(range(done), records):
+                pass
+
+            for batch in chunked(records, options["batch_size"]):
+                counts = importers.upsert(batch, index)
+                totals = [total + count for total, count in zip(totals, counts)]
+                done += len(batch)
+                checkpoint.save(done)
+                self.stdout.write(f"Przetworzono {done} rekordów.")
+        except (OSError, ET.ParseError) as error:
+            raise CommandError(f"Nie można odczytać pliku XML: {error}")
+
+        checkpoint.clear()
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Dodano {} i zaktualizowano {} patentów; "
+                "przypisano {} udziałów pracowników.".format(*totals)
+            )
+        )
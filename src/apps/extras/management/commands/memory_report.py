@@ -0,0 +1,62 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base import preload
+
+
+class Command(BaseCommand):
+    """Report the memory used by the processes, e.g. the WSGI workers."""
+
+    help = (
+        "Wyświetla pamięć (RSS, PSS, USS i współdzieloną) procesów, np. procesów "
+        "roboczych serwera WSGI, wskazanych wprost lub jako potomne procesu."
+    )
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "pids", nargs="*", type=int, help="Identyfikatory procesów."
+        )
+        parser.add_argument(
+            "--parent",
+            type=int,
+            help="Identyfikator procesu, którego procesy potomne są raportowane.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        if not os.path.exists("/proc/self/smaps_rollup"):
+            raise CommandError("Raport wymaga pliku /proc/<pid>/smaps_rollup (Linux).")
+
+        pids = options["pids"]
+        if options["parent"]:
+            pids += preload.children(options["parent"])
+        if not pids:
+            raise CommandError("Nie wskazano procesów.")
+
+        columns = ("rss", "pss", "uss", "shared")
+        totals = dict.fromkeys(columns, 0)
+        self.stdout.write(f"{'PID':>8}" + "".join(f"{c.upper():>12}" for c in columns))
+        for pid in pids:
+            try:
+                usage = preload.memory_usage(pid)
+            except OSError as error:
+                self.stderr.write(f"{pid}: {error}")
+                continue
+            for column in columns:
+                totals[column] += usage[column]
+            self.stdout.write(
+                f"{pid:>8}" + "".join(f"{usage[c] / 1024:>10.1f}MB" for c in columns)
+            )
+        self.stdout.write(
+            f"{'Razem':>8}" + "".join(f"{totals[c] / 1024:>10.1f}MB" for c in columns)
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Pamięć wyłączna (USS) procesów: {:.1f} MB, łącznie z udziałem w "
+                "pamięci współdzielonej (PSS): {:.1f} MB.".format(
+                    totals["uss"] / 1024, totals["pss"] / 1024
+                )
+            )
+        )
@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.outputs.contributions import optimizer
+
+
+class Command(BaseCommand):
+    """Select the best set of contributions of a discipline for the evaluation."""
+
+    help = "Wybiera optymalny zestaw osiągnięć dyscypliny zgłaszanych do ewaluacji."
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument("discipline", help="Nazwa dyscypliny.")
+        parser.add_argument(
+            "--employees",
+            type=int,
+            nargs="+",
+            help="Identyfikatory pracowników (domyślnie: wszyscy).",
+        )
+        parser.add_argument(
+            "--slots",
+            type=float,
+            help="Limit slotów dyscypliny (domyślnie: %d na pracownika)."
+            % optimizer.DISCIPLINE_SLOTS_PER_EMPLOYEE,
+        )
+        parser.add_argument("--year-from", type=int, help="Pierwszy rok okresu.")
+        parser.add_argument("--year-to", type=int, help="Ostatni rok okresu.")
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        filters = {}
+        if options["year_from"]:
+            filters["output__year__gte"] = options["year_from"]
+        if options["year_to"]:
+            filters["output__year__lte"] = options["year_to"]
+
+        start = time.perf_counter()
+        result = optimizer.optimize(
+            options["discipline"],
+            employees=options["employees"],
+            discipline_slots=options["slots"],
+            **filters,
+        )
+
+        for selection in sorted(
+            result.selections, key=lambda s: (not s.selected, s.employee, s.pk)
+        ):
+            self.stdout.write(
+                "{} {:<32} pracownik={:<6} osiągnięcie={:<8} "
+                "udział={:.4f} punkty={:.2f} wartość krańcowa={}".format(
+                    "+" if selection.selected else " ",
+                    str(selection.model._meta.verbose_name),
+                    selection.employee,
+                    selection.output,
+                    selection.share,
+                    selection.points,
+                    "-"
+                    if selection.marginal is None
+                    else "{:.2f}".format(selection.marginal),
+                )
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "{}: {:.2f} pkt, {:.4f} slotów ({:.2f} s)".format(
+                    result.discipline,
+                    result.points,
+                    result.slots,
+                    time.perf_counter() - start,
+                )
+            )
+        )
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.outputs.contributions import aggregates
+
+
+class Command(BaseCommand):
+    """Recompute the aggregates of the contributions from scratch."""
+
+    help = "Przelicza od nowa zagregowany dorobek jednostek w poszczególnych latach."
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Liczba jednostek przeliczanych w jednej transakcji.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        start = time.perf_counter()
+        aggregates.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Przeliczono agregaty ({:.2f} s).".format(time.perf_counter() - start)
+            )
+        )
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.outputs.elements.projects import funding
+
+
+class Command(BaseCommand):
+    """Recompute the monthly funding series of all the projects."""
+
+    help = "Przelicza miesięczne finansowanie wszystkich projektów w jednostkach."
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Liczba projektów przeliczanych w jednej transakcji.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        start = time.perf_counter()
+        funding.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Przeliczono finansowanie projektów ({:.2f} s).".format(
+                    time.perf_counter() - start
+                )
+            )
+        )
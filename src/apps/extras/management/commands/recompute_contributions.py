@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.outputs.contributions import engine
+
+
+class Command(BaseCommand):
+    """Recompute the shares and points of all the contributions."""
+
+    help = (
+        "Przelicza udziały i punkty wszystkich pracowników we wszystkich osiągnięciach."
+    )
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Liczba wierszy zapisywanych w jednym zapytaniu.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        for model in engine.contribution_models():
+            start = time.perf_counter()
+            changed = engine.recompute(model, batch_size=options["batch_size"])
+            self.stdout.write(
+                "{}: {} zmienionych ({:.2f} s)".format(
+                    model._meta.verbose_name_plural,
+                    len(changed),
+                    time.perf_counter() - start,
+                )
+            )
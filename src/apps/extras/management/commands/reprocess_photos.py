@@ -0,0 +1,107 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Q
+
+from apps.accounts import photos
+from apps.accounts.models import User
+from apps.extras import counters
+
+CHECKPOINT_PATH = settings.DATA_ROOT / "reprocess_photos.checkpoint"
+
+
+class Command(BaseCommand):
+    """Process the users' photos again and regenerate their icons."""
+
+    help = (
+        "Ponownie przetwarza zdjęcia użytkowników i generuje ich ikony "
+        "(np. po zmianie rozmiarów), bez wysyłania sygnałów zapisu."
+    )
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Liczba zdjęć przetwarzanych w jednej partii.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Liczba procesów przetwarzających; domyślnie liczba procesorów.",
+        )
+        parser.add_argument(
+            "--throttle",
+            type=float,
+            default=0,
+            help="Przerwa (w sekundach) po każdej partii, aby odciążyć serwer.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Przetwarzaj od początku, pomijając zapisany punkt kontrolny.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        last_pk = 0 if options["restart"] else self.load_checkpoint()
+        if last_pk:
+            self.stdout.write(f"Wznawianie od użytkownika o ID > {last_pk}.")
+
+        users = User.objects.exclude(Q(photo="") | Q(photo__isnull=True))
+        done = failed = 0
+
+        # The workers must not inherit the open database connections
+        connections.close_all()
+        with ProcessPoolExecutor(options["workers"]) as executor:
+            while rows := list(
+                users.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "photo", "icon")[: options["batch_size"]]
+            ):
+                icons = []
+                for pk, icon, error in executor.map(
+                    photos.reprocess, photos.reprocess_jobs(rows)
+                ):
+                    if error:
+                        failed += 1
+                        self.stderr.write(f"Użytkownik {pk}: {error}")
+                    elif icon:
+                        icons.append(User(pk=pk, icon=icon))
+
+                # Save the new icons without sending the signals
+                User.objects.bulk_update(icons, ["icon"])
+                counters.bump(User)
+
+                done += len(rows)
+                last_pk = rows[-1][0]
+                self.save_checkpoint(last_pk)
+                self.stdout.write(f"Przetworzono {done} zdjęć.")
+                time.sleep(options["throttle"])
+
+        if os.path.exists(CHECKPOINT_PATH):
+            os.remove(CHECKPOINT_PATH)
+        self.stdout.write(
+            self.style.SUCCESS(f"Przetworzono {done} zdjęć, w tym {failed} z błędami.")
+        )
+
+    def load_checkpoint(self):
+        """Return the PK of the last user processed before the interruption."""
+        try:
+            with open(CHECKPOINT_PATH) as file:
+                return json.load(file)["last_pk"]
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def save_checkpoint(self, last_pk):
+        """Save the PK of the last user processed."""
+        os.makedirs(CHECKPOINT_PATH.parent, exist_ok=True)
+        with open(f"{CHECKPOINT_PATH}.tmp", "w") as file:
+            json.dump({"last_pk": last_pk}, file)
+        os.replace(f"{CHECKPOINT_PATH}.tmp", CHECKPOINT_PATH)
@@ -0,0 +1,60 @@
+from multiprocessing import Process
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.extras import jobs
+
+
+class Command(BaseCommand):
+    """Run the workers processing the queued admin actions."""
+
+    help = (
+        "Uruchamia procesy wykonujące zadania z kolejki akcji panelu administracyjnego."
+    )
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "--workers", type=int, default=1, help="Liczba procesów roboczych."
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=2,
+            help="Odstęp (w sekundach) sprawdzania kolejki, gdy jest pusta.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Wykonaj zadania z kolejki i zakończ, zamiast czekać na nowe.",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=600,
+            help=(
+                "Czas (w sekundach) bezczynności, po którym zadanie w toku jest "
+                "ponownie dodawane do kolejki."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        if requeued := jobs.requeue_stale(options["stale_after"]):
+            self.stdout.write(f"Ponownie dodano do kolejki zadań: {requeued}.")
+
+        # The workers must not share the database connections
+        connections.close_all()
+        workers = [
+            Process(
+                target=jobs.work,
+                args=(options["poll"], options["once"], options["stale_after"]),
+            )
+            for _ in range(options["workers"])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(self.style.SUCCESS(f"Uruchomiono procesy: {len(workers)}."))
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.extras import notifications
+
+
+class Command(BaseCommand):
+    """Send the digests of the queued notifications."""
+
+    help = (
+        "Wysyła odbiorcom zbiorcze powiadomienia o obiektach oczekujących na "
+        "zatwierdzenie, zatwierdzonych i niezatwierdzonych."
+    )
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="Odstęp (w sekundach) między kolejnymi powiadomieniami zbiorczymi.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Wyślij zaległe powiadomienia i zakończ, zamiast czekać na nowe.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        if not options["once"]:
+            self.stdout.write(self.style.SUCCESS("Uruchomiono wysyłanie powiadomień."))
+            notifications.work(options["interval"])
+            return
+
+        sent, failed = notifications.send()
+        if failed:
+            self.stderr.write(
+                f"Nie wysłano {failed} powiadomień; zostaną wysłane później."
+            )
+        self.stdout.write(self.style.SUCCESS(f"Wysłano {sent} powiadomień."))
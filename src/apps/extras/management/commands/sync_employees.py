@@ -0,0 +1,58 @@
+import csv
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.employees import hr
+
+
+class Command(BaseCommand):
+    """Synchronize the employees with the HR system export."""
+
+    help = (
+        "Synchronizuje pracowników z eksportem systemu kadrowego, zapisując "
+        "wyłącznie zmiany od ostatniej synchronizacji."
+    )
+
+    def add_arguments(self, parser):
+        """Define the command arguments."""
+        parser.add_argument("path", help="Plik CSV eksportu kadrowego.")
+        parser.add_argument(
+            "--date",
+            type=datetime.date.fromisoformat,
+            help="Data obowiązywania eksportu (RRRR-MM-DD); domyślnie dzisiejsza.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Wyświetl zmiany bez zapisywania ich w bazie danych.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        sync = hr.Sync(options["date"])
+        try:
+            sync.feed(hr.read_csv(options["path"]))
+        except (OSError, UnicodeError, csv.Error) as error:
+            raise CommandError(error)
+
+        # An empty or misread export would end the employment of everyone
+        if not sync.seen:
+            raise CommandError("Eksport nie zawiera żadnego pracownika.")
+
+        if options["dry_run"]:
+            changes = sync.changes()
+        else:
+            changes = sync.apply(options["batch_size"])
+
+        for hr_id in sync.skipped:
+            self.stderr.write(f"Nieznana jednostka pracownika {hr_id}; pominięto.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Dodano {}, zaktualizowano {}, zakończono zatrudnienie {}, "
+                "bez zmian {}, pominięto {} pracowników.".format(*changes)
+            )
+        )
+        if options["dry_run"]:
+            self.stdout.write("Tryb próbny: nie zapisano zmian.")
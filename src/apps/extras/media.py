@@ -0,0 +1,180 @@
+"""Garbage collection of the media files no longer referenced by any object.
+
+Both the files found in the upload directories and the file names stored in the
+database are streamed into a temporary SQLite database, which computes their
+differences on disk, so that the memory used does not depend on the number of
+the files. The orphaned files are then deleted or moved to a quarantine
+directory by a pool of threads.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+from base.utils import chunked
+
+# Number of the rows inserted into the temporary database at once
+BATCH_SIZE = 10000
+
+# Number of the threads removing the files
+WORKERS = 8
+
+
+def file_fields():
+    """Generate the (model, field) pairs of all the file fields."""
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+def upload_dirs():
+    """Return the set of the directories the files are uploaded to."""
+    dirs = set()
+    for _, field in file_fields():
+        if callable(field.upload_to):
+            path = field.upload_to(None, "file")
+        else:
+            # Drop the date-based part of the path, if any
+            path = field.upload_to.partition("%")[0] + "file"
+        dirs.add(os.path.dirname(path))
+    return dirs
+
+
+def scan(root, directory):
+    """Generate the names and modification times of the files in the directory."""
+    stack = [os.path.join(root, directory)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    name = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                    yield name, entry.stat(follow_symlinks=False).st_mtime
+
+
+def references():
+    """Generate the file names stored in the database, with their objects."""
+    for model, field in file_fields():
+        label = f"{model._meta.label}.{field.name}"
+        for pk, name in (
+            model.objects.exclude(**{field.name: ""})
+            .exclude(**{f"{field.name}__isnull": True})
+            .order_by()
+            .values_list("pk", field.name)
+            .iterator(chunk_size=BATCH_SIZE)
+        ):
+            yield name, label, pk
+
+
+class Scan:
+    """A class to represent the comparison of the media files with the database."""
+
+    def __init__(self, root=None, dirs=None):
+        """Overwrite the base constructor."""
+        self.root = str(root or settings.MEDIA_ROOT)
+        self.dirs = sorted(dirs or upload_dirs())
+        self.file = tempfile.NamedTemporaryFile(suffix=".sqlite3")
+        self.db = sqlite3.connect(self.file.name)
+        self.db.executescript(
+            """
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE files (name TEXT PRIMARY KEY, mtime REAL) WITHOUT ROWID;
+            CREATE TABLE refs (name TEXT, label TEXT, pk TEXT);
+            """
+        )
+
+    def __enter__(self):
+        """Enter the context."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit the context, removing the temporary database."""
+        self.db.close()
+        self.file.close()
+
+    def load(self):
+        """Load the file names and the references; return their counts."""
+        files = refs = 0
+        for directory in self.dirs:
+            for batch in chunked(scan(self.root, directory), BATCH_SIZE):
+                self.db.executemany("INSERT OR IGNORE INTO files VALUES (?, ?)", batch)
+                files += len(batch)
+        for batch in chunked(references(), BATCH_SIZE):
+            self.db.executemany(
+                "INSERT INTO refs VALUES (?, ?, ?)",
+                [(name, label, str(pk)) for name, label, pk in batch],
+            )
+            refs += len(batch)
+        self.db.execute("CREATE INDEX refs_name ON refs (name)")
+        return files, refs
+
+    def orphans(self, min_age=0):
+        """Generate the names of the files not referenced, older than `min_age` s."""
+        yield from (
+            name
+            for (name,) in self.db.execute(
+                """
+                SELECT name FROM files
+                WHERE mtime < ? AND NOT EXISTS (
+                    SELECT 1 FROM refs WHERE refs.name = files.name
+                )
+                """,
+                [time.time() - min_age],
+            )
+        )
+
+    def missing(self):
+        """Generate the (name, label, PK) of the references to missing files."""
+        yield from (
+            row
+            for row in self.db.execute(
+                """
+                SELECT name, label, pk FROM refs
+                WHERE NOT EXISTS (SELECT 1 FROM files WHERE files.name = refs.name)
+                """
+            )
+            if self.in_dirs(row[0])
+        )
+
+    def in_dirs(self, name):
+        """Check if the file is in any of the directories scanned."""
+        return any(
+            not directory or name.startswith(f"{directory}/") for directory in self.dirs
+        )
+
+
+def remove(root, names, quarantine=None):
+    """Delete the files or move them to the quarantine; return the number removed."""
+
+    def remove_file(name):
+        path = os.path.join(root, name)
+        try:
+            if quarantine:
+                target = os.path.join(quarantine, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(path, target)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            return 0
+        return 1
+
+    removed = 0
+    with ThreadPoolExecutor(WORKERS) as executor:
+        for batch in chunked(names, BATCH_SIZE):
+            removed += sum(executor.map(remove_file, batch))
+    return removed
@@ -0,0 +1,188 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.utils.translation import gettext_lazy as _
+
+from base.options import models
+
+
+class Job(models.Model):
+    """A class to represent Job objects, i.e. the queued admin actions."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    content_type = models.ForeignKey(
+        to=ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("typ obiektów"),
+    )
+    action = models.CharField(_("akcja"), max_length=255)
+    description = models.CharField(_("opis"), max_length=255)
+    object_ids = models.JSONField(_("identyfikatory obiektów"), default=list)
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        verbose_name=_("zlecający"),
+        blank=True,
+        null=True,
+    )
+    status = models.CharField(
+        _("status"),
+        max_length=16,
+        choices=[
+            (QUEUED, _("w kolejce")),
+            (RUNNING, _("w toku")),
+            (DONE, _("zakończone")),
+            (FAILED, _("błąd")),
+        ],
+        default=QUEUED,
+    )
+    total = models.PositiveIntegerField(_("liczba obiektów"), default=0)
+    progress = models.PositiveIntegerField(_("przetworzone obiekty"), default=0)
+    messages = models.JSONField(_("komunikaty"), default=list)
+    error = models.TextField(_("błąd"), blank=True)
+    worker = models.CharField(_("proces"), max_length=255, blank=True)
+    created_at = models.DateTimeField(_("utworzone"), auto_now_add=True)
+    started_at = models.DateTimeField(_("rozpoczęte"), blank=True, null=True)
+    finished_at = models.DateTimeField(_("zakończone"), blank=True, null=True)
+    updated_at = models.DateTimeField(_("ostatnia aktywność"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("zadanie")
+        verbose_name_plural = _("zadania")
+        indexes = [models.Index(fields=["status", "id"])]
+
+    def __str__(self):
+        """Define how to print the object."""
+        return f"#{self.pk}: {self.description}"
+
+
+class ChangeCounter(models.Model):
+    """A class to represent ChangeCounter objects, i.e. the models' versions.
+
+    The counter of a model is incremented whenever any of its objects changes,
+    see the `counters` module.
+    """
+
+    content_type = models.OneToOneField(
+        to=ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("typ obiektów"),
+    )
+    version = models.PositiveBigIntegerField(_("wersja"), default=0)
+    changed_at = models.DateTimeField(_("ostatnia zmiana"), blank=True, null=True)
+
+    class Meta:
+        verbose_name = _("licznik zmian")
+        verbose_name_plural = _("liczniki zmian")
+
+    def __str__(self):
+        """Define how to print the object."""
+        return f"{self.content_type}: {self.version}"
+
+
+class AuditEntry(models.Model):
+    """A class to represent AuditEntry objects, i.e. the audit log of the admin.
+
+    The entries are only ever appended, in bulk, see the `audit` module.
+    """
+
+    ADDITION = "addition"
+    CHANGE = "change"
+    DELETION = "deletion"
+    APPROVAL = "approval"
+    DISAPPROVAL = "disapproval"
+
+    content_type = models.ForeignKey(
+        to=ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("typ obiektu"),
+    )
+    object_id = models.CharField(_("identyfikator obiektu"), max_length=64)
+    object_repr = models.CharField(_("obiekt"), max_length=255)
+    action = models.CharField(
+        _("akcja"),
+        max_length=16,
+        choices=[
+            (ADDITION, _("dodanie")),
+            (CHANGE, _("zmiana")),
+            (DELETION, _("usunięcie")),
+            (APPROVAL, _("zatwierdzenie")),
+            (DISAPPROVAL, _("cofnięcie zatwierdzenia")),
+        ],
+    )
+    changes = models.JSONField(_("zmiany"), default=list, blank=True)
+    user = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        verbose_name=_("użytkownik"),
+        blank=True,
+        null=True,
+    )
+    created_at = models.DateTimeField(_("czas"))
+    repeated = models.PositiveIntegerField(
+        _("liczba powtórzeń"),
+        default=1,
+        help_text=_("Liczba wpisów połączonych w ten wpis przez kompaktowanie."),
+    )
+
+    class Meta:
+        verbose_name = _("wpis audytu")
+        verbose_name_plural = _("wpisy audytu")
+        indexes = [
+            models.Index(fields=["content_type", "object_id", "created_at"]),
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __str__(self):
+        """Define how to print the object."""
+        return f"{self.get_action_display()}: {self.object_repr}"
+
+
+class Notification(models.Model):
+    """A class to represent Notification objects, i.e. the queued e-mail events.
+
+    The events of each recipient are sent together in digests by the
+    `send_notifications` worker, see the `notifications` module.
+    """
+
+    PENDING = "pending"
+    APPROVED = "approved"
+    DISAPPROVED = "disapproved"
+
+    recipient = models.ForeignKey(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        verbose_name=_("odbiorca"),
+        related_name="notifications",
+    )
+    event = models.CharField(
+        _("zdarzenie"),
+        max_length=16,
+        choices=[
+            (PENDING, _("oczekuje na zatwierdzenie")),
+            (APPROVED, _("zatwierdzony")),
+            (DISAPPROVED, _("niezatwierdzony")),
+        ],
+    )
+    content_type = models.ForeignKey(
+        to=ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("typ obiektu"),
+    )
+    object_id = models.CharField(_("identyfikator obiektu"), max_length=64)
+    object_repr = models.CharField(_("obiekt"), max_length=255)
+    created_at = models.DateTimeField(_("utworzone"), auto_now_add=True)
+    sent_at = models.DateTimeField(_("wysłane"), blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(_("próby wysłania"), default=0)
+
+    class Meta:
+        verbose_name = _("powiadomienie")
+        verbose_name_plural = _("powiadomienia")
+        indexes = [models.Index(fields=["sent_at", "recipient"])]
+
+    def __str__(self):
+        """Define how to print the object."""
+        return f"{self.object_repr}: {self.get_event_display()}"
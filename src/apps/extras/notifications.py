@@ -0,0 +1,295 @@
+"""Queue of the e-mail notifications of the approval events, sent in digests.
+
+The objects created awaiting the approval are notified to the staff allowed to
+approve them, and the objects approved or disapproved to their authors. The
+events are queued once the transaction commits, with a few queries per model
+and event, however many objects. The `send_notifications` worker then sends
+each recipient a single digest of the events queued since the previous one,
+all of the digests over a single connection of the e-mail backend, retried
+with a growing delay if the connection fails. A digest refused by the server
+(e.g. for the recipient's address) is skipped, and sent again with the next
+digests, until the notifications' attempts run out. The notifications are
+locked while their digests are sent, so that the runs of the worker at the same
+time send each of them once.
+"""
+
+import logging
+import smtplib
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_permission_codename, get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F, Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+from base.options import models, transaction
+
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+# Number of the digests sent at once
+BATCH_SIZE = 500
+
+# Errors of a single message (unlike those of the connection)
+MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+def approval_models():
+    """Return the models whose objects require the approval."""
+    return [
+        model
+        for model in apps.get_models()
+        if issubclass(model, models.Model) and model.requires_approval()
+    ]
+
+
+def _queue(pending):
+    """Queue the notifications of the pending events, keyed by model and event."""
+    notifications = []
+    for (model, event), pks in pending.items():
+        content_type = ContentType.objects.get_for_model(model)
+        objects = model._base_manager.in_bulk(pks)
+        if event == Notification.PENDING:
+            approvers = staff(model)
+            recipients = {pk: approvers for pk in objects}
+        else:
+            recipients = authors(model, pks)
+        notifications += [
+            Notification(
+                recipient_id=user_id,
+                event=event,
+                content_type=content_type,
+                object_id=str(pk),
+                object_repr=str(obj)[:255],
+            )
+            for pk, obj in objects.items()
+            for user_id in recipients.get(pk, ())
+        ]
+    Notification.objects.bulk_create(notifications, batch_size=BATCH_SIZE)
+
+
+_buffer = transaction.CommitBuffer(_queue)
+
+
+def schedule(model, event, pks):
+    """Queue the notifications of the event of the objects, once committed."""
+    if pks:
+        _buffer.add((model, event), pks)
+
+
+def staff(model):
+    """Return the set of the IDs of the active staff allowed to approve the objects."""
+    lookups = {
+        "content_type": ContentType.objects.get_for_model(model),
+        "codename": get_permission_codename("change", model._meta),
+    }
+    return set(
+        get_user_model()
+        .objects.filter(
+            Q(is_superuser=True)
+            | Q(**{f"user_permissions__{k}": v for k, v in lookups.items()})
+            | Q(**{f"groups__permissions__{k}": v for k, v in lookups.items()}),
+            is_active=True,
+            is_staff=True,
+        )
+        .exclude(email="")
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+
+
+def authors(model, pks):
+    """Return the sets of the IDs of the authors' active users, by object."""
+    from apps.outputs.contributions import engine
+
+    result = defaultdict(set)
+    if (contribution_model := engine.contribution_model_for(model)) is not None:
+        for output, user in (
+            contribution_model.objects.filter(
+                output__in=pks, employee__user__is_active=True
+            )
+            .exclude(employee__user__email="")
+            .values_list("output", "employee__user")
+        ):
+            result[output].add(user)
+    return result
+
+
+def digest(recipient, notifications):
+    """Return the e-mail message of the recipient's notifications."""
+    # Each event of an object is listed once
+    events = {
+        (n.content_type_id, n.object_id, n.event): n for n in notifications
+    }.values()
+    lines = [_("Zmiany w obiektach wymagających zatwierdzenia:"), ""]
+    for notification in events:
+        model = notification.content_type.model_class()
+        lines += [
+            "- %s „%s”: %s"
+            % (
+                capfirst(model._meta.verbose_name),
+                notification.object_repr,
+                notification.get_event_display(),
+            ),
+            "  %s%s"
+            % (
+                settings.NOTIFICATIONS_BASE_URL,
+                reverse(
+                    "admin:%s_%s_change"
+                    % (model._meta.app_label, model._meta.model_name),
+                    args=[notification.object_id],
+                ),
+            ),
+        ]
+    return EmailMessage(
+        subject=_("Powiadomienia: %d zmian") % len(events),
+        body="\n".join(lines),
+        to=[recipient.email],
+    )
+
+
+def deliver(connection, messages):
+    """Send the messages over the connection; return the indices of those sent.
+
+    The sets of the indices of the messages sent and refused are returned. A
+    message refused (e.g. for its recipient) or failing otherwise is skipped;
+    the missing messages (None) are counted as refused. If the connection
+    fails, it is opened again after a delay, doubled on each failure, and the
+    messages not sent yet are sent, at most `settings.NOTIFICATIONS_RETRIES`
+    times.
+    """
+    sent, refused, failures = set(), set(), 0
+    delay = settings.NOTIFICATIONS_RETRY_DELAY
+    while len(sent) + len(refused) < len(messages):
+        try:
+            connection.open()
+            for index in range(len(sent) + len(refused), len(messages)):
+                count = 0
+                try:
+                    if messages[index] is not None:
+                        count = connection.send_messages([messages[index]])
+                except MESSAGE_ERRORS:
+                    pass
+                except (smtplib.SMTPException, OSError):
+                    raise
+                except Exception:
+                    logger.exception("Failed to send the notifications' digest.")
+                (sent if count else refused).add(index)
+        except (smtplib.SMTPException, OSError):
+            connection.close()
+            if (failures := failures + 1) > settings.NOTIFICATIONS_RETRIES:
+                break
+            time.sleep(delay)
+            delay *= 2
+    return sent, refused
+
+
+def pending():
+    """Return the queryset of the notifications to be sent."""
+    return Notification.objects.filter(
+        sent_at__isnull=True, attempts__lt=settings.NOTIFICATIONS_ATTEMPTS
+    )
+
+
+def _digest(recipient, notifications):
+    """Return the e-mail message of the recipient's notifications, or None."""
+    try:
+        return digest(recipient, notifications)
+    except Exception:
+        logger.exception("Failed to compose the notifications' digest.")
+        return None
+
+
+def send(connection=None):
+    """Send the digests of the queued notifications; return the numbers of them.
+
+    The numbers of the digests sent and not sent (e.g. if the backend is down)
+    are returned. The notifications not sent are attempted again with the next
+    digests, at most `settings.NOTIFICATIONS_ATTEMPTS` times.
+    """
+    sent, failed, last = 0, 0, None
+    connection = connection or get_connection()
+    try:
+        while recipients := list(
+            pending()
+            .filter(**({} if last is None else {"recipient__gt": last}))
+            .order_by("recipient")
+            .values_list("recipient", flat=True)
+            .distinct()[:BATCH_SIZE]
+        ):
+            last = recipients[-1]
+            with transaction.atomic():
+                # The notifications being sent by another run are skipped
+                pks = list(
+                    pending()
+                    .filter(recipient__in=recipients)
+                    .select_for_update(skip_locked=True)
+                    .values_list("pk", flat=True)
+                )
+                queued = defaultdict(list)
+                for notification in (
+                    Notification.objects.filter(pk__in=pks)
+                    .select_related("recipient", "content_type")
+                    .order_by("recipient", "created_at")
+                ):
+                    queued[notification.recipient].append(notification)
+                batch = list(queued.items())
+
+                delivered, refused = deliver(
+                    connection, [_digest(*item) for item in batch]
+                )
+                Notification.objects.filter(
+                    pk__in=[n.pk for i in delivered for n in batch[i][1]]
+                ).update(sent_at=timezone.now())
+                Notification.objects.filter(
+                    pk__in=[
+                        n.pk
+                        for i, (_user, notifications) in enumerate(batch)
+                        if i not in delivered
+                        for n in notifications
+                    ]
+                ).update(attempts=F("attempts") + 1)
+            sent += len(delivered)
+            failed += len(batch) - len(delivered)
+
+            # The backend is unavailable; the rest is sent with the next digests
+            if len(delivered) + len(refused) < len(batch):
+                failed += (
+                    pending()
+                    .filter(recipient__gt=last)
+                    .values("recipient")
+                    .distinct()
+                    .count()
+                )
+                break
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def work(interval=None, once=False):
+    """Send the digests every interval (in seconds), or once if `once` is set."""
+    interval = interval or settings.NOTIFICATIONS_DIGEST_INTERVAL
+    while True:
+        try:
+            send()
+        except Exception:
+            # The worker goes on; the notifications are sent with the next digests
+            if once:
+                raise
+            logger.exception("Failed to send the notifications.")
+        if once:
+            return
+        time.sleep(interval)
@@ -0,0 +1,33 @@
+from django.db.models import signals
+
+from base.options.decorators import bulk_receiver
+
+from . import counters, notifications
+from .models import Notification
+
+
+@bulk_receiver
+def bump_counter(sender, **kwargs):
+    """Count the change of the object saved or deleted."""
+    if kwargs.get("update_fields") == frozenset():
+        return  # saved with no field changed
+    counters.bump(sender)
+
+
+for model in counters.tracked_models():
+    signals.post_save.connect(bump_counter, sender=model)
+    signals.post_delete.connect(bump_counter, sender=model)
+
+
+def notify_approval(sender, instance, created, **kwargs):
+    """Notify the objects awaiting the approval, approved or disapproved."""
+    if created:
+        if not instance.approved:
+            notifications.schedule(sender, Notification.PENDING, [instance.pk])
+    elif instance.has_changed(sender.APPROVAL_STATUS_FIELD_NAME):
+        event = Notification.APPROVED if instance.approved else Notification.DISAPPROVED
+        notifications.schedule(sender, event, [instance.pk])
+
+
+for model in notifications.approval_models():
+    signals.post_save.connect(notify_approval, sender=model)
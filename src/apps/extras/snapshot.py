@@ -0,0 +1,477 @@
+"""Denormalized, read-only snapshot of the data in a local SQLite file.
+
+The units (with their hierarchy paths), users, employees, outputs and
+contributions are streamed from the database into the flat, indexed tables of
+the snapshot, which the analysts query on their own machines.
+
+The snapshot is refreshed incrementally. The tables whose models have not
+changed since the previous export (see the `counters` module) are skipped. The
+others are compared with the database by the hashes of their rows: both the
+rows read from the database and the rows of the snapshot are ordered by their
+keys and merged, so that only the rows added, changed or removed are written
+and the memory used does not depend on the number of the rows. The snapshot is
+refreshed within a single transaction, so it is never seen half-written.
+"""
+
+import datetime
+import decimal
+import hashlib
+import sqlite3
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+
+from apps.employees.index import get_index
+from apps.employees.models import Employee, Employment
+from apps.units.models import Department, Faculty, University
+from base.utils import chunked
+
+from . import counters
+
+# Number of the rows read from the database and written to the snapshot at once
+BATCH_SIZE = 10000
+
+Table = namedtuple(
+    "Table", ["name", "columns", "key", "indexes", "models", "rows", "daily"]
+)
+
+
+def _value(value):
+    """Return the value as stored by SQLite."""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return value
+
+
+def _output_models():
+    """Return the sorted (output type, output model, contribution model) triples."""
+    from apps.outputs.contributions.engine import contribution_models
+
+    return sorted(
+        (
+            (
+                model._meta.get_field("output").related_model._meta.model_name,
+                model._meta.get_field("output").related_model,
+                model,
+            )
+            for model in contribution_models()
+        ),
+        key=lambda triple: triple[0],
+    )
+
+
+def _department_paths():
+    """Return the (faculty, university, path) of the departments, keyed by PKs."""
+    return {
+        pk: (faculty, university, "/".join(abbrs))
+        for pk, faculty, university, *abbrs in Department.objects.values_list(
+            "pk",
+            "ancestor",
+            "ancestor__ancestor",
+            "ancestor__ancestor__abbr",
+            "ancestor__abbr",
+            "abbr",
+        )
+    }
+
+
+def unit_rows():
+    """Generate the rows of the units of all the levels."""
+    for pk, name, abbr, faculty, university, *abbrs in (
+        Department.objects.order_by("pk")
+        .values_list(
+            "pk",
+            "name",
+            "abbr",
+            "ancestor",
+            "ancestor__ancestor",
+            "ancestor__ancestor__abbr",
+            "ancestor__abbr",
+            "abbr",
+        )
+        .iterator(BATCH_SIZE)
+    ):
+        yield "department", pk, name, abbr, faculty, university, "/".join(abbrs)
+    for pk, name, abbr, university, *abbrs in (
+        Faculty.objects.order_by("pk")
+        .values_list("pk", "name", "abbr", "ancestor", "ancestor__abbr", "abbr")
+        .iterator(BATCH_SIZE)
+    ):
+        yield "faculty", pk, name, abbr, None, university, "/".join(abbrs)
+    for pk, name, abbr in (
+        University.objects.order_by("pk")
+        .values_list("pk", "name", "abbr")
+        .iterator(BATCH_SIZE)
+    ):
+        yield "university", pk, name, abbr, None, None, abbr
+
+
+def user_rows():
+    """Generate the rows of the users (with no credentials)."""
+    yield from (
+        get_user_model()
+        .objects.order_by("pk")
+        .values_list(
+            "pk",
+            "username",
+            "first_name",
+            "last_name",
+            "email",
+            "is_active",
+            "is_staff",
+            "date_joined",
+            "last_login",
+        )
+        .iterator(BATCH_SIZE)
+    )
+
+
+def employee_rows():
+    """Generate the rows of the employees, with their current departments."""
+    paths, today = _department_paths(), datetime.date.today()
+    for batch in chunked(
+        Employee.objects.order_by("pk")
+        .values_list("pk", "first_name", "last_name", "user", "hr_id", "is_active")
+        .iterator(BATCH_SIZE),
+        BATCH_SIZE,
+    ):
+        departments = get_index().departments_as_of([(row[0], today) for row in batch])
+        for row, department in zip(batch, departments):
+            yield (*row, department, *paths.get(department, (None,) * 3))
+
+
+def output_rows():
+    """Generate the rows of the outputs of all the types."""
+    columns = ("title", "year", "authors_count", "points", "approved", "journal")
+    columns += ("number",)
+    for output_type, model, _ in _output_models():
+        # The columns of the fields the model lacks are null (approved: true)
+        names = {field.name for field in model._meta.fields}
+        lookups = {column: column for column in columns if column in names}
+        if model.requires_approval():
+            lookups["approved"] = model.APPROVAL_STATUS_FIELD_NAME
+        defaults = {"approved": True}
+
+        for row in (
+            model.objects.order_by("pk")
+            .values("pk", *lookups.values())
+            .iterator(BATCH_SIZE)
+        ):
+            yield (
+                output_type,
+                row["pk"],
+                *(
+                    row[lookups[column]] if column in lookups else defaults.get(column)
+                    for column in columns
+                ),
+            )
+
+
+def contribution_rows():
+    """Generate the rows of the contributions, with their outputs and units."""
+    paths = _department_paths()
+    for output_type, output_model, model in _output_models():
+        approved = (
+            output_model.APPROVAL_STATUS_FIELD_NAME
+            if output_model.requires_approval()
+            else None
+        )
+        for pk, output, year, *row in (
+            model.objects.order_by("pk")
+            .values_list(
+                "pk",
+                "output",
+                "output__year",
+                f"output__{approved}" if approved else "pk",
+                "employee",
+                "employee__last_name",
+                "employee__first_name",
+                "department",
+                "discipline",
+                "share",
+                "points",
+            )
+            .iterator(BATCH_SIZE)
+        ):
+            is_approved, employee, last_name, first_name, department, *values = row
+            yield (
+                output_type,
+                pk,
+                output,
+                year,
+                is_approved if approved else True,
+                employee,
+                f"{last_name} {first_name}".strip(),
+                department,
+                *paths.get(department, (None,) * 3),
+                *values,
+            )
+
+
+def tables():
+    """Return the definitions of the tables of the snapshot."""
+    outputs = [model for _, model, _ in _output_models()]
+    contributions = [model for _, _, model in _output_models()]
+    units = [University, Faculty, Department]
+    department = [
+        ("department_id", "INTEGER"),
+        ("faculty_id", "INTEGER"),
+        ("university_id", "INTEGER"),
+        ("unit_path", "TEXT"),
+    ]
+    return [
+        Table(
+            "units",
+            [
+                ("level", "TEXT"),
+                ("id", "INTEGER"),
+                ("name", "TEXT"),
+                ("abbr", "TEXT"),
+                ("faculty_id", "INTEGER"),
+                ("university_id", "INTEGER"),
+                ("path", "TEXT"),
+            ],
+            key=2,
+            indexes=["path"],
+            models=units,
+            rows=unit_rows,
+            daily=False,
+        ),
+        Table(
+            "users",
+            [
+                ("id", "INTEGER"),
+                ("username", "TEXT"),
+                ("first_name", "TEXT"),
+                ("last_name", "TEXT"),
+                ("email", "TEXT"),
+                ("is_active", "INTEGER"),
+                ("is_staff", "INTEGER"),
+                ("date_joined", "TEXT"),
+                ("last_login", "TEXT"),
+            ],
+            key=1,
+            indexes=["last_name"],
+            models=[get_user_model()],
+            rows=user_rows,
+            daily=False,
+        ),
+        Table(
+            "employees",
+            [
+                ("id", "INTEGER"),
+                ("first_name", "TEXT"),
+                ("last_name", "TEXT"),
+                ("user_id", "INTEGER"),
+                ("hr_id", "TEXT"),
+                ("is_active", "INTEGER"),
+                *department,
+            ],
+            key=1,
+            indexes=["last_name", "department_id", "faculty_id", "university_id"],
+            models=[Employee, Employment, *units],
+            rows=employee_rows,
+            # The current departments change with the date
+            daily=True,
+        ),
+        Table(
+            "outputs",
+            [
+                ("type", "TEXT"),
+                ("id", "INTEGER"),
+                ("title", "TEXT"),
+                ("year", "INTEGER"),
+                ("authors_count", "INTEGER"),
+                ("points", "INTEGER"),
+                ("approved", "INTEGER"),
+                ("journal", "TEXT"),
+                ("number", "TEXT"),
+            ],
+            key=2,
+            indexes=["year"],
+            models=outputs,
+            rows=output_rows,
+            daily=False,
+        ),
+        Table(
+            "contributions",
+            [
+                ("type", "TEXT"),
+                ("id", "INTEGER"),
+                ("output_id", "INTEGER"),
+                ("year", "INTEGER"),
+                ("approved", "INTEGER"),
+                ("employee_id", "INTEGER"),
+                ("employee_name", "TEXT"),
+                *department,
+                ("discipline", "TEXT"),
+                ("share", "REAL"),
+                ("points", "REAL"),
+            ],
+            key=2,
+            indexes=[
+                "type, output_id",
+                "employee_id",
+                "department_id",
+                "faculty_id",
+                "university_id",
+                "year",
+            ],
+            models=[*contributions, *outputs, Employee, *units],
+            rows=contribution_rows,
+            daily=False,
+        ),
+    ]
+
+
+def _row_hash(row):
+    """Return the hash of the row's values."""
+    return hashlib.blake2b(repr(row).encode(), digest_size=8).hexdigest()
+
+
+def _stored(db, table):
+    """Generate the keys and the hashes of the rows of the snapshot's table.
+
+    The rows are read in pages following the last key read, so that the table
+    can be written in between.
+    """
+    keys = ", ".join(name for name, _ in table.columns[: table.key])
+    marks = ", ".join("?" * table.key)
+    last = None
+    while True:
+        page = db.execute(
+            f"SELECT {keys}, _hash FROM {table.name} "
+            f"{f'WHERE ({keys}) > ({marks})' if last else ''} "
+            f"ORDER BY {keys} LIMIT {BATCH_SIZE}",
+            last or (),
+        ).fetchall()
+        if not page:
+            return
+        for row in page:
+            yield row[: table.key], row[-1]
+        last = page[-1][: table.key]
+
+
+def merge(db, table):
+    """Write the rows changed in the database to the table; return the counts.
+
+    The counts are of the rows written (added or changed) and deleted.
+    """
+    keys = ", ".join(name for name, _ in table.columns[: table.key])
+    upsert = (
+        f"INSERT OR REPLACE INTO {table.name} "
+        f"VALUES ({', '.join('?' * (len(table.columns) + 1))})"
+    )
+    delete = f"DELETE FROM {table.name} WHERE ({keys}) = ({', '.join('?' * table.key)})"
+
+    written, deleted, counts = [], [], [0, 0]
+
+    def flush():
+        db.executemany(upsert, written)
+        db.executemany(delete, deleted)
+        counts[0] += len(written)
+        counts[1] += len(deleted)
+        written.clear()
+        deleted.clear()
+
+    stored = _stored(db, table)
+    current = next(stored, None)
+    for row in table.rows():
+        row = tuple(map(_value, row))
+        key, digest = row[: table.key], _row_hash(row)
+
+        # The rows stored with the keys not read from the database are removed
+        while current is not None and current[0] < key:
+            deleted.append(current[0])
+            current = next(stored, None)
+        if current is not None and current[0] == key:
+            if current[1] != digest:
+                written.append((*row, digest))
+            current = next(stored, None)
+        else:
+            written.append((*row, digest))
+
+        if len(written) + len(deleted) >= BATCH_SIZE:
+            flush()
+
+    while current is not None:
+        deleted.append(current[0])
+        current = next(stored, None)
+    flush()
+
+    return tuple(counts)
+
+
+def _schema(table):
+    """Return the SQL statements creating the table and its indexes."""
+    columns = ", ".join(f"{name} {type_}" for name, type_ in table.columns)
+    keys = ", ".join(name for name, _ in table.columns[: table.key])
+    return [
+        f"CREATE TABLE {table.name} "
+        f"({columns}, _hash TEXT NOT NULL, PRIMARY KEY ({keys})) WITHOUT ROWID",
+        *(
+            f"CREATE INDEX {table.name}_{index.replace(', ', '_')} "
+            f"ON {table.name} ({index})"
+            for index in table.indexes
+        ),
+    ]
+
+
+def export(path, full=False, progress=None):
+    """Create or refresh the snapshot file; return the counts of the tables.
+
+    The counts of the tables skipped as not changed are None. Unless `full` is
+    set, the tables not changed since the previous export are skipped. If given,
+    the `progress` function is called with the name and the counts of each table.
+    """
+    db = sqlite3.connect(path, isolation_level=None)
+    result = {}
+    try:
+        db.execute("BEGIN")
+        db.execute("CREATE TABLE IF NOT EXISTS _meta (key TEXT PRIMARY KEY, value)")
+        meta = dict(db.execute("SELECT key, value FROM _meta"))
+
+        for table in tables():
+            schema = _schema(table)
+            if meta.get(f"{table.name}:schema") != "\n".join(schema):
+                # The tables of an outdated definition are created again
+                db.execute(f"DROP TABLE IF EXISTS {table.name}")
+                for statement in schema:
+                    db.execute(statement)
+                meta.pop(f"{table.name}:version", None)
+
+            # The version is read before the rows, so that the changes made in
+            # the meantime are exported next time
+            version, _ = counters.state(*table.models)
+            if table.daily:
+                version += f":{datetime.date.today()}"
+            if not full and meta.get(f"{table.name}:version") == version:
+                result[table.name] = None
+            else:
+                result[table.name] = merge(db, table)
+
+            db.executemany(
+                "INSERT OR REPLACE INTO _meta VALUES (?, ?)",
+                [
+                    (f"{table.name}:schema", "\n".join(schema)),
+                    (f"{table.name}:version", version),
+                ],
+            )
+            if progress is not None:
+                progress(table.name, result[table.name])
+
+        db.execute(
+            "INSERT OR REPLACE INTO _meta VALUES ('exported_at', ?)",
+            [datetime.datetime.now().isoformat(timespec="seconds")],
+        )
+        db.execute("COMMIT")
+    except BaseException:
+        if db.in_transaction:
+            db.execute("ROLLBACK")
+        raise
+    finally:
+        db.close()
+
+    return result
@@ -8,3 +8,8 @@ class OutputsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.outputs"
     verbose_name = _("Dorobek")
+
+    def ready(self):
+        """Run this code when the Django starts."""
+        from .contributions import signals  # NOQA
+        from .elements.projects import signals  # NOQA
@@ -0,0 +1,24 @@
+from base.options import admin
+
+from .models import ArticleContribution, PatentContribution, ProjectContribution
+
+
+class ContributionInline(admin.TabularInline):
+    """Inline options for the contributions displayed on the output's page."""
+
+    fields = ("employee", "department", "discipline", "share", "points")
+    readonly_fields = ("share", "points")
+    autocomplete_fields = ("employee", "department")
+    extra = 1
+
+
+class ArticleContributionInline(ContributionInline):
+    model = ArticleContribution
+
+
+class PatentContributionInline(ContributionInline):
+    model = PatentContribution
+
+
+class ProjectContributionInline(ContributionInline):
+    model = ProjectContribution
@@ -0,0 +1,58 @@
+"""Crediting the contributions to the departments the employees worked in."""
+
+import datetime
+
+from apps.employees.index import get_index
+from apps.extras import counters
+from base.options import transaction
+
+from . import aggregates, network
+
+
+def departments_in_year(pairs):
+    """Return the departments of the (employee, year) pairs, for many pairs.
+
+    The department the employee worked in at the end of the year is preferred,
+    then the one at its beginning.
+    """
+    index = get_index()
+    departments = index.departments_as_of(
+        [(employee, datetime.date(year, 12, 31)) for employee, year in pairs]
+    )
+    missing = [i for i, department in enumerate(departments) if department is None]
+    for i, department in zip(
+        missing,
+        index.departments_as_of(
+            [(pairs[i][0], datetime.date(pairs[i][1], 1, 1)) for i in missing]
+        ),
+    ):
+        departments[i] = department
+    return departments
+
+
+def assign_departments(model, queryset=None, batch_size=1000):
+    """Credit the contributions with no affiliation; return the number updated."""
+    queryset = (model.objects if queryset is None else queryset).filter(
+        department__isnull=True
+    )
+    rows = list(queryset.values_list("pk", "employee", "output__year"))
+    departments = departments_in_year([(employee, year) for _, employee, year in rows])
+
+    contributions = [
+        model(pk=pk, department_id=department)
+        for (pk, _, _), department in zip(rows, departments)
+        if department is not None
+    ]
+    # The bulk update sends no signals; update the aggregates and networks explicitly
+    with transaction.atomic():
+        network.schedule_bulk_update(
+            model, [contribution.pk for contribution in contributions]
+        )
+        model.objects.bulk_update(contributions, ["department"], batch_size=batch_size)
+        aggregates.schedule(
+            (department, year)
+            for (_, _, year), department in zip(rows, departments)
+            if department is not None
+        )
+        counters.bump(model)
+    return len(contributions)
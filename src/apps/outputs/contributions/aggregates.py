@@ -0,0 +1,144 @@
+"""Maintenance of the contributions aggregated per unit, year and output type.
+
+The aggregates of a department, faculty and university are computed from the
+contributions affiliated with the department, any department of the faculty
+and any department of the university, respectively. Only the contributions to
+approved outputs are taken into account.
+
+The changes are tracked as the (department, year) pairs they affect, buffered
+within the transaction and applied on commit, so that bulk operations update
+each of the affected aggregates once.
+"""
+
+from django.db.models import Count, Sum
+
+from apps.units.models import Department, Faculty, University
+from base.options import transaction
+from base.utils import chunked
+
+from . import engine
+from .models import Aggregate
+
+# Lookups from the contributions to the units of each level and the unit models
+LEVELS = {
+    "department": ("department", Department),
+    "faculty": ("department__ancestor", Faculty),
+    "university": ("department__ancestor__ancestor", University),
+}
+
+
+def output_type(model):
+    """Return the output type of the contribution model."""
+    return model._meta.get_field("output").related_model._meta.model_name
+
+
+def compute(level, unit_ids, years=None):
+    """Return the aggregates of the units computed from the contributions."""
+    lookup, _ = LEVELS[level]
+    rows = {}
+
+    for model in engine.contribution_models():
+        queryset = model.objects.filter(**{f"{lookup}__in": unit_ids})
+        if years is not None:
+            queryset = queryset.filter(output__year__in=years)
+
+        output_model = model._meta.get_field("output").related_model
+        if output_model.requires_approval():
+            queryset = queryset.filter(
+                **{f"output__{output_model.APPROVAL_STATUS_FIELD_NAME}": True}
+            )
+
+        for row in (
+            queryset.values(lookup, "output__year")
+            .annotate(count=Count("pk"), shares=Sum("share"), points=Sum("points"))
+            .order_by()
+        ):
+            key = (row[lookup], row["output__year"], output_type(model))
+            rows[key] = (row["count"], row["shares"], row["points"])
+
+    return rows
+
+
+def refresh(level, unit_ids, years=None, batch_size=1000):
+    """Recompute the aggregates of the units (in the years) and store them."""
+    rows = compute(level, unit_ids, years)
+
+    queryset = Aggregate.objects.filter(level=level, unit_id__in=unit_ids)
+    if years is not None:
+        queryset = queryset.filter(year__in=years)
+
+    created, updated, deleted = [], [], []
+    for aggregate in queryset:
+        key = (aggregate.unit_id, aggregate.year, aggregate.output_type)
+        if (values := rows.pop(key, None)) is None:
+            deleted.append(aggregate.pk)
+        elif values != (aggregate.contributions, aggregate.shares, aggregate.points):
+            aggregate.contributions, aggregate.shares, aggregate.points = values
+            updated.append(aggregate)
+
+    for (unit_id, year, type_), (count, shares, points) in rows.items():
+        created.append(
+            Aggregate(
+                level=level,
+                unit_id=unit_id,
+                year=year,
+                output_type=type_,
+                contributions=count,
+                shares=shares,
+                points=points,
+            )
+        )
+
+    Aggregate.objects.filter(pk__in=deleted).delete()
+    Aggregate.objects.bulk_update(
+        updated, ["contributions", "shares", "points"], batch_size=batch_size
+    )
+    Aggregate.objects.bulk_create(created, batch_size=batch_size)
+
+
+def update(keys):
+    """Update the aggregates affected by the (department, year) pairs."""
+    departments = {department for department, _ in keys if department is not None}
+    years = {year for _, year in keys if year is not None}
+    if not departments or not years:
+        return
+
+    units = {level: set() for level in LEVELS}
+    for department, faculty, university in Department.objects.filter(
+        pk__in=departments
+    ).values_list("pk", "ancestor", "ancestor__ancestor"):
+        units["department"].add(department)
+        units["faculty"].add(faculty)
+        units["university"].add(university)
+
+    with transaction.atomic():
+        for level, unit_ids in units.items():
+            refresh(level, unit_ids, years)
+
+
+def rebuild(batch_size=1000):
+    """Recompute all the aggregates from scratch, unit by unit in batches."""
+    for level, (_, unit_model) in LEVELS.items():
+        unit_ids = list(unit_model.objects.order_by("pk").values_list("pk", flat=True))
+
+        for batch in chunked(unit_ids, batch_size):
+            with transaction.atomic():
+                refresh(level, batch, batch_size=batch_size)
+
+        # Remove the aggregates of the units which no longer exist
+        Aggregate.objects.filter(level=level).exclude(
+            unit_id__in=unit_model.objects.values("pk")
+        ).delete()
+
+
+def _update_pending(pending):
+    """Update the aggregates affected within the committed transaction."""
+    update(pending[None])
+
+
+_pending = transaction.CommitBuffer(_update_pending)
+
+
+def schedule(keys):
+    """Update the aggregates affected by the (department, year) pairs on commit."""
+    _pending.add(None, keys)
@@ -0,0 +1,158 @@
+"""Batch engine computing the employees' shares in the outputs and their points.
+
+The contributions are loaded as columnar arrays and evaluated in a single NumPy
+pass. For each output and discipline, with `k` co-authors employed at the
+university out of `m` authors in total and the output worth `P` points:
+
+    P >= 100        the output counts in full, i.e. factor = 1
+    40 <= P < 100   factor = sqrt(k / m)
+    P < 40          factor = max(k / m, 0.1)
+
+and each of the `k` co-authors is given the share (slot) of `factor / k` and the
+points of `P * factor / k`.
+"""
+
+from django.apps import apps
+from django.dispatch import Signal
+
+from apps.extras import counters
+from base.options import transaction
+
+import numpy as np
+
+# Points bands of the evaluation rules
+HIGH_BAND_MIN_POINTS = 100
+MIDDLE_BAND_MIN_POINTS = 40
+LOW_BAND_MIN_FACTOR = 0.1
+
+# Sent when the contributions have been recomputed (and updated in bulk, that is
+# without sending the `post_save` signals), with the PKs of the changed ones
+recomputed = Signal()
+
+COLUMNS = {
+    "pk": "pk",
+    "output": "output_id",
+    "discipline": "discipline",
+    "base_points": "output__points",
+    "authors_count": "output__authors_count",
+    "share": "share",
+    "points": "points",
+}
+
+
+def contribution_models():
+    """Return all the concrete contribution models."""
+    from .models import Contribution
+
+    return [model for model in apps.get_models() if issubclass(model, Contribution)]
+
+
+def contribution_model_for(output_model):
+    """Return the contribution model related to the given output model."""
+    for model in contribution_models():
+        if model._meta.get_field("output").related_model is output_model:
+            return model
+    return None
+
+
+def load(model, output_ids=None):
+    """Load the contributions as a dict of columnar arrays."""
+    queryset = model.objects.all()
+    if output_ids is not None:
+        queryset = queryset.filter(output__in=output_ids)
+
+    rows = list(queryset.order_by().values_list(*COLUMNS.values()))
+    columns = dict(zip(COLUMNS, zip(*rows))) if rows else dict.fromkeys(COLUMNS, ())
+
+    # Encode the disciplines as integers to group by them along with the outputs
+    _, disciplines = np.unique(
+        np.array(columns["discipline"], dtype=str), return_inverse=True
+    )
+
+    return {
+        "pk": np.array(columns["pk"], dtype=np.int64),
+        "output": np.array(columns["output"], dtype=np.int64),
+        "discipline": disciplines.astype(np.int64),
+        "base_points": np.array(
+            [p or 0 for p in columns["base_points"]], dtype=np.float64
+        ),
+        "authors_count": np.array(columns["authors_count"], dtype=np.float64),
+        "share": np.array(columns["share"], dtype=np.float64),
+        "points": np.array(columns["points"], dtype=np.float64),
+    }
+
+
+def compute(columns):
+    """Return the arrays of shares and points for the loaded contributions."""
+    if not len(columns["pk"]):
+        return np.empty(0), np.empty(0)
+
+    # Count the co-authors of each output within each discipline
+    groups = columns["output"] * (columns["discipline"].max() + 1)
+    groups += columns["discipline"]
+    _, groups = np.unique(groups, return_inverse=True)
+    k = np.bincount(groups)[groups].astype(np.float64)
+    m = np.maximum(columns["authors_count"], k)
+
+    base_points = columns["base_points"]
+    factor = np.select(
+        [
+            base_points >= HIGH_BAND_MIN_POINTS,
+            base_points >= MIDDLE_BAND_MIN_POINTS,
+            base_points > 0,
+        ],
+        [1.0, np.sqrt(k / m), np.maximum(k / m, LOW_BAND_MIN_FACTOR)],
+        default=0.0,
+    )
+
+    shares = factor / k
+    return shares, shares * base_points
+
+
+def recompute(model, output_ids=None, batch_size=1000):
+    """Recompute the contributions (of the given outputs); return the changed PKs."""
+    with transaction.atomic():
+        columns = load(model, output_ids)
+        shares, points = compute(columns)
+
+        changed = ~(
+            np.isclose(shares, columns["share"]) & np.isclose(points, columns["points"])
+        )
+        model.objects.bulk_update(
+            [
+                model(pk=pk, share=share, points=points)
+                for pk, share, points in zip(
+                    columns["pk"][changed].tolist(),
+                    shares[changed].tolist(),
+                    points[changed].tolist(),
+                )
+            ],
+            ["share", "points"],
+            batch_size=batch_size,
+        )
+
+        if pks := columns["pk"][changed].tolist():
+            recomputed.send(sender=model, pks=pks)
+            counters.bump(model)
+
+    return pks
+
+
+def _recompute_pending(pending):
+    """Recompute the contributions of the outputs buffered in the transaction."""
+    for model, output_ids in pending.items():
+        recompute(model, output_ids)
+
+
+_pending = transaction.CommitBuffer(_recompute_pending)
+
+
+def schedule(model, output_ids):
+    """Recompute the contributions of the outputs after the transaction commits."""
+    _pending.add(model, output_ids)
+
+
+def schedule_outputs(output_model, output_ids):
+    """Recompute the contributions of the given outputs after the commit."""
+    if model := contribution_model_for(output_model):
+        schedule(model, output_ids)
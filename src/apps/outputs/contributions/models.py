@@ -0,0 +1,133 @@
+from django.utils.translation import gettext_lazy as _
+
+from apps.employees.models import Employee
+from apps.units.models import Department
+from base.options import models
+
+from ..elements.articles.models import Article
+from ..elements.patents.models import Patent
+from ..elements.projects.models import Project
+
+
+class Contribution(models.Model):
+    """An abstract class to represent contribution objects.
+
+    A contribution links an employee with an output (article, patent, etc.) and
+    holds the employee's share in the output ("slot") and the points it yields,
+    both computed in bulk by the `engine` module.
+    """
+
+    employee = models.ForeignKey(
+        to=Employee,
+        on_delete=models.CASCADE,
+        verbose_name=Employee._meta.verbose_name,
+        related_name="%(class)ss",
+    )
+    department = models.ForeignKey(
+        to=Department,
+        on_delete=models.SET_NULL,
+        verbose_name=_("afiliacja"),
+        related_name="%(class)ss",
+        blank=True,
+        null=True,
+    )
+    discipline = models.CharField(_("dyscyplina"), max_length=255, blank=True)
+    share = models.FloatField(_("udział"), default=0, editable=False)
+    points = models.FloatField(_("punkty"), default=0, editable=False)
+
+    output = None
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        """Define how to print the object."""
+        return f"{self.employee}: {self.output}"
+
+    def clean(self):
+        """Perform model-wide validation and updates."""
+        from .affiliations import departments_in_year
+
+        # Credit the department the employee worked in when the output was made
+        if self.department_id is None and self.employee_id and self.output_id:
+            (self.department_id,) = departments_in_year(
+                [(self.employee_id, self.output.year)]
+            )
+
+
+class ArticleContribution(Contribution):
+    """A class to represent ArticleContribution objects."""
+
+    class Meta:
+        verbose_name = _("udział w artykule")
+        verbose_name_plural = _("udziały w artykułach")
+        unique_together = ("output", "employee")
+
+    output = models.ForeignKey(
+        to=Article,
+        on_delete=models.CASCADE,
+        verbose_name=Article._meta.verbose_name,
+        related_name="contributions",
+    )
+
+
+class PatentContribution(Contribution):
+    """A class to represent PatentContribution objects."""
+
+    class Meta:
+        verbose_name = _("udział w patencie")
+        verbose_name_plural = _("udziały w patentach")
+        unique_together = ("output", "employee")
+
+    output = models.ForeignKey(
+        to=Patent,
+        on_delete=models.CASCADE,
+        verbose_name=Patent._meta.verbose_name,
+        related_name="contributions",
+    )
+
+
+class ProjectContribution(Contribution):
+    """A class to represent ProjectContribution objects."""
+
+    class Meta:
+        verbose_name = _("udział w projekcie")
+        verbose_name_plural = _("udziały w projektach")
+        unique_together = ("output", "employee")
+
+    output = models.ForeignKey(
+        to=Project,
+        on_delete=models.CASCADE,
+        verbose_name=Project._meta.verbose_name,
+        related_name="contributions",
+    )
+
+
+class Aggregate(models.Model):
+    """A class to represent the contributions aggregated per unit, year and type.
+
+    The objects are denormalized data maintained by the `aggregates` module.
+    """
+
+    LEVELS = [
+        ("university", _("uczelnia")),
+        ("faculty", _("wydział")),
+        ("department", _("katedra")),
+    ]
+
+    level = models.CharField(_("poziom"), max_length=16, choices=LEVELS)
+    unit_id = models.PositiveBigIntegerField(_("jednostka"))
+    year = models.PositiveSmallIntegerField(_("rok"))
+    output_type = models.CharField(_("rodzaj osiągnięcia"), max_length=64)
+    contributions = models.PositiveIntegerField(_("liczba udziałów"), default=0)
+    shares = models.FloatField(_("suma udziałów"), default=0)
+    points = models.FloatField(_("suma punktów"), default=0)
+
+    class Meta:
+        verbose_name = _("agregat")
+        verbose_name_plural = _("agregaty")
+        unique_together = ("level", "unit_id", "year", "output_type")
+
+    def __str__(self):
+        """Define how to print the object."""
+        return f"{self.level} #{self.unit_id}, {self.year}, {self.output_type}"
@@ -0,0 +1,356 @@
+"""Co-authorship networks of the employees and the units.
+
+Two nodes (employees, departments, faculties or universities) are linked if
+they have contributed to a common approved output, the weight of the link being
+the number of such outputs. The graphs are held as sparse lists of the weighted
+edges (coordinate format) and built from the contributions of all the outputs
+in a single pass, for all the levels at once: the employees' contributions are
+rolled up to the units through the departments they are affiliated with.
+
+The graphs are cached per level and year (for at most `CACHE_TIMEOUT` seconds);
+the graph of a range of years is the sum of the yearly ones. The changes of the
+contributions are compared as the links of each affected output before and
+after the transaction, and only the graphs of the years whose links have
+changed are dropped, to be built again when requested.
+"""
+
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from base.options import transaction
+
+import numpy as np
+
+from . import engine
+
+CACHE_KEY = "contributions:network:{level}:{year}"
+CACHE_TIMEOUT = 24 * 60 * 60
+
+# Lookups from the contributions to the nodes of each level
+LEVELS = {
+    "employee": "employee",
+    "department": "department",
+    "faculty": "department__ancestor",
+    "university": "department__ancestor__ancestor",
+}
+
+CENTRALITY_ITERATIONS = 100
+CENTRALITY_TOLERANCE = 1e-9
+
+
+class Graph:
+    """A class to represent an undirected weighted graph of co-authorships."""
+
+    def __init__(self, left=(), right=(), weights=()):
+        """Build the graph from the edges, summing the weights of the repeated."""
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.int64)
+
+        # Edges are stored with the lower node first, each once
+        left, right = np.minimum(left, right), np.maximum(left, right)
+        if len(left):
+            pairs, inverse = np.unique(
+                np.stack([left, right]), axis=1, return_inverse=True
+            )
+            weights = np.bincount(inverse.ravel(), weights, len(pairs[0]))
+            keep = weights != 0
+            left, right, weights = pairs[0][keep], pairs[1][keep], weights[keep]
+
+        self.left, self.right = left, right
+        self.weights = weights.astype(np.int64)
+
+    def __add__(self, other):
+        """Return the graph with the edges of both the graphs."""
+        return Graph(
+            np.concatenate([self.left, other.left]),
+            np.concatenate([self.right, other.right]),
+            np.concatenate([self.weights, other.weights]),
+        )
+
+    def __len__(self):
+        """Return the number of the edges."""
+        return len(self.weights)
+
+    @classmethod
+    def from_groups(cls, groups, nodes):
+        """Build the graph linking all the nodes within each group, e.g. output."""
+        groups = np.asarray(groups, dtype=np.int64)
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if not len(nodes):
+            return cls()
+
+        # Each node counts once per group
+        rows = np.unique(np.stack([groups, nodes]), axis=1)
+        groups, nodes = rows[0], rows[1]
+
+        # Pair each row with the following rows of its group
+        ends = np.searchsorted(groups, groups, side="right")
+        counts = ends - np.arange(len(groups)) - 1
+        first = np.repeat(np.arange(len(groups)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        return cls(nodes[first], nodes[first + 1 + offsets], np.ones(len(first)))
+
+    @property
+    def nodes(self):
+        """Return the sorted array of the linked nodes."""
+        return np.union1d(self.left, self.right)
+
+    def _indexes(self):
+        """Return the nodes and the edges' ends as indexes to the nodes."""
+        nodes = self.nodes
+        return (
+            nodes,
+            np.searchsorted(nodes, self.left),
+            np.searchsorted(nodes, self.right),
+        )
+
+    def degree(self):
+        """Return the nodes and the numbers of their co-authors (other nodes)."""
+        nodes, left, right = self._indexes()
+        return nodes, np.bincount(np.concatenate([left, right]), minlength=len(nodes))
+
+    def strength(self):
+        """Return the nodes and the numbers of their collaborations.
+
+        For the units, these are the counts of the cross-unit collaborations,
+        i.e. of the outputs shared with each of the other units, summed.
+        """
+        nodes, left, right = self._indexes()
+        weights = np.concatenate([self.weights, self.weights])
+        return nodes, np.bincount(
+            np.concatenate([left, right]), weights, len(nodes)
+        ).astype(np.int64)
+
+    def centrality(self):
+        """Return the nodes and their eigenvector centralities (max. 1).
+
+        The power iteration is run on the adjacency matrix shifted by identity,
+        which has the same leading eigenvector but converges on any graph.
+        """
+        nodes, left, right = self._indexes()
+        if not len(nodes):
+            return nodes, np.zeros(0)
+
+        weights = self.weights.astype(np.float64)
+        x = np.ones(len(nodes))
+        for _ in range(CENTRALITY_ITERATIONS):
+            y = x + np.bincount(left, weights * x[right], len(nodes))
+            y += np.bincount(right, weights * x[left], len(nodes))
+            y /= y.max()
+            if np.abs(y - x).max() < CENTRALITY_TOLERANCE:
+                break
+            x = y
+        return nodes, y
+
+    def collaborators(self, node, count=10):
+        """Return the node's top collaborators as (node, weight) pairs."""
+        mask = (self.left == node) | (self.right == node)
+        others = np.where(self.left[mask] == node, self.right[mask], self.left[mask])
+        weights = self.weights[mask]
+        order = np.lexsort([others, -weights])[:count]
+        return list(zip(others[order].tolist(), weights[order].tolist()))
+
+    def links(self, count=10):
+        """Return the strongest links as (node, node, weight) triples."""
+        order = np.lexsort([self.right, self.left, -self.weights])[:count]
+        return list(
+            zip(
+                self.left[order].tolist(),
+                self.right[order].tolist(),
+                self.weights[order].tolist(),
+            )
+        )
+
+
+def output_fields(output_model):
+    """Return the fields of the output model the networks depend on."""
+    if output_model.requires_approval():
+        return ("year", output_model.APPROVAL_STATUS_FIELD_NAME)
+    return ("year",)
+
+
+def _approval_lookup(model):
+    """Return the lookup of the approval status of the model's outputs, if any."""
+    output_model = model._meta.get_field("output").related_model
+    if output_model.requires_approval():
+        return f"output__{output_model.APPROVAL_STATUS_FIELD_NAME}"
+    return None
+
+
+def load(years):
+    """Return the graphs of the years, as a dict keyed by (level, year)."""
+    columns = defaultdict(list)
+
+    for i, model in enumerate(engine.contribution_models()):
+        queryset = model.objects.filter(output__year__in=years)
+        if lookup := _approval_lookup(model):
+            queryset = queryset.filter(**{lookup: True})
+        rows = list(
+            queryset.order_by().values_list("output", "output__year", *LEVELS.values())
+        )
+        columns["model"] += [i] * len(rows)
+        for name, values in zip(["output", "year", *LEVELS], zip(*rows)):
+            columns[name] += values
+
+    count = len(engine.contribution_models())
+    groups = np.array(columns["output"], dtype=np.int64) * count
+    groups += np.array(columns["model"], dtype=np.int64)
+    row_years = np.array(columns["year"], dtype=np.int64)
+
+    graphs = {}
+    for level in LEVELS:
+        nodes = np.array(
+            [-1 if node is None else node for node in columns[level]], dtype=np.int64
+        )
+        for year in years:
+            mask = (row_years == year) & (nodes >= 0)
+            graphs[(level, year)] = Graph.from_groups(groups[mask], nodes[mask])
+    return graphs
+
+
+def get_graph(level, year_from, year_to=None):
+    """Return the graph of the level in the range of years (inclusive)."""
+    years = list(range(year_from, (year_to or year_from) + 1))
+    keys = {
+        (lvl, year): CACHE_KEY.format(level=lvl, year=year)
+        for lvl in LEVELS
+        for year in years
+    }
+    cached = cache.get_many(keys.values())
+
+    # The yearly graphs are built for all the levels at once
+    if missing := sorted(
+        {year for (_, year), key in keys.items() if key not in cached}
+    ):
+        graphs = load(missing)
+        cache.set_many(
+            {keys[key]: graph for key, graph in graphs.items()}, CACHE_TIMEOUT
+        )
+        cached.update({keys[key]: graph for key, graph in graphs.items()})
+
+    graph = Graph()
+    for year in years:
+        graph += cached[keys[(level, year)]]
+    return graph
+
+
+def invalidate(years):
+    """Drop the cached graphs of the years."""
+    cache.delete_many(
+        [CACHE_KEY.format(level=level, year=year) for level in LEVELS for year in years]
+    )
+
+
+def states(model, **filters):
+    """Return the states of the contributions matching the filters, by output.
+
+    The state of a contribution is the year and the approval status of the output
+    and the nodes of all the levels the contribution is accounted for.
+    """
+    lookup = _approval_lookup(model)
+    result = defaultdict(dict)
+    for pk, output, year, approved, *nodes in (
+        model.objects.filter(**filters)
+        .order_by()
+        .values_list("pk", "output", "output__year", lookup or "pk", *LEVELS.values())
+    ):
+        result[output][pk] = (year, lookup is None or approved, *nodes)
+    return result
+
+
+def _links(states, level):
+    """Return the set of the (lower, higher) links of the contributions' nodes."""
+    column = 2 + list(LEVELS).index(level)
+    nodes = sorted({state[column] for state in states if state[1]} - {None})
+    return {
+        (a, nodes[j]) for i, a in enumerate(nodes) for j in range(i + 1, len(nodes))
+    }
+
+
+def update(changes):
+    """Drop the cached graphs whose links the changes of the contributions changed.
+
+    The graphs are dropped rather than patched, as patching (reading, adding and
+    writing back) is not atomic, so the concurrent changes could be lost.
+
+    The changes map the (contribution model, output) pairs to the sets of the
+    ("before", PK, state) items, recorded before the contributions were saved or
+    deleted, and ("saved", PK) items, recorded after they were saved.
+    """
+    outputs = defaultdict(set)
+    for model, output in changes:
+        outputs[model].add(output)
+    current = {
+        model: states(model, output__in=output_ids)
+        for model, output_ids in outputs.items()
+    }
+
+    stale = set()
+
+    for (model, output), items in changes.items():
+        after = current[model].get(output, {})
+        before = defaultdict(set)
+        for kind, pk, *state in items:
+            if kind == "before":
+                before[pk].add(tuple(state))
+        saved = {pk for kind, pk, *_ in items if kind == "saved"}
+
+        previous = {
+            pk: state
+            for pk, state in after.items()
+            if pk not in saved and pk not in before
+        }
+        for pk, pk_states in before.items():
+            # Saved repeatedly within the transaction; the order is unknown
+            if len(pk_states) > 1:
+                stale.update(state[0] for state in pk_states)
+            previous[pk] = next(iter(pk_states))
+
+        years = {state[0] for state in [*previous.values(), *after.values()]}
+        if len(years) != 1 or stale & years:
+            stale.update(years)
+            continue
+
+        # E.g. the changes of the shares or the points leave the links as they are
+        if any(
+            _links(previous.values(), level) != _links(after.values(), level)
+            for level in LEVELS
+        ):
+            stale.update(years)
+
+    invalidate(stale)
+
+
+_pending = transaction.CommitBuffer(update)
+
+
+def schedule(model, items):
+    """Update the graphs with the changes of the contributions after the commit.
+
+    The items are the (output, item) pairs, see `update`.
+    """
+    grouped = defaultdict(list)
+    for output, item in items:
+        grouped[output].append(item)
+    for output, output_items in grouped.items():
+        _pending.add((model, output), output_items)
+
+
+def schedule_bulk_update(model, pks):
+    """Update the graphs with the bulk changes of the contributions after the commit.
+
+    It must be called before the contributions are changed.
+    """
+    schedule(
+        model,
+        (
+            (output, item)
+            for output, output_states in states(model, pk__in=pks).items()
+            for pk, state in output_states.items()
+            for item in (("before", pk, *state), ("saved", pk))
+        ),
+    )
@@ -0,0 +1,226 @@
+"""Optimizer selecting the best set of contributions submitted for the evaluation.
+
+Each employee may submit the contributions worth at most `EMPLOYEE_SLOTS` slots
+and all the employees of a discipline at most `DISCIPLINE_SLOTS_PER_EMPLOYEE`
+slots per employee in total. Maximizing the points under both limits is solved
+exactly with dynamic programming on the slots discretized to `SLOT_RESOLUTION`:
+
+1. a 0/1 knapsack for each employee gives the best points for every capacity,
+2. the employees' curves are then combined with a max-plus convolution over the
+   discipline capacity, which assigns each employee a capacity to use.
+
+The employees' solutions are cached by a digest of their contributions, so after
+small edits only the affected employees are solved again (a warm start).
+"""
+
+import hashlib
+from collections import defaultdict, namedtuple
+
+from django.core.cache import cache
+
+import numpy as np
+
+from . import engine
+
+EMPLOYEE_SLOTS = 4
+DISCIPLINE_SLOTS_PER_EMPLOYEE = 3
+SLOT_RESOLUTION = 100
+
+CACHE_KEY = "contributions:optimizer:{digest}"
+CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+Item = namedtuple("Item", ["model", "pk", "employee", "output", "share", "points"])
+Selection = namedtuple("Selection", [*Item._fields, "selected", "marginal"])
+Result = namedtuple("Result", ["discipline", "points", "slots", "selections"])
+
+
+def load_items(discipline, employees=None, **filters):
+    """Return the contributions of the discipline worth any points, as items."""
+    items = []
+    for model in engine.contribution_models():
+        queryset = model.objects.filter(discipline=discipline, points__gt=0, **filters)
+        if employees is not None:
+            queryset = queryset.filter(employee__in=employees)
+        items += [
+            Item(model, *row)
+            for row in queryset.order_by("pk").values_list(
+                "pk", "employee_id", "output_id", "share", "points"
+            )
+        ]
+    return items
+
+
+def knapsack(weights, values, capacity):
+    """Solve 0/1 knapsack for all capacities; return the best values and choices."""
+    best = np.zeros(capacity + 1)
+    keep = np.zeros((len(weights), capacity + 1), dtype=bool)
+
+    for i, (weight, value) in enumerate(zip(weights, values)):
+        if weight > capacity:
+            continue
+        candidate = best[:-weight] + value
+        keep[i, weight:] = candidate > best[weight:]
+        best[weight:] = np.where(keep[i, weight:], candidate, best[weight:])
+
+    return best, keep
+
+
+def fill(best, weights, values):
+    """Return the best values of the knapsack with the items added to it."""
+    best = best.copy()
+    for weight, value in zip(weights, values):
+        if weight < len(best):
+            best[weight:] = np.maximum(best[weight:], best[:-weight] + value)
+    return best
+
+
+def knapsacks_without(weights, values, capacity):
+    """Return the best values of the knapsacks without each of the items in turn.
+
+    The items are split into halves recursively and each half is solved with the
+    other half already added, so that each item is added O(log n) times instead
+    of solving the knapsack once per item.
+    """
+    without = np.zeros((len(weights), capacity + 1))
+
+    def solve(best, start, stop):
+        if stop - start == 1:
+            without[start] = best
+            return
+        middle = (start + stop) // 2
+        solve(fill(best, weights[middle:stop], values[middle:stop]), start, middle)
+        solve(fill(best, weights[start:middle], values[start:middle]), middle, stop)
+
+    if weights:
+        solve(np.zeros(capacity + 1), 0, len(weights))
+    return without
+
+
+def backtrack(keep, weights, capacity):
+    """Return the indexes of the items chosen by the knapsack for the capacity."""
+    chosen = []
+    for i in reversed(range(len(weights))):
+        if keep[i, capacity]:
+            chosen.append(i)
+            capacity -= weights[i]
+    return chosen[::-1]
+
+
+def solve_employee(items):
+    """Solve the employee's knapsack; return the solution as a dict of arrays."""
+    capacity = int(EMPLOYEE_SLOTS * SLOT_RESOLUTION)
+    weights = [
+        max(int(np.ceil(item.share * SLOT_RESOLUTION - 1e-9)), 1) for item in items
+    ]
+    values = [item.points for item in items]
+
+    best, keep = knapsack(weights, values, capacity)
+
+    # The best values without each of the items, to evaluate their marginal values
+    without = knapsacks_without(weights, values, capacity)
+
+    return {"weights": weights, "best": best, "keep": keep, "without": without}
+
+
+def get_employee_solution(items):
+    """Return the employee's solution from the cache or solve the knapsack."""
+    digest = hashlib.sha1(
+        repr(
+            [
+                (item.model._meta.label, item.pk, item.share, item.points)
+                for item in items
+            ]
+        ).encode()
+    ).hexdigest()
+    key = CACHE_KEY.format(digest=digest)
+
+    if (solution := cache.get(key)) is None:
+        solution = solve_employee(items)
+        cache.set(key, solution, CACHE_TIMEOUT)
+    return solution
+
+
+def combine(curves, capacity):
+    """Distribute the discipline capacity among the employees' best-value curves.
+
+    Return the total value and the capacity assigned to each of the employees.
+    """
+    total = np.zeros(1)
+    choices = []
+
+    for curve in curves:
+        size = min(len(total) + len(curve) - 1, capacity + 1)
+        total = np.pad(total, (0, size - len(total)), mode="edge")
+
+        # Only the capacities at which the curve grows are worth assigning; since
+        # the curves are non-decreasing, so is the combined one
+        combined = np.full(size, -np.inf)
+        choice = np.zeros(size, dtype=np.int32)
+        for step in np.flatnonzero(np.diff(curve, prepend=-1) > 0):
+            if (end := size - step) <= 0:
+                break
+            candidate = total[:end] + curve[step]
+            better = candidate > combined[step:]
+            combined[step:][better] = candidate[better]
+            choice[step:][better] = step
+
+        total = combined
+        choices.append(choice)
+
+    # Walk back through the choices to assign the capacities
+    assigned, rest = [], len(total) - 1
+    for choice in reversed(choices):
+        # The choices of the narrower (padded) totals hold for the larger ones
+        rest = min(rest, len(choice) - 1)
+        assigned.append(int(choice[rest]))
+        rest -= choice[rest]
+    return float(total[-1]), assigned[::-1]
+
+
+def optimize(discipline, employees=None, discipline_slots=None, **filters):
+    """Select the best set of contributions of the discipline.
+
+    The marginal value of a selected contribution is the loss of points should it
+    be withdrawn; of a contribution not selected, the (non-positive) change of
+    points should it be forced in. Both keep the capacities assigned to the other
+    employees fixed.
+    """
+    items = load_items(discipline, employees, **filters)
+
+    by_employee = defaultdict(list)
+    for item in items:
+        by_employee[item.employee].append(item)
+
+    if discipline_slots is None:
+        discipline_slots = DISCIPLINE_SLOTS_PER_EMPLOYEE * len(by_employee)
+
+    solutions = {
+        employee: get_employee_solution(employee_items)
+        for employee, employee_items in by_employee.items()
+    }
+    points, capacities = combine(
+        [solution["best"] for solution in solutions.values()],
+        int(discipline_slots * SLOT_RESOLUTION),
+    )
+
+    selections = []
+    for (employee, solution), capacity in zip(solutions.items(), capacities):
+        weights, best = solution["weights"], solution["best"][capacity]
+        chosen = set(backtrack(solution["keep"], weights, capacity))
+
+        for i, item in enumerate(by_employee[employee]):
+            without = solution["without"][i]
+            if i in chosen:
+                marginal = best - without[capacity]
+            elif weights[i] <= capacity:
+                marginal = item.points + without[capacity - weights[i]] - best
+            else:
+                marginal = None
+            selections.append(Selection(*item, i in chosen, marginal))
+
+    return Result(
+        discipline,
+        points,
+        sum(s.share for s in selections if s.selected),
+        selections,
+    )
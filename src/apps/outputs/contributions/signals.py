@@ -0,0 +1,153 @@
+from django.db.models import signals
+from django.dispatch import receiver
+
+from base.options import transaction
+
+from . import aggregates, engine, network
+
+# Fields of the contributions and the outputs each of the receivers depends on
+ENGINE_FIELDS = ("output", "discipline")
+OUTPUT_ENGINE_FIELDS = ("points", "authors_count")
+AGGREGATE_FIELDS = ("output", "department", "share", "points")
+NETWORK_FIELDS = ("output", "employee", "department")
+
+
+def is_affected(instance, fields, signal):
+    """Check if the object is deleted or any of the fields has changed."""
+    if signal in (signals.pre_delete, signals.post_delete):
+        return True
+    return instance.has_changed(*fields)
+
+
+def update_output_contributions(sender, instance, signal, **kwargs):
+    """Recompute the contributions of the output the contribution belongs to."""
+    if is_affected(instance, ENGINE_FIELDS, signal):
+        engine.schedule(sender, [instance.output_id])
+
+
+def update_contributions(sender, instance, **kwargs):
+    """Recompute the contributions of the output."""
+    if instance.has_changed(*OUTPUT_ENGINE_FIELDS):
+        engine.schedule_outputs(sender, [instance.pk])
+
+
+def aggregate_keys(model, **filters):
+    """Return the aggregate keys of the contributions matching the filters."""
+    return set(
+        model.objects.filter(**filters).values_list("department", "output__year")
+    )
+
+
+def store_contribution_aggregate_keys(sender, instance, **kwargs):
+    """Remember the aggregates the contribution is accounted for before saving."""
+    if instance.has_changed(*AGGREGATE_FIELDS):
+        instance._aggregate_keys = aggregate_keys(sender, pk=instance.pk)
+
+
+def update_contribution_aggregates(sender, instance, **kwargs):
+    """Update the aggregates the contribution is (or was) accounted for in."""
+    if instance.has_changed(*AGGREGATE_FIELDS):
+        aggregates.schedule(
+            aggregate_keys(sender, pk=instance.pk)
+            | instance.__dict__.pop("_aggregate_keys", set())
+        )
+
+
+def update_deleted_contribution_aggregates(sender, instance, **kwargs):
+    """Update the aggregates the deleted contribution was accounted for in."""
+    output = sender._meta.get_field("output").related_model
+    aggregates.schedule(
+        (instance.department_id, year)
+        for year in output.objects.filter(pk=instance.output_id).values_list(
+            "year", flat=True
+        )
+    )
+
+
+def store_output_aggregate_keys(sender, instance, **kwargs):
+    """Remember the aggregates the output's contributions are in before saving."""
+    if not instance.has_changed(*network.output_fields(sender)):
+        return
+    if model := engine.contribution_model_for(sender):
+        instance._aggregate_keys = aggregate_keys(model, output=instance.pk)
+
+
+def update_output_aggregates(sender, instance, **kwargs):
+    """Update the aggregates the output's contributions are (or were) in."""
+    if not instance.has_changed(*network.output_fields(sender)):
+        return
+    if model := engine.contribution_model_for(sender):
+        aggregates.schedule(
+            aggregate_keys(model, output=instance.pk)
+            | instance.__dict__.pop("_aggregate_keys", set())
+        )
+
+
+def store_contribution_network_state(sender, instance, signal, **kwargs):
+    """Remember the contribution's state in the networks before it changes."""
+    if not is_affected(instance, NETWORK_FIELDS, signal):
+        return
+    instance._network_items = [
+        (output, ("before", pk, *state))
+        for output, output_states in network.states(sender, pk=instance.pk).items()
+        for pk, state in output_states.items()
+    ]
+
+
+def update_contribution_networks(sender, instance, signal, created=None, **kwargs):
+    """Update the networks the saved or deleted contribution is accounted for in."""
+    if not is_affected(instance, NETWORK_FIELDS, signal):
+        return
+    items = instance.__dict__.pop("_network_items", [])
+    if created is not None:
+        items.append((instance.output_id, ("saved", instance.pk)))
+    network.schedule(sender, items)
+
+
+def store_output_network_state(sender, instance, **kwargs):
+    """Remember the output's year and approval status before saving."""
+    if not instance.has_changed(*network.output_fields(sender)):
+        return
+    instance._network_state = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(*network.output_fields(sender))
+        .first()
+    )
+
+
+def update_output_networks(sender, instance, **kwargs):
+    """Drop the networks of the years the output has been moved out of or into."""
+    before = instance.__dict__.pop("_network_state", None)
+    after = tuple(getattr(instance, field) for field in network.output_fields(sender))
+    if before is not None and before != after:
+        years = {before[0], after[0]}
+        transaction.on_commit(lambda: network.invalidate(years))
+
+
+@receiver(engine.recomputed)
+def update_recomputed_aggregates(sender, pks, **kwargs):
+    """Update the aggregates of the contributions recomputed in bulk."""
+    aggregates.schedule(aggregate_keys(sender, pk__in=pks))
+
+
+for model in engine.contribution_models():
+    output_model = model._meta.get_field("output").related_model
+
+    signals.post_save.connect(update_output_contributions, sender=model)
+    signals.post_delete.connect(update_output_contributions, sender=model)
+    signals.post_save.connect(update_contributions, sender=output_model)
+
+    # Account for the changes both before and after the object is saved
+    signals.pre_save.connect(store_contribution_aggregate_keys, sender=model)
+    signals.post_save.connect(update_contribution_aggregates, sender=model)
+    signals.post_delete.connect(update_deleted_contribution_aggregates, sender=model)
+    signals.pre_save.connect(store_output_aggregate_keys, sender=output_model)
+    signals.post_save.connect(update_output_aggregates, sender=output_model)
+
+    # Apply the differences of the networks' links
+    signals.pre_save.connect(store_contribution_network_state, sender=model)
+    signals.pre_delete.connect(store_contribution_network_state, sender=model)
+    signals.post_save.connect(update_contribution_networks, sender=model)
+    signals.post_delete.connect(update_contribution_networks, sender=model)
+    signals.pre_save.connect(store_output_network_state, sender=output_model)
+    signals.post_save.connect(update_output_networks, sender=output_model)
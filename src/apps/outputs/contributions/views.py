@@ -0,0 +1,14 @@
+from base.options.views import ApiView
+
+
+class OutputApiView(ApiView):
+    """JSON API of the output objects, along with their contributions."""
+
+    lookups = {"approved": "_approved"}
+    related = {
+        "contributions": (
+            "contributions",
+            ("employee", "department", "discipline", "share", "points"),
+        ),
+    }
+    filters = ("year", "approved")
@@ -0,0 +1,31 @@
+from django.contrib import messages
+from django.utils.translation import gettext_lazy as _
+
+from base.options import admin
+
+from ...contributions.admin import ArticleContributionInline
+from .models import Article
+
+
+@admin.register(Article)
+class ArticleAdmin(admin.ModelAdmin):
+    """Admin options and functionalities for the Article model."""
+
+    inlines = (ArticleContributionInline,)
+
+    list_display = ("title", "journal", "year", "points")
+    list_filter = ("year",)
+    search_fields = ("title", "journal", "issn", "eissn")
+    actions = ("update_points_of_selected",)
+
+    @admin.action(description=_("Przelicz punkty wybranych artykułów"))
+    def update_points_of_selected(self, request, queryset):
+        """Re-assign the points of the selected articles from the journal list."""
+        updated = queryset.update_points()
+
+        self.message_user(
+            request,
+            message=_("Zaktualizowano punkty %d z %d wybranych artykułów.")
+            % (updated, queryset.count()),
+            level=messages.SUCCESS,
+        )
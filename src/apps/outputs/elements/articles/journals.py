@@ -0,0 +1,261 @@
+"""In-memory index of the ministerial journal list used to score the articles.
+
+The list is compiled from a local file into a compact binary index (one file per
+list year), which is then memory-mapped read-only. Since the mapping is backed by
+the page cache, all the worker processes share a single copy of the data.
+
+Index file layout (little-endian, offsets relative to the file start):
+
+    header        magic, year, records count, keys count, strings size
+    keys          sorted 64-bit hashes of the normalized ISSNs and titles
+    key_records   record index for each key
+    points        points of each record
+    offsets       offsets of the record strings in the strings blob
+    strings       UTF-8 encoded "title<US>discipline;discipline;..." strings
+"""
+
+import bisect
+import csv
+import hashlib
+import mmap
+import os
+import re
+import struct
+import unicodedata
+from collections import namedtuple
+
+from django.conf import settings
+
+INDEX_MAGIC = b"JRNLIDX1"
+INDEX_FILE_NAME = "journals-{year}.idx"
+INDEX_FILE_PATTERN = re.compile(r"^journals-(\d{4})\.idx$")
+
+HEADER = struct.Struct("<8sIIII8x")
+
+# Aliases of the column names accepted in the journal list files
+CSV_COLUMNS = {
+    "title": "title",
+    "tytuł": "title",
+    "issn": "issn",
+    "eissn": "eissn",
+    "e-issn": "eissn",
+    "points": "points",
+    "punkty": "points",
+    "punktacja": "points",
+    "disciplines": "disciplines",
+    "dyscypliny": "disciplines",
+}
+
+RECORD_SEP = "\x1f"
+DISCIPLINES_SEP = ";"
+
+# Letters not decomposed by the Unicode normalization
+FOLDED_LETTERS = str.maketrans({"ł": "l", "đ": "d", "ø": "o", "æ": "ae", "œ": "oe"})
+
+Journal = namedtuple("Journal", ["title", "points", "disciplines"])
+
+
+def normalize_issn(value):
+    """Return ISSN reduced to its 8 significant characters (or empty string)."""
+    value = re.sub(r"[^0-9X]", "", (value or "").upper())
+    return value if len(value) == 8 else ""
+
+
+def normalize_title(value):
+    """Return the title case- and diacritic-folded, with punctuation collapsed."""
+    value = unicodedata.normalize("NFKD", (value or "").casefold())
+    value = value.translate(FOLDED_LETTERS)
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[\W_]+", " ", value.replace("&", " and ")).split())
+
+
+def hash_key(kind, value):
+    """Return a 64-bit hash of the normalized key."""
+    digest = hashlib.blake2b(f"{kind}:{value}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def record_keys(title="", issn="", eissn=""):
+    """Generate the hashes of all the keys the journal can be looked up by."""
+    for value in (normalize_issn(issn), normalize_issn(eissn)):
+        if value:
+            yield hash_key("issn", value)
+    if value := normalize_title(title):
+        yield hash_key("title", value)
+
+
+def read_csv(path):
+    """Generate the journal list rows read from a CSV file."""
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        dialect = csv.Sniffer().sniff(file.read(4096), delimiters=",;\t")
+        file.seek(0)
+        reader = csv.reader(file, dialect)
+        columns = [CSV_COLUMNS.get(name.strip().lower()) for name in next(reader)]
+        for row in reader:
+            yield {
+                column: value.strip()
+                for column, value in zip(columns, row)
+                if column is not None
+            }
+
+
+def build_index(rows, year, path):
+    """Compile the journal list rows into an index file; return the records count.
+
+    The file is written aside and then atomically moved into place, so that the
+    processes which have the previous version mapped keep reading it unaffected.
+    """
+    points, strings, offsets, keys = [], bytearray(), [0], {}
+
+    for row in rows:
+        record = len(points)
+        points.append(int(float(row.get("points") or 0)))
+        disciplines = DISCIPLINES_SEP.join(
+            d.strip() for d in re.split(r"[;|\n]", row.get("disciplines", "")) if d
+        )
+        strings += f"{row.get('title', '')}{RECORD_SEP}{disciplines}".encode()
+        offsets.append(len(strings))
+
+        for key in record_keys(row.get("title"), row.get("issn"), row.get("eissn")):
+            # The keys shared by different journals are ambiguous; drop them
+            keys[key] = record if keys.get(key, record) == record else None
+
+    keys = sorted((key, record) for key, record in keys.items() if record is not None)
+
+    tmp_path = f"{path}.tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(tmp_path, "wb") as file:
+        file.write(HEADER.pack(INDEX_MAGIC, year, len(points), len(keys), len(strings)))
+        file.write(struct.pack(f"<{len(keys)}Q", *(key for key, _ in keys)))
+        file.write(struct.pack(f"<{len(keys)}I", *(record for _, record in keys)))
+        file.write(struct.pack(f"<{len(points)}H", *points))
+        file.write(b"\0" * (len(points) % 2 * 2))  # align the offsets to 4 bytes
+        file.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        file.write(strings)
+    os.replace(tmp_path, path)
+
+    return len(points)
+
+
+class JournalIndex:
+    """A class to represent the memory-mapped journal list of a given year."""
+
+    def __init__(self, path):
+        """Map the index file into memory."""
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        magic, self.year, n_records, n_keys, n_strings = HEADER.unpack_from(view)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a journal index file.")
+
+        def take(size, fmt=None):
+            """Return the next `size` bytes of the file as a (typed) view."""
+            nonlocal offset
+            chunk, offset = view[offset:][:size], offset + size
+            return chunk.cast(fmt) if fmt else chunk
+
+        offset = HEADER.size
+        self._keys = take(8 * n_keys, "Q")
+        self._records = take(4 * n_keys, "I")
+        self._points = take(2 * n_records, "H")
+        take(n_records % 2 * 2)
+        self._offsets = take(4 * (n_records + 1), "I")
+        self._strings = take(n_strings)
+
+    def __len__(self):
+        """Return the number of journals in the list."""
+        return len(self._points)
+
+    def record(self, key):
+        """Return the index of the record stored under the key hash, if any."""
+        position = bisect.bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            return self._records[position]
+        return None
+
+    def journal(self, record):
+        """Return the journal data stored in the record."""
+        start, end = self._offsets[record], self._offsets[record + 1]
+        data = bytes(self._strings[start:end])
+        title, disciplines = data.decode().split(RECORD_SEP)
+        return Journal(
+            title,
+            self._points[record],
+            tuple(disciplines.split(DISCIPLINES_SEP)) if disciplines else (),
+        )
+
+    def lookup(self, title="", issn="", eissn=""):
+        """Find the journal by its ISSN, eISSN or title (in this order)."""
+        for key in record_keys(title, issn, eissn):
+            if (record := self.record(key)) is not None:
+                return self.journal(record)
+        return None
+
+    def points(self, title="", issn="", eissn=""):
+        """Return the points of the journal, if found in the list."""
+        for key in record_keys(title, issn, eissn):
+            if (record := self.record(key)) is not None:
+                return self._points[record]
+        return None
+
+
+# The indexes mapped by the current process, keyed by the list year. The cache is
+# validated against the index directory modification time, so that the lists
+# built by another process are picked up without restarting the workers.
+_indexes = {}
+_indexes_mtime = None
+
+
+def index_path(year):
+    """Return the path of the index file of the given list year."""
+    return os.path.join(settings.JOURNAL_INDEX_DIR, INDEX_FILE_NAME.format(year=year))
+
+
+def get_indexes():
+    """Return a dict of all the journal list indexes available, keyed by year."""
+    global _indexes, _indexes_mtime
+
+    try:
+        mtime = os.stat(settings.JOURNAL_INDEX_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    if mtime != _indexes_mtime:
+        _indexes = {
+            int(match.group(1)): JournalIndex(entry.path)
+            for entry in os.scandir(settings.JOURNAL_INDEX_DIR)
+            if (match := INDEX_FILE_PATTERN.match(entry.name))
+        }
+        _indexes_mtime = mtime
+
+    return _indexes
+
+
+def get_index(year):
+    """Return the index of the journal list in force in the given year."""
+    indexes = get_indexes()
+    if years := [list_year for list_year in indexes if list_year <= year]:
+        return indexes[max(years)]
+    return None
+
+
+def assign_points(articles):
+    """Assign points to the articles (without saving); return the changed ones."""
+    indexes, changed = {}, []
+
+    for article in articles:
+        if article.year not in indexes:
+            indexes[article.year] = get_index(article.year) if article.year else None
+
+        points = (
+            index.points(article.journal, article.issn, article.eissn)
+            if (index := indexes[article.year])
+            else None
+        )
+        if article.points != points:
+            article.points = points
+            changed.append(article)
+
+    return changed
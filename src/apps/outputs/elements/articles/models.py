@@ -0,0 +1,56 @@
+from django.utils.translation import gettext_lazy as _
+
+from apps.extras import counters
+from base.options import models
+
+from ...contributions import engine
+from . import journals
+
+
+class ArticleQuerySet(models.QuerySet):
+    """A class to represent querysets of Article objects."""
+
+    def update_points(self, batch_size=1000):
+        """Re-assign the points of the articles in bulk; return the number updated."""
+        articles = list(self.only("pk", "journal", "issn", "eissn", "year", "points"))
+        changed = journals.assign_points(articles)
+        self.model.objects.bulk_update(changed, ["points"], batch_size=batch_size)
+
+        # The bulk update sends no signals; update the contributions explicitly
+        engine.schedule_outputs(self.model, [article.pk for article in changed])
+        counters.bump(self.model)
+        return len(changed)
+
+
+@models.approval_required
+class Article(models.Model):
+    """A class to represent Article objects."""
+
+    title = models.CharField(_("tytuł"), max_length=1024)
+    journal = models.CharField(_("czasopismo"), max_length=512)
+    issn = models.CharField(_("ISSN"), max_length=9, blank=True)
+    eissn = models.CharField(_("eISSN"), max_length=9, blank=True)
+    year = models.PositiveSmallIntegerField(_("rok"))
+    authors_count = models.PositiveSmallIntegerField(_("liczba autorów"), default=1)
+    points = models.PositiveSmallIntegerField(
+        _("punkty"),
+        blank=True,
+        null=True,
+        editable=False,
+        help_text=_("Punkty przypisane na podstawie wykazu czasopism."),
+    )
+
+    objects = ArticleQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = _("artykuł")
+        verbose_name_plural = _("artykuły")
+
+    def __str__(self):
+        """Define how to print the object."""
+        return self.title
+
+    def clean(self):
+        """Perform model-wide validation and updates."""
+        # Score the article with the journal list in force in its year
+        journals.assign_points([self])
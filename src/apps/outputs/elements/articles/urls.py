@@ -1,3 +1,10 @@
+from django.urls import path
+
+from . import views
+
 app_name = "articles"
 
-urlpatterns = []
+urlpatterns = [
+    path("api/", views.ArticleApiView.as_view(), name="article_list"),
+    path("api/<int:pk>/", views.ArticleApiView.as_view(), name="article_detail"),
+]
@@ -0,0 +1,20 @@
+from ...contributions.views import OutputApiView
+from .models import Article
+
+
+class ArticleApiView(OutputApiView):
+    """JSON API of the Article objects."""
+
+    model = Article
+    fields = (
+        "id",
+        "title",
+        "journal",
+        "issn",
+        "eissn",
+        "year",
+        "authors_count",
+        "points",
+        "approved",
+        "contributions",
+    )
@@ -0,0 +1,15 @@
+from base.options import admin
+
+from ...contributions.admin import PatentContributionInline
+from .models import Patent
+
+
+@admin.register(Patent)
+class PatentAdmin(admin.ModelAdmin):
+    """Admin options and functionalities for the Patent model."""
+
+    inlines = (PatentContributionInline,)
+
+    list_display = ("number", "title", "year", "points")
+    list_filter = ("year",)
+    search_fields = ("number", "title", "applicants", "inventors")
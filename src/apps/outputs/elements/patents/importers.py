@@ -0,0 +1,224 @@
+"""Streaming import of the patents from the patent-office XML bulk files.
+
+The files are parsed incrementally, and every patent document is discarded right
+after it has been read, so the memory used does not depend on the file size.
+The patents are upserted in batches, after each of which a checkpoint is saved
+to resume the import from should it be interrupted.
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+
+from apps.employees import names
+from apps.extras import counters, notifications
+from apps.extras.models import Notification
+from base.options import transaction
+
+from ...contributions import aggregates, engine, network
+from ...contributions.models import PatentContribution
+from .models import Patent
+
+# Root elements of the patent documents in the supported bulk file formats
+RECORD_TAGS = ("ep-patent-document", "us-patent-grant", "patent-document")
+
+PATENT_FIELDS = ["title", "applicants", "inventors", "year", "authors_count"]
+
+NAMES_SEP = "; "
+
+
+def _local_name(tag):
+    """Return the tag name stripped of its namespace."""
+    return tag.rpartition("}")[2]
+
+
+def _find(element, *path):
+    """Return the first descendant element found under the path of local names."""
+    for child in element.iter():
+        if _local_name(child.tag) == path[0]:
+            if len(path) == 1:
+                return child
+            if (found := _find(child, *path[1:])) is not None:
+                return found
+    return None
+
+
+def _text(element, *path):
+    """Return the stripped text of the element found under the path, if any."""
+    found = _find(element, *path) if path else element
+    return " ".join("".join(found.itertext()).split()) if found is not None else ""
+
+
+def _party_name(party):
+    """Return the name of the applicant or inventor."""
+    if name := _text(party, "orgname"):
+        return name
+    if last_name := _text(party, "last-name"):
+        return f"{last_name} {_text(party, 'first-name')}".strip()
+    return _text(party, "name")
+
+
+def parse_record(element):
+    """Return the patent data read from the patent document element."""
+    if (reference := _find(element, "publication-reference")) is None:
+        reference = element
+    number = "".join(
+        _text(reference, tag) for tag in ("country", "doc-number", "kind")
+    ) or element.get("id", "")
+    date = _text(reference, "date") or element.get("date-publ", "")
+
+    return {
+        "number": number,
+        "title": _text(element, "invention-title"),
+        "applicants": [
+            _party_name(party)
+            for party in element.iter()
+            if _local_name(party.tag) == "applicant"
+        ],
+        "inventors": [
+            _party_name(party)
+            for party in element.iter()
+            if _local_name(party.tag) == "inventor"
+        ],
+        # The applicants who are persons, not organizations, to match employees
+        "individual_applicants": [
+            _party_name(party)
+            for party in element.iter()
+            if _local_name(party.tag) == "applicant" and not _text(party, "orgname")
+        ],
+        "year": int(date[:4]) if date[:4].isdigit() else None,
+    }
+
+
+def parse(path, record_tags=RECORD_TAGS):
+    """Generate the patent data parsed incrementally from the XML file."""
+    context = ET.iterparse(path, events=("start", "end"))
+    _, root = next(context)
+
+    for event, element in context:
+        if event == "end" and _local_name(element.tag) in record_tags:
+            yield parse_record(element)
+
+            # Free the memory taken by the document and the references to it
+            element.clear()
+            root.clear()
+
+
+def upsert(records, index):
+    """Create or update the patents and their contributions; return the counts."""
+    records = {
+        record["number"]: record
+        for record in records
+        if record["number"] and record["year"]
+    }
+
+    with transaction.atomic():
+        existing = Patent.objects.in_bulk(records, field_name="number")
+        created, updated, moved = [], [], {}
+
+        for number, record in records.items():
+            values = {
+                "title": record["title"][:1024],
+                "applicants": NAMES_SEP.join(record["applicants"]),
+                "inventors": NAMES_SEP.join(record["inventors"]),
+                "year": record["year"],
+                "authors_count": max(len(record["inventors"]), 1),
+            }
+            if (patent := existing.get(number)) is None:
+                created.append(Patent(number=number, **values))
+            elif any(getattr(patent, k) != v for k, v in values.items()):
+                if patent.year != values["year"]:
+                    moved[patent.pk] = patent.year
+                for field, value in values.items():
+                    setattr(patent, field, value)
+                updated.append(patent)
+
+        # The bulk update sends no signals; refresh the aggregates and networks
+        # of the years the patents are moved out of and into explicitly
+        moved_contributions = PatentContribution.objects.filter(output__in=moved)
+        keys = set(moved_contributions.values_list("department", "output__year"))
+        Patent.objects.bulk_create(created)
+        Patent.objects.bulk_update(updated, PATENT_FIELDS)
+        if moved:
+            keys |= set(moved_contributions.values_list("department", "output__year"))
+            aggregates.schedule(keys)
+            years = {*moved.values(), *(p.year for p in updated if p.pk in moved)}
+            transaction.on_commit(lambda: network.invalidate(years))
+
+        # Link the inventors and the individual applicants matched with the
+        # employees to the patents
+        matched = {number: set() for number in records}
+        for parties in ("inventors", "individual_applicants"):
+            matches = index.match(
+                names.Record(record[parties], record["year"])
+                for record in records.values()
+            )
+            for number, found in zip(records, matches):
+                matched[number] |= {match.employee for match in found if match}
+        patents = dict(
+            Patent.objects.filter(number__in=records).values_list("number", "pk")
+        )
+        linked = set(
+            PatentContribution.objects.filter(output__in=patents.values()).values_list(
+                "output", "employee"
+            )
+        )
+        contributions = [
+            PatentContribution(output_id=patents[number], employee_id=employee)
+            for number, employees in matched.items()
+            for employee in employees - {None}
+            if (patents[number], employee) not in linked
+        ]
+        PatentContribution.objects.bulk_create(contributions)
+
+        # The bulk operations send no signals; update the contributions explicitly
+        engine.schedule_outputs(Patent, patents.values())
+        counters.bump(Patent, PatentContribution)
+        notifications.schedule(
+            Patent, Notification.PENDING, [patent.pk for patent in created]
+        )
+        # The PKs are read back, as not every database returns them from the bulk
+        # insert (e.g. MySQL)
+        added = {(c.output_id, c.employee_id) for c in contributions}
+        network.schedule(
+            PatentContribution,
+            [
+                (output, ("saved", pk))
+                for pk, output, employee in PatentContribution.objects.filter(
+                    output__in={output for output, _employee in added}
+                ).values_list("pk", "output", "employee")
+                if (output, employee) in added
+            ],
+        )
+
+    return len(created), len(updated), len(contributions)
+
+
+class Checkpoint:
+    """A class to represent the progress of importing the file."""
+
+    def __init__(self, path):
+        """Overwrite the base constructor."""
+        stat = os.stat(path)
+        self.path = f"{path}.checkpoint"
+        self.signature = [stat.st_size, stat.st_mtime_ns]
+
+    def load(self):
+        """Return the number of records already imported from the file."""
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return 0
+        return data["records"] if data.get("signature") == self.signature else 0
+
+    def save(self, records):
+        """Save the number of records imported from the file."""
+        with open(f"{self.path}.tmp", "w") as file:
+            json.dump({"signature": self.signature, "records": records}, file)
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def clear(self):
+        """Remove the checkpoint after the file has been imported."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
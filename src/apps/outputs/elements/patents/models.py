@@ -0,0 +1,24 @@
+from django.utils.translation import gettext_lazy as _
+
+from base.options import models
+
+
+@models.approval_required
+class Patent(models.Model):
+    """A class to represent Patent objects."""
+
+    number = models.CharField(_("numer publikacji"), max_length=32, unique=True)
+    title = models.CharField(_("tytuł"), max_length=1024)
+    applicants = models.TextField(_("zgłaszający"), blank=True)
+    inventors = models.TextField(_("twórcy"), blank=True)
+    year = models.PositiveSmallIntegerField(_("rok"))
+    authors_count = models.PositiveSmallIntegerField(_("liczba twórców"), default=1)
+    points = models.PositiveSmallIntegerField(_("punkty"), blank=True, null=True)
+
+    class Meta:
+        verbose_name = _("patent")
+        verbose_name_plural = _("patenty")
+
+    def __str__(self):
+        """Define how to print the object."""
+        return f"{self.number}: {self.title}"
@@ -1,3 +1,10 @@
+from django.urls import path
+
+from . import views
+
 app_name = "patents"
 
-urlpatterns = []
+urlpatterns = [
+    path("api/", views.PatentApiView.as_view(), name="patent_list"),
+    path("api/<int:pk>/", views.PatentApiView.as_view(), name="patent_detail"),
+]
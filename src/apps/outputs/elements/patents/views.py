@@ -0,0 +1,20 @@
+from ...contributions.views import OutputApiView
+from .models import Patent
+
+
+class PatentApiView(OutputApiView):
+    """JSON API of the Patent objects."""
+
+    model = Patent
+    fields = (
+        "id",
+        "number",
+        "title",
+        "applicants",
+        "inventors",
+        "year",
+        "authors_count",
+        "points",
+        "approved",
+        "contributions",
+    )
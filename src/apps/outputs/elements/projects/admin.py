@@ -0,0 +1,20 @@
+from base.options import admin
+
+from ...contributions.admin import ProjectContributionInline
+from .models import Budget, Project
+
+
+@admin.register(Project)
+class ProjectAdmin(admin.ModelAdmin):
+    """Admin options and functionalities for the Project model."""
+
+    class BudgetInline(admin.TabularInline):
+        model = Budget
+        autocomplete_fields = ("department",)
+        extra = 1
+
+    inlines = (BudgetInline, ProjectContributionInline)
+
+    list_display = ("number", "title", "start_date", "end_date", "points")
+    list_filter = ("year",)
+    search_fields = ("number", "title")
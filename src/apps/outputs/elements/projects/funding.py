@@ -0,0 +1,209 @@
+"""Monthly time series of the projects' funding allocated to the units.
+
+Each yearly budget of a project is spread evenly over the months of that year
+in which the project is active and allocated to the department implementing
+it. The series are computed with NumPy for many projects at once and stored per
+project and department (`FundingSeries`); the series of the units are the sums
+of the series of their departments, cached until any of these changes (or the
+units are moved), for at most `CACHE_TIMEOUT` seconds.
+
+The months are represented by their indexes, see `models.month_index`.
+"""
+
+from django.core.cache import cache
+
+from apps.units.models import Department
+from base.options import transaction
+from base.utils import chunked
+
+import numpy as np
+
+from .models import Budget, FundingSeries, Project, month_index
+
+CACHE_KEY = "projects:funding:{level}:{unit_id}"
+CACHE_TIMEOUT = 24 * 60 * 60
+
+# Lookups from the series to the units of each level
+LEVELS = {
+    "department": "department",
+    "faculty": "department__ancestor",
+    "university": "department__ancestor__ancestor",
+}
+
+
+def compute(project_ids):
+    """Return the funding series of the projects, keyed by (project, department)."""
+    rows = list(
+        Budget.objects.filter(project__in=project_ids, department__isnull=False)
+        .order_by()
+        .values_list(
+            "project",
+            "department",
+            "year",
+            "amount",
+            "project__start_date",
+            "project__end_date",
+        )
+    )
+    if not rows:
+        return {}
+
+    projects, departments, years, amounts, starts, ends = zip(*rows)
+    years = np.array(years, dtype=np.int64)
+    amounts = np.array(amounts, dtype=np.float64)
+    starts = np.array([month_index(date) for date in starts], dtype=np.int64)
+    ends = np.array([month_index(date) for date in ends], dtype=np.int64)
+
+    # Months of the budget year in which the project is active; if none, the budget
+    # is spread over the whole year
+    first = np.maximum(starts, years * 12)
+    last = np.minimum(ends, years * 12 + 11)
+    outside = first > last
+    first[outside], last[outside] = years[outside] * 12, years[outside] * 12 + 11
+
+    # Sum the monthly amounts of each (project, department) using difference arrays
+    projects = np.array(projects, dtype=np.int64)
+    departments = np.array(departments, dtype=np.int64)
+    keys, groups = np.unique(
+        projects * (departments.max() + 1) + departments, return_inverse=True
+    )
+    origin = first.min()
+    monthly = amounts / (last - first + 1)
+    series = np.zeros((len(keys), last.max() - origin + 2))
+    np.add.at(series, (groups, first - origin), monthly)
+    np.add.at(series, (groups, last - origin + 1), -monthly)
+    series = np.cumsum(series, axis=1)[:, :-1]
+
+    # Trim the series to the months funded
+    starts = np.full(len(keys), series.shape[1])
+    stops = np.zeros(len(keys), dtype=np.int64)
+    np.minimum.at(starts, groups, first - origin)
+    np.maximum.at(stops, groups, last - origin + 1)
+
+    result = {}
+    for i, row in enumerate(np.unique(groups, return_index=True)[1].tolist()):
+        start, stop = starts[i], stops[i]
+        result[(int(projects[row]), int(departments[row]))] = (
+            int(origin + start),
+            series[i, start:stop],
+        )
+    return result
+
+
+def recompute(project_ids, batch_size=1000):
+    """Recompute and store the funding series of the projects."""
+    with transaction.atomic():
+        affected = set(
+            FundingSeries.objects.filter(project__in=project_ids).values_list(
+                "department", flat=True
+            )
+        )
+        FundingSeries.objects.filter(project__in=project_ids).delete()
+
+        series = compute(project_ids)
+        FundingSeries.objects.bulk_create(
+            [
+                FundingSeries(
+                    project_id=project,
+                    department_id=department,
+                    first_month=first_month,
+                    values=values.tobytes(),
+                )
+                for (project, department), (first_month, values) in series.items()
+            ],
+            batch_size=batch_size,
+        )
+        affected.update(department for _, department in series)
+
+    invalidate(affected)
+
+
+def rebuild(batch_size=1000):
+    """Recompute the funding series of all the projects."""
+    for batch in chunked(
+        Project.objects.order_by("pk").values_list("pk", flat=True).iterator(),
+        batch_size,
+    ):
+        recompute(batch, batch_size)
+
+
+def cache_keys(departments):
+    """Return the cache keys of the series of the departments and their ancestors."""
+    keys = set()
+    for department, faculty, university in Department.objects.filter(
+        pk__in=departments
+    ).values_list("pk", "ancestor", "ancestor__ancestor"):
+        keys.update(
+            {
+                CACHE_KEY.format(level="department", unit_id=department),
+                CACHE_KEY.format(level="faculty", unit_id=faculty),
+                CACHE_KEY.format(level="university", unit_id=university),
+            }
+        )
+    return keys
+
+
+def invalidate(departments):
+    """Drop the cached series of the departments and their ancestors."""
+    cache.delete_many(cache_keys(departments))
+
+
+def unit_series(level, unit_id):
+    """Return the first month and the monthly funding series of the unit."""
+    key = CACHE_KEY.format(level=level, unit_id=unit_id)
+    if (result := cache.get(key)) is not None:
+        return result
+
+    rows = list(
+        FundingSeries.objects.filter(**{LEVELS[level]: unit_id}).values_list(
+            "first_month", "values"
+        )
+    )
+    if rows:
+        arrays = [
+            (first_month, np.frombuffer(values, dtype=np.float64))
+            for first_month, values in rows
+        ]
+        origin = min(first_month for first_month, _ in arrays)
+        end = max(first_month + len(values) for first_month, values in arrays)
+        result = (origin, np.zeros(end - origin))
+        for first_month, values in arrays:
+            start, stop = first_month - origin, first_month - origin + len(values)
+            result[1][start:stop] += values
+    else:
+        result = (None, np.zeros(0))
+
+    cache.set(key, result, CACHE_TIMEOUT)
+    return result
+
+
+def months(first_month, count):
+    """Return the (year, month) pairs of the series' months."""
+    return [
+        (index // 12, index % 12 + 1)
+        for index in range(first_month, first_month + count)
+    ]
+
+
+def _update_pending(pending):
+    """Recompute the series of the projects changed within the transaction."""
+    if pending[None]:
+        recompute(pending[None])
+    cache.delete_many(pending["keys"])
+
+
+_pending = transaction.CommitBuffer(_update_pending)
+
+
+def schedule(project_ids):
+    """Recompute the series of the projects after the transaction commits."""
+    _pending.add(None, project_ids)
+
+
+def schedule_invalidation(keys):
+    """Drop the cached series of the keys after the transaction commits.
+
+    The keys are to be determined before the series (or the units) change, e.g.
+    of the series deleted along with their project.
+    """
+    _pending.add("keys", keys)
@@ -0,0 +1,93 @@
+from django.utils.translation import gettext_lazy as _
+
+from apps.units.models import Department
+from base.options import models
+
+
+def month_index(date):
+    """Return the number of months elapsed since the year 0 until the date."""
+    return date.year * 12 + date.month - 1
+
+
+@models.approval_required
+class Project(models.Model):
+    """A class to represent Project objects."""
+
+    number = models.CharField(_("numer umowy"), max_length=64, blank=True)
+    title = models.CharField(_("tytuł"), max_length=1024)
+    start_date = models.DateField(_("data rozpoczęcia"))
+    end_date = models.DateField(_("data zakończenia"))
+    year = models.PositiveSmallIntegerField(_("rok"), editable=False)
+    authors_count = models.PositiveSmallIntegerField(_("liczba wykonawców"), default=1)
+    points = models.PositiveSmallIntegerField(_("punkty"), blank=True, null=True)
+
+    class Meta:
+        verbose_name = _("projekt")
+        verbose_name_plural = _("projekty")
+
+    def __str__(self):
+        """Define how to print the object."""
+        return self.title
+
+    def save(self, *args, **kwargs):
+        """Overwrite the base class method."""
+        self.year = self.start_date.year
+        super().save(*args, **kwargs)
+
+
+class Budget(models.Model):
+    """A class to represent Budget objects, i.e. the project's yearly funds."""
+
+    project = models.ForeignKey(
+        to=Project,
+        on_delete=models.CASCADE,
+        verbose_name=Project._meta.verbose_name,
+        related_name="budgets",
+    )
+    year = models.PositiveSmallIntegerField(_("rok"))
+    department = models.ForeignKey(
+        to=Department,
+        on_delete=models.SET_NULL,
+        verbose_name=Department._meta.verbose_name,
+        related_name="budgets",
+        blank=True,
+        null=True,
+        help_text=_("Jednostka realizująca; pusta dla środków partnera."),
+    )
+    partner = models.CharField(_("partner"), max_length=255, blank=True)
+    amount = models.DecimalField(_("kwota"), max_digits=14, decimal_places=2)
+
+    class Meta:
+        verbose_name = _("budżet")
+        verbose_name_plural = _("budżety")
+
+    def __str__(self):
+        """Define how to print the object."""
+        return f"{self.project}: {self.year}"
+
+
+class FundingSeries(models.Model):
+    """A class to represent the monthly funding of the project in the department.
+
+    The objects are precomputed by the `funding` module.
+    """
+
+    project = models.ForeignKey(
+        to=Project,
+        on_delete=models.CASCADE,
+        verbose_name=Project._meta.verbose_name,
+        related_name="funding_series",
+    )
+    department = models.ForeignKey(
+        to=Department,
+        on_delete=models.CASCADE,
+        verbose_name=Department._meta.verbose_name,
+        related_name="funding_series",
+    )
+    first_month = models.PositiveIntegerField(_("pierwszy miesiąc"))
+    values = models.BinaryField(_("wartości"))
+
+    class Meta:
+        verbose_name = _("finansowanie miesięczne")
+        verbose_name_plural = _("finansowanie miesięczne")
+        unique_together = ("project", "department")
@@ -0,0 +1,57 @@
+from django.db.models import signals
+from django.dispatch import receiver
+
+from apps.units.models import Department, Faculty
+
+from . import funding
+from .models import Budget, FundingSeries, Project
+
+# Fields of the projects the funding series depend on
+FUNDING_FIELDS = ("start_date", "end_date")
+
+
+@receiver(signals.post_save, sender=Project)
+def update_project_funding(sender, instance, **kwargs):
+    """Recompute the funding series of the project if its dates have changed."""
+    if instance.has_changed(*FUNDING_FIELDS):
+        funding.schedule([instance.pk])
+
+
+@receiver(signals.pre_delete, sender=Project)
+def invalidate_deleted_project_funding(sender, instance, **kwargs):
+    """Drop the cached series of the units the deleted project was funding."""
+    funding.schedule_invalidation(
+        funding.cache_keys(
+            FundingSeries.objects.filter(project=instance).values("department")
+        )
+    )
+
+
+@receiver(signals.post_save, sender=Budget)
+@receiver(signals.post_delete, sender=Budget)
+def update_budget_funding(sender, instance, **kwargs):
+    """Recompute the funding series of the project the budget belongs to."""
+    funding.schedule([instance.project_id])
+
+
+def unit_funding_keys(model, unit_id):
+    """Return the cache keys of the series of the unit's departments and ancestors."""
+    if model is Department:
+        return funding.cache_keys([unit_id])
+    return funding.cache_keys(Department.objects.filter(ancestor=unit_id).values("pk"))
+
+
+@receiver(signals.pre_save, sender=Department)
+@receiver(signals.pre_save, sender=Faculty)
+def store_unit_funding_keys(sender, instance, **kwargs):
+    """Remember the cached series of the unit's ancestors before it is moved."""
+    if not instance._state.adding and instance.has_changed("ancestor"):
+        instance._funding_keys = unit_funding_keys(sender, instance.pk)
+
+
+@receiver(signals.post_save, sender=Department)
+@receiver(signals.post_save, sender=Faculty)
+def invalidate_moved_unit_funding(sender, instance, **kwargs):
+    """Drop the cached series of the previous and the new ancestors of the unit."""
+    if (keys := instance.__dict__.pop("_funding_keys", None)) is not None:
+        funding.schedule_invalidation(keys | unit_funding_keys(sender, instance.pk))
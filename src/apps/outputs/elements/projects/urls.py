@@ -1,3 +1,10 @@
+from django.urls import path
+
+from . import views
+
 app_name = "projects"
 
-urlpatterns = []
+urlpatterns = [
+    path("api/", views.ProjectApiView.as_view(), name="project_list"),
+    path("api/<int:pk>/", views.ProjectApiView.as_view(), name="project_detail"),
+]
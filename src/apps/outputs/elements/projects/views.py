@@ -0,0 +1,25 @@
+from ...contributions.views import OutputApiView
+from .models import Project
+
+
+class ProjectApiView(OutputApiView):
+    """JSON API of the Project objects, along with their budgets."""
+
+    model = Project
+    fields = (
+        "id",
+        "number",
+        "title",
+        "start_date",
+        "end_date",
+        "year",
+        "authors_count",
+        "points",
+        "approved",
+        "contributions",
+        "budgets",
+    )
+    related = {
+        **OutputApiView.related,
+        "budgets": ("budgets", ("year", "department", "partner", "amount")),
+    }
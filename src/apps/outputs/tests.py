@@ -0,0 +1,101 @@
+import datetime
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from apps.employees.models import Employee, Employment
+from apps.units.models import Department, Faculty, University
+from base.options import transaction
+
+from .contributions import aggregates, network
+from .models import Aggregate, Article, ArticleContribution
+
+
+class AggregatesTestCase(TransactionTestCase):
+    """Test the aggregates maintained on commit against the rebuilt ones."""
+
+    def setUp(self):
+        """Create the units, employees and an approved article."""
+        university = University.objects.create(name="U", abbr="U")
+        faculty = Faculty.objects.create(name="F", abbr="F", ancestor=university)
+        self.departments = [
+            Department.objects.create(name=abbr, abbr=abbr, ancestor=faculty)
+            for abbr in ["D1", "D2"]
+        ]
+        self.employees = [
+            Employee.objects.create(first_name=name, last_name=name)
+            for name in ["A", "B", "C"]
+        ]
+        self.article = Article.objects.create(
+            title="T", journal="J", year=2021, points=100, authors_count=3
+        )
+        with transaction.atomic():
+            self.article.approve()
+
+    def assertAggregatesRebuilt(self):
+        """Assert that the aggregates equal those rebuilt from scratch."""
+        fields = ["level", "unit_id", "year", "output_type"]
+        fields += ["contributions", "shares", "points"]
+        maintained = set(Aggregate.objects.values_list(*fields))
+
+        Aggregate.objects.all().delete()
+        aggregates.rebuild()
+        self.assertEqual(maintained, set(Aggregate.objects.values_list(*fields)))
+
+    def create_contribution(self, employee, department):
+        """Create the contribution of the employee to the article."""
+        return ArticleContribution.objects.create(
+            output=self.article,
+            employee=self.employees[employee],
+            department=self.departments[department],
+            discipline="f",
+        )
+
+    def test_contributions_created_and_deleted(self):
+        """Test the contributions created and deleted separately."""
+        self.create_contribution(0, 0)
+        contribution = self.create_contribution(1, 1)
+        contribution.delete()
+
+        self.assertAggregatesRebuilt()
+
+    def test_contributions_created_and_deleted_in_transaction(self):
+        """Test the contributions created and deleted in a single transaction."""
+        contribution = self.create_contribution(1, 1)
+        with transaction.atomic():
+            self.create_contribution(0, 0)
+            self.create_contribution(2, 1)
+            contribution.delete()
+
+        self.assertAggregatesRebuilt()
+
+    def test_department_deleted(self):
+        """Test the department deleted detached from its contributions."""
+        self.create_contribution(0, 0)
+        self.create_contribution(1, 1)
+        self.departments[1].delete()
+
+        self.assertAggregatesRebuilt()
+
+    def test_affiliations_assigned(self):
+        """Test the contributions credited to the departments by the command."""
+        cache.clear()
+        for employee, department in zip(self.employees, self.departments):
+            Employment.objects.create(
+                employee=employee,
+                department=department,
+                start_date=datetime.date(2020, 1, 1),
+            )
+            ArticleContribution.objects.create(
+                output=self.article, employee=employee, discipline="f"
+            )
+        self.assertEqual(network.get_graph("department", 2021).links(), [])
+
+        call_command("assign_affiliations", stdout=io.StringIO())
+
+        built = network.load([2021])[("department", 2021)]
+        self.assertEqual(len(built), 1)
+        self.assertEqual(network.get_graph("department", 2021).links(), built.links())
+        self.assertAggregatesRebuilt()
@@ -1,8 +1,18 @@
+import csv
+import io
+
+from django.contrib import messages
+from django.contrib.auth import get_permission_codename
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse, HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
 from django.utils.translation import gettext_lazy as _
 
 from base.options import admin
 from base.options.decorators import as_html
 
+from . import orgchart
 from .models import Department, Faculty, University
 
 
@@ -41,6 +51,92 @@ class UniversityAdmin(admin.ModelAdmin):
             )
         )
 
+    def get_urls(self):
+        """Override the base class method."""
+        return [
+            path(
+                "orgchart/",
+                view=self.admin_site.admin_view(self.orgchart_view),
+                name="units_university_orgchart",
+            ),
+            path(
+                "orgchart/export/",
+                view=self.admin_site.admin_view(self.orgchart_export_view),
+                name="units_university_orgchart_export",
+            ),
+        ] + super().get_urls()
+
+    def orgchart_view(self, request):
+        """A view to preview and import the org chart uploaded as a CSV file."""
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+
+        content, chart, changes, errors = "", None, None, []
+        if request.method == "POST":
+            delete = "delete" in request.POST
+            if delete and not self.has_orgchart_delete_permission(request):
+                raise PermissionDenied
+
+            try:
+                if file := request.FILES.get("file"):
+                    content = file.read().decode("utf-8-sig")
+                else:
+                    content = request.POST.get("content", "")
+                chart = orgchart.Import(orgchart.read_csv(io.StringIO(content)))
+            except (UnicodeError, csv.Error) as error:
+                errors = [_("Nie można odczytać pliku CSV: %s") % error]
+            else:
+                errors = chart.errors
+
+            if "apply" in request.POST and not errors:
+                created, updated, deleted = chart.apply(delete)
+                self.message_user(
+                    request,
+                    message=_(
+                        "Zaimportowano strukturę: dodano %d, zmieniono %d, "
+                        "usunięto %d jednostek."
+                    )
+                    % (len(created), len(updated), len(deleted) if delete else 0),
+                    level=messages.SUCCESS,
+                )
+                return HttpResponseRedirect(
+                    reverse("admin:units_university_changelist")
+                )
+            if not errors:
+                changes = dict(zip(("created", "updated", "deleted"), chart.changes()))
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": _("Import struktury organizacyjnej"),
+            "content": content,
+            "errors": errors,
+            "changes": changes,
+            "delete": "delete" in request.POST,
+            "can_delete": self.has_orgchart_delete_permission(request),
+        }
+        return TemplateResponse(
+            request, "admin/units/university/orgchart.html", context
+        )
+
+    def has_orgchart_delete_permission(self, request):
+        """Check if the user may delete the units of all the levels."""
+        return request.user.has_perms(
+            "%s.%s"
+            % (model._meta.app_label, get_permission_codename("delete", model._meta))
+            for model in orgchart.LEVELS.values()
+        )
+
+    def orgchart_export_view(self, request):
+        """A view to download the current org chart as a CSV file."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        response = HttpResponse(content_type="text/csv; charset=utf-8")
+        response.headers["Content-Disposition"] = 'attachment; filename="orgchart.csv"'
+        orgchart.write_csv(response)
+        return response
+
 
 @admin.register(Faculty)
 class FacultyAdmin(admin.ModelAdmin):
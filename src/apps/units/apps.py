@@ -8,3 +8,7 @@ class UnitsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.units"
     verbose_name = _("Jednostki")
+
+    def ready(self):
+        """Run this code when the Django starts."""
+        from . import signals  # NOQA
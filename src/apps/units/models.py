@@ -26,6 +26,10 @@ class Unit(models.Model):
         """Return the unit's full abbreviation including all the ancestors."""
         return sep.join(unit.abbr for unit in self.ancestors(include_self=True))
 
+    def get_departments(self):
+        """Return a queryset of the departments within the unit."""
+        raise NotImplementedError
+
     def ancestors(self, include_self=False):
         """Generate ancestors."""
         unit = self if include_self else self.ancestor
@@ -42,6 +46,10 @@ class University(Unit):
         verbose_name = _("uczelnia")
         verbose_name_plural = _("uczelnie")
 
+    def get_departments(self):
+        """Return a queryset of the departments within the unit."""
+        return Department.objects.filter(ancestor__ancestor=self)
+
 
 class Faculty(Unit):
     """A class to represent Faculty objects."""
@@ -62,6 +70,10 @@ class Faculty(Unit):
         """Return the object's ancestor, the university."""
         return self.ancestor
 
+    def get_departments(self):
+        """Return a queryset of the departments within the unit."""
+        return self.departments.all()
+
 
 class Department(Unit):
     """A class to represent Department objects."""
@@ -86,3 +98,7 @@ class Department(Unit):
     def university(self):
         """Return the object's ancestor, the university."""
         return self.faculty.ancestor
+
+    def get_departments(self):
+        """Return a queryset of the departments within the unit."""
+        return Department.objects.filter(pk=self.pk)
@@ -0,0 +1,321 @@
+"""Bulk import of the organizational chart of the universities.
+
+The chart lists all the units, one per row, each identified by its full path of
+abbreviations, e.g. "U/F/D" for a department of the faculty "F" of the
+university "U", and optionally by its ID, which lets the unit be renamed or
+moved under another parent. The units with no ID are matched by their current
+paths, and created if none matches.
+
+The chart is compared with the units in the database as a whole, and the
+differences are applied in a single transaction: the units created and updated
+(renamed or moved) are written in bulk, level by level, so the number of the
+queries does not depend on the size of the chart. The aggregates, networks and
+cached funding series of the units affected are refreshed once committed, as
+they are for the units deleted elsewhere (e.g. in the admin).
+"""
+
+import csv
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.utils.translation import gettext as _
+
+from apps.extras import counters
+from base.options import deletion, transaction
+from base.utils import csv_reader
+
+from .models import Department, Faculty, University
+
+# Accepted names of the CSV columns (lower-cased)
+CSV_COLUMNS = {
+    "id": "id",
+    "identyfikator": "id",
+    "path": "path",
+    "ścieżka": "path",
+    "jednostka": "path",
+    "name": "name",
+    "nazwa": "name",
+}
+
+# Levels of the units, top down, with the depths of their paths
+LEVELS = {"university": University, "faculty": Faculty, "department": Department}
+
+Change = namedtuple("Change", ["level", "pk", "path", "name", "previous"])
+
+
+def read_csv(file):
+    """Generate the unit records read from the org-chart CSV file (text)."""
+    reader = csv_reader(file)
+    columns = [CSV_COLUMNS.get(name.strip().lower()) for name in next(reader, [])]
+    for row in reader:
+        record = {
+            column: " ".join(value.split())
+            for column, value in zip(columns, row)
+            if column is not None
+        }
+        if record.get("path"):
+            yield record
+
+
+def write_csv(file):
+    """Write the current org chart to the CSV file (text)."""
+    writer = csv.writer(file)
+    writer.writerow(["id", "path", "name"])
+    units = current_units()
+    for level in LEVELS:
+        for pk, (path, name, _ancestor) in sorted(
+            units[level].items(), key=lambda item: item[1][0]
+        ):
+            writer.writerow([pk, path, name])
+
+
+def current_units():
+    """Return the (path, name, ancestor) of the units keyed by level and PK."""
+    units = {
+        "university": {
+            pk: (abbr, name, None)
+            for pk, abbr, name in University.objects.values_list("pk", "abbr", "name")
+        },
+        "faculty": {
+            pk: (f"{university_abbr}/{abbr}", name, university)
+            for pk, abbr, name, university, university_abbr in (
+                Faculty.objects.values_list(
+                    "pk", "abbr", "name", "ancestor", "ancestor__abbr"
+                )
+            )
+        },
+    }
+    units["department"] = {
+        pk: (f"{units['faculty'][faculty][0]}/{abbr}", name, faculty)
+        for pk, abbr, name, faculty in Department.objects.values_list(
+            "pk", "abbr", "name", "ancestor"
+        )
+    }
+    return units
+
+
+class Import:
+    """A class to represent the comparison of the org chart with the database."""
+
+    def __init__(self, records):
+        """Compare the records of the chart with the units in the database."""
+        self.units = current_units()
+        self.errors = []
+        self.matched = {level: {} for level in LEVELS}  # path: (PK, name)
+
+        paths = {level: {} for level in LEVELS}
+        for level, units in self.units.items():
+            for pk, (path, *_unit) in units.items():
+                paths[level][path.casefold()] = pk
+
+        for record in sorted(records, key=lambda record: record["path"].count("/")):
+            path = "/".join(part.strip() for part in record["path"].split("/"))
+            depth = path.count("/")
+            if depth >= len(LEVELS) or "" in path.split("/"):
+                self.errors.append(_("Nieprawidłowa ścieżka jednostki: %s.") % path)
+                continue
+            level = list(LEVELS)[depth]
+
+            if parent := path.rpartition("/")[0]:
+                if parent not in self.matched[list(LEVELS)[depth - 1]]:
+                    self.errors.append(
+                        _("Brak jednostki nadrzędnej jednostki %s.") % path
+                    )
+                    continue
+            if path in self.matched[level]:
+                self.errors.append(_("Powtórzona jednostka: %s.") % path)
+                continue
+
+            if record.get("id"):
+                pk = int(record["id"]) if record["id"].isdigit() else None
+                if pk not in self.units[level]:
+                    self.errors.append(
+                        _("Nieznany identyfikator jednostki %s: %s.")
+                        % (path, record["id"])
+                    )
+                    continue
+            else:
+                pk = paths[level].get(path.casefold())
+
+            if pk is not None and pk in {
+                other for other, _name in self.matched[level].values()
+            }:
+                self.errors.append(_("Jednostka %s podana wielokrotnie.") % path)
+                continue
+
+            name = record.get("name") or (
+                self.units[level][pk][1] if pk is not None else path.rpartition("/")[2]
+            )
+            self.matched[level][path] = (pk, name)
+
+    def changes(self):
+        """Return the lists of the units created, updated and missing (deleted)."""
+        created, updated, deleted = [], [], []
+        for level, matched in self.matched.items():
+            for path, (pk, name) in matched.items():
+                if pk is None:
+                    created.append(Change(level, None, path, name, None))
+                elif (previous := self.units[level][pk])[:2] != (path, name):
+                    updated.append(Change(level, pk, path, name, previous[0]))
+            seen = {pk for pk, _name in matched.values()}
+            deleted += [
+                Change(level, pk, path, name, path)
+                for pk, (path, name, _ancestor) in self.units[level].items()
+                if pk not in seen
+            ]
+        return created, updated, deleted
+
+    def apply(self, delete=False, batch_size=1000):
+        """Write the changes to the database; return them.
+
+        The units missing from the chart are deleted only if `delete` is set.
+        """
+        if self.errors:
+            raise ValueError(self.errors)
+
+        created, updated, deleted = self.changes()
+        if not delete:
+            deleted = []
+
+        pks = {}
+        with transaction.atomic():
+            for level, model in LEVELS.items():
+                objects = {}
+                for path, (pk, name) in self.matched[level].items():
+                    obj = model(pk=pk, name=name, abbr=path.rpartition("/")[2])
+                    if level != "university":
+                        obj.ancestor_id = pks[path.rpartition("/")[0]]
+                    objects[path] = obj
+
+                new = [obj for obj in objects.values() if obj.pk is None]
+                model.objects.bulk_create(new, batch_size=batch_size)
+                self._read_pks(level, new)
+                model.objects.bulk_update(
+                    [
+                        objects[change.path]
+                        for change in updated
+                        if change.level == level
+                    ],
+                    ["name", "abbr"] + (["ancestor"] if level != "university" else []),
+                    batch_size=batch_size,
+                )
+                pks.update({path: obj.pk for path, obj in objects.items()})
+
+            # The units are deleted bottom up, along with the objects depending
+            for level, model in reversed(LEVELS.items()):
+                if level_pks := [c.pk for c in deleted if c.level == level]:
+                    deletion.Deletion(model.objects.filter(pk__in=level_pks)).delete()
+
+            # The bulk operations send no signals; refresh the dependent data
+            if updated or deleted:
+                for level, unit_ids in self._affected(pks, updated, deleted).items():
+                    schedule(level, unit_ids)
+            if created or updated or deleted:
+                counters.bump(*LEVELS.values())
+
+        return created, updated, deleted
+
+    def _read_pks(self, level, objects):
+        """Set the PKs of the units created, read back by their ancestors and abbrs.
+
+        Not every database returns the PKs from the bulk insert (e.g. MySQL).
+        """
+        if not objects:
+            return
+        fields = ["pk", "abbr"] + (["ancestor"] if level != "university" else [])
+        created = {
+            (abbr, *ancestor): pk
+            for pk, abbr, *ancestor in LEVELS[level]
+            .objects.filter(abbr__in={obj.abbr for obj in objects})
+            .values_list(*fields)
+            if pk not in self.units[level]
+        }
+        for obj in objects:
+            key = (obj.abbr,) + ((obj.ancestor_id,) if level != "university" else ())
+            obj.pk = created[key]
+
+    def _affected(self, pks, updated, deleted):
+        """Return the PKs of the units moved or deleted and of their ancestors."""
+        ancestors = {
+            level: {
+                pks[path]: pks[path.rpartition("/")[0]]
+                for path in self.matched[level]
+                if "/" in path
+            }
+            for level in ("faculty", "department")
+        }
+        affected = {level: set() for level in LEVELS}
+        affected["university"] = {
+            change.pk for change in deleted if change.level == "university"
+        }
+        for change in updated + deleted:
+            if change.level == "university":
+                continue
+
+            # Both the previous and the new ancestors (none if deleted)
+            parents = {self.units[change.level][change.pk][2]}
+            parents.add(ancestors[change.level].get(change.pk))
+            if len(parents) == 1:
+                continue  # only renamed
+            if change.level == "department":
+                affected["department"].add(change.pk)
+                affected["faculty"] |= parents
+                parents = {
+                    self.units["faculty"].get(faculty, (None,) * 3)[2]
+                    for faculty in parents
+                } | {ancestors["faculty"].get(faculty) for faculty in parents}
+            else:
+                affected["faculty"].add(change.pk)
+            affected["university"] |= parents
+        return {level: pks - {None} for level, pks in affected.items()}
+
+
+def deleted_units(queryset):
+    """Return the PKs of the queryset's units, their descendants and ancestors."""
+    depth = list(LEVELS.values()).index(queryset.model)
+    affected = {}
+    for i, (level, model) in enumerate(LEVELS.items()):
+        if i < depth:
+            path = "__".join(["ancestor"] * (depth - i))
+            units = model.objects.filter(pk__in=queryset.values(path))
+        else:
+            path = "__".join(["ancestor"] * (i - depth)) or "pk"
+            units = model.objects.filter(**{f"{path}__in": queryset})
+        affected[level] = set(units.values_list("pk", flat=True))
+    return affected
+
+
+def refresh(affected):
+    """Refresh the aggregates, networks and funding series of the units."""
+    from apps.outputs.contributions import aggregates, engine, network
+    from apps.outputs.elements.projects import funding
+
+    with transaction.atomic():
+        for level, unit_ids in affected.items():
+            aggregates.refresh(level, unit_ids)
+
+    cache.delete_many(
+        [
+            funding.CACHE_KEY.format(level=level, unit_id=unit_id)
+            for level, unit_ids in affected.items()
+            for unit_id in unit_ids
+        ]
+    )
+    network.invalidate(
+        {
+            year
+            for model in engine.contribution_models()
+            for year in model.objects.values_list("output__year", flat=True)
+            .order_by()
+            .distinct()
+        }
+    )
+
+
+_pending = transaction.CommitBuffer(refresh)
+
+
+def schedule(level, unit_ids):
+    """Refresh the data depending on the units of the level on commit."""
+    if unit_ids:
+        _pending.add(level, unit_ids)
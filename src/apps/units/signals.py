@@ -0,0 +1,21 @@
+from django.db.models import signals
+
+from base.options.decorators import bulk_receiver
+
+from . import orgchart
+
+
+@bulk_receiver
+def refresh_deleted_units(sender, instance, origin=None, **kwargs):
+    """Refresh the data of the units deleted and of their ancestors on commit."""
+    if instance is not None:
+        queryset = sender._base_manager.filter(pk=instance.pk)
+    else:
+        queryset = origin  # the units deleted in bulk, along with their descendants
+    for level, unit_ids in orgchart.deleted_units(queryset).items():
+        orgchart.schedule(level, unit_ids)
+
+
+# The deleted units' contributions and budgets are detached in bulk
+for model in orgchart.LEVELS.values():
+    signals.pre_delete.connect(refresh_deleted_units, sender=model)
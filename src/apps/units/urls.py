@@ -1,3 +1,38 @@
+from django.urls import path
+
+from . import views
+
 app_name = "units"
 
-urlpatterns = []
+urlpatterns = [
+    path(
+        "api/universities/",
+        views.UniversityApiView.as_view(),
+        name="university_list",
+    ),
+    path(
+        "api/universities/<int:pk>/",
+        views.UniversityApiView.as_view(),
+        name="university_detail",
+    ),
+    path(
+        "api/faculties/",
+        views.FacultyApiView.as_view(),
+        name="faculty_list",
+    ),
+    path(
+        "api/faculties/<int:pk>/",
+        views.FacultyApiView.as_view(),
+        name="faculty_detail",
+    ),
+    path(
+        "api/departments/",
+        views.DepartmentApiView.as_view(),
+        name="department_list",
+    ),
+    path(
+        "api/departments/<int:pk>/",
+        views.DepartmentApiView.as_view(),
+        name="department_detail",
+    ),
+]
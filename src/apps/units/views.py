@@ -0,0 +1,28 @@
+from base.options.views import ApiView
+
+from .models import Department, Faculty, University
+
+
+class UniversityApiView(ApiView):
+    """JSON API of the University objects."""
+
+    model = University
+    fields = ("id", "name", "abbr")
+
+
+class FacultyApiView(ApiView):
+    """JSON API of the Faculty objects."""
+
+    model = Faculty
+    fields = ("id", "name", "abbr", "university")
+    lookups = {"university": "ancestor"}
+    filters = ("university",)
+
+
+class DepartmentApiView(ApiView):
+    """JSON API of the Department objects."""
+
+    model = Department
+    fields = ("id", "name", "abbr", "faculty")
+    lookups = {"faculty": "ancestor"}
+    filters = ("faculty",)
@@ -1,11 +1,167 @@
+import functools
+import hashlib
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
 from django.contrib import admin, messages
 from django.contrib.admin import *  # NOQA
+from django.contrib.admin.utils import lookup_spawns_duplicates, prepare_lookup_value
+from django.contrib.admin.views import main
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet
 from django.http import HttpResponseRedirect
-from django.urls import path
+from django.urls import path, reverse
 from django.utils.html import format_html
 from django.utils.text import capfirst
 from django.utils.translation import gettext_lazy as _
 
+from . import deletion, transaction
+
+FACETS_CACHE_KEY = "admin:facets:{model}:{state}"
+
+
+class SimpleListFilter(admin.SimpleListFilter):
+    """Project-wide template to replace the built-in Django's SimpleListFilter.
+
+    The filters define the Q objects of their lookups, which both filter the
+    changelist and count the objects of each lookup (see `ChangeList`).
+    """
+
+    def get_lookup_q(self, value):
+        """Return the Q object of the lookup value, None if not filtering."""
+        raise NotImplementedError
+
+    def queryset(self, request, queryset):
+        """Update the changelist queryset based on the filter lookup selected."""
+        if (lookup := self.get_lookup_q(self.value())) is not None:
+            return queryset.filter(lookup)
+
+
+class ChangeList(main.ChangeList):
+    """A class to represent the changelists showing the counts of the filters.
+
+    The numbers of the objects of each filter option (taking into account the
+    search and the other filters selected) are counted with a single query of
+    conditional aggregates, and cached briefly per model, filter state and the
+    query of the objects (which depends on the user too).
+    """
+
+    def get_filters(self, request):
+        """Override the base class method."""
+        filters = super().get_filters(request)
+
+        # Remember the lookups not processed by the filters, to count with them
+        self.remaining_lookup_params = filters[2]
+        return filters
+
+    def get_results(self, request):
+        """Override the base class method."""
+        super().get_results(request)
+        if self.model_admin.show_facet_counts and self.has_filters:
+            self.add_facet_counts(request)
+
+    @staticmethod
+    def filter_lookup_q(spec, params):
+        """Return the Q object of the filter's parameters, None if unsupported."""
+        params = {
+            key: value
+            for key, value in params.items()
+            if key in spec.expected_parameters()
+        }
+        if isinstance(spec, admin.FieldListFilter):
+            # Only the filters applying their parameters as they are
+            if type(spec).queryset is not admin.FieldListFilter.queryset:
+                return None
+            return Q(
+                **{
+                    key: prepare_lookup_value(key, value)
+                    for key, value in params.items()
+                }
+            )
+        try:
+            lookup = spec.get_lookup_q(params.get(spec.parameter_name))
+        except (AttributeError, NotImplementedError):
+            return None
+        return Q() if lookup is None else lookup
+
+    def add_facet_counts(self, request):
+        """Set the choices of the filters, along with their counts."""
+        queryset = self.root_queryset
+        selected, options = {}, {}
+
+        for i, spec in enumerate(self.filter_specs):
+            if (lookup := self.filter_lookup_q(spec, self.params)) is None:
+                # The filters not supported are applied, but not counted
+                if (filtered := spec.queryset(request, queryset)) is not None:
+                    queryset = filtered
+                continue
+            selected[i] = lookup
+            options[i] = [
+                (
+                    choice,
+                    self.filter_lookup_q(
+                        spec, dict(parse_qsl(choice["query_string"][1:]))
+                    ),
+                )
+                for choice in spec.choices(self)
+            ]
+
+        queryset = queryset.filter(**self.remaining_lookup_params)
+        queryset, duplicates = self.model_admin.get_search_results(
+            request, queryset, self.query
+        )
+        if duplicates:
+            queryset = self.root_queryset.filter(
+                Exists(queryset.filter(pk=OuterRef("pk")))
+            )
+
+        counts = self.get_facets(queryset, selected, options)
+        for i, choices in options.items():
+            self.filter_specs[i].facet_choices = [
+                {**choice, "count": counts[f"facet_{i}_{j}"]}
+                for j, (choice, _lookup) in enumerate(choices)
+            ]
+
+    def get_facets(self, queryset, selected, options):
+        """Return the counts of the filter options, from the cache if possible."""
+        params = sorted(
+            (key, value)
+            for key, value in self.params.items()
+            if key not in {main.ALL_VAR, main.ORDER_VAR, main.PAGE_VAR}
+        )
+        # The objects counted depend on the user too (see `get_queryset`)
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            sql = ""  # no objects to count, whoever the user
+        key = FACETS_CACHE_KEY.format(
+            model=self.model._meta.label_lower,
+            state=hashlib.md5(repr((params, sql)).encode()).hexdigest(),
+        )
+        if (counts := cache.get(key)) is not None:
+            return counts
+
+        aggregates = {}
+        for i, choices in options.items():
+            # Each filter is counted along with the other filters selected
+            others = Q(*(lookup for j, lookup in selected.items() if j != i))
+            for j, (choice, lookup) in enumerate(choices):
+                aggregates[f"facet_{i}_{j}"] = Count(
+                    "pk",
+                    filter=others & lookup,
+                    distinct=any(
+                        lookup_spawns_duplicates(self.opts, child[0])
+                        for child in (others & lookup).flatten()
+                        if isinstance(child, tuple)
+                    ),
+                )
+
+        counts = queryset.order_by().aggregate(**aggregates)
+        cache.set(key, counts, settings.ADMIN_FACETS_CACHE_TIMEOUT)
+        return counts
+
 
 class ModelAdmin(admin.ModelAdmin):
     """Project-wide template to replace the built-in Django's base ModelAdmin."""
@@ -15,6 +171,10 @@ class ModelAdmin(admin.ModelAdmin):
     object_class_prefix = _("obiekt typu")
 
     show_objects_count = True
+    show_facet_counts = True
+
+    # Number of the objects listed on the delete confirmation page
+    deleted_objects_limit = 100
 
     # Overwrite the base ModelAdmin options
     ordering = ()
@@ -63,12 +223,36 @@ class ModelAdmin(admin.ModelAdmin):
 
         actions = super().get_actions(request)
 
-        # Update description of the default `delete_selected` action
-        actions["delete_selected"] = (
-            *actions["delete_selected"][:2],
-            _("Usuń wybrane obiekty"),
-        )
-        return actions
+        # Update description of the default `delete_selected` action (if allowed)
+        if "delete_selected" in actions:
+            actions["delete_selected"] = (
+                *actions["delete_selected"][:2],
+                _("Usuń wybrane obiekty"),
+            )
+
+        # Queue the actions on many objects as background jobs
+        return {
+            name: (self.queued_action(func, name, description), name, description)
+            for name, (func, name, description) in actions.items()
+        }
+
+    @staticmethod
+    def queued_action(func, name, description):
+        """Wrap the action to queue it as a job if run on too many objects."""
+
+        @functools.wraps(func)
+        def action(model_admin, request, queryset):
+            from apps.extras import jobs
+
+            if jobs.should_enqueue(func, name, request, queryset):
+                return jobs.enqueue(model_admin, name, description, request, queryset)
+            return func(model_admin, request, queryset)
+
+        return action
+
+    def get_changelist(self, request, **kwargs):
+        """Override the base class method."""
+        return ChangeList
 
     def get_list_filter(self, request):
         """Override the base class method."""
@@ -106,12 +290,17 @@ class ModelAdmin(admin.ModelAdmin):
 
         def view(request, object_id):
             """A view to be returned."""
+            from apps.extras import audit
+
             obj = self.get_object(request, object_id)
 
-            if approve:
-                obj.approve()
-            else:
-                obj.disapprove()
+            with transaction.atomic():
+                if obj.approved != approve:
+                    audit.log(request.user, [obj], audit.approval_action(approve))
+                if approve:
+                    obj.approve()
+                else:
+                    obj.disapprove()
 
             self.message_user(
                 request,
@@ -128,6 +317,89 @@ class ModelAdmin(admin.ModelAdmin):
 
         return view
 
+    def log_addition(self, request, obj, message):
+        """Override the base class method."""
+        from apps.extras import audit
+
+        audit.log(request.user, [obj], audit.AuditEntry.ADDITION, message)
+        return super().log_addition(request, obj, message)
+
+    def log_change(self, request, obj, message):
+        """Override the base class method."""
+        from apps.extras import audit
+
+        audit.log(request.user, [obj], audit.AuditEntry.CHANGE, message)
+        return super().log_change(request, obj, message)
+
+    def log_deletion(self, request, obj, object_repr):
+        """Override the base class method."""
+        from apps.extras import audit
+
+        audit.log(request.user, [obj], audit.AuditEntry.DELETION)
+        return super().log_deletion(request, obj, object_repr)
+
+    def get_deletion(self, objs):
+        """Return the set-based deletion of the objects, None if not supported."""
+        if not isinstance(objs, QuerySet):
+            objs = self.model._base_manager.filter(pk__in=[obj.pk for obj in objs])
+        if (plan := deletion.Deletion(objs)).is_set_based:
+            return plan
+
+    def get_deleted_objects(self, objs, request):
+        """Override the base class method.
+
+        The objects depending on the ones deleted are summarized by their
+        counts, instead of being loaded and listed one by one.
+        """
+        if (plan := self.get_deletion(objs)) is None:
+            return super().get_deleted_objects(objs, request)
+
+        counts = plan.counts()
+        total = counts.pop(self.model, 0)
+        deleted_objects = [
+            format_html(
+                "{}: {}",
+                capfirst(self.model._meta.verbose_name),
+                format_html(obj.get_admin_change_link()),
+            )
+            for obj in plan.queryset[: self.deleted_objects_limit]
+        ]
+        if total > self.deleted_objects_limit:
+            deleted_objects.append(
+                _("… i %d innych") % (total - self.deleted_objects_limit)
+            )
+
+        perms_needed = {
+            model._meta.verbose_name
+            for model in counts
+            if model in self.admin_site._registry
+            and not self.admin_site._registry[model].has_delete_permission(request)
+        }
+
+        protected = [
+            "%s: %d" % (capfirst(model._meta.verbose_name_plural), count)
+            for model, count in plan.protected_counts().items()
+        ]
+        model_count = {
+            model._meta.verbose_name_plural: count
+            for model, count in {self.model: total, **counts}.items()
+        }
+        return deleted_objects, model_count, perms_needed, protected
+
+    def delete_model(self, request, obj):
+        """Override the base class method."""
+        if plan := self.get_deletion([obj]):
+            plan.delete()
+        else:
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        """Override the base class method."""
+        if plan := self.get_deletion(queryset):
+            plan.delete()
+        else:
+            super().delete_queryset(request, queryset)
+
     def changeform_view(self, request, object_id, form_url, extra_context=None):
         """Override the base class method."""
         extra_context = extra_context or {}
@@ -156,10 +428,32 @@ class ModelAdmin(admin.ModelAdmin):
                 )
                 if object_id
                 else None,
+                "audit_url": self.get_audit_url(request, object_id)
+                if object_id
+                else None,
             }
         )
         return super().changeform_view(request, object_id, form_url, extra_context)
 
+    def get_job_result_url(self, job):
+        """Return the URL of the result of the job's action, None if there is none."""
+        return None
+
+    def get_audit_url(self, request, object_id):
+        """Return the URL of the object's audit log entries, None if not allowed."""
+        if request.user.has_perm("extras.view_auditentry"):
+            return "%s?%s" % (
+                reverse("admin:extras_auditentry_changelist"),
+                urlencode(
+                    {
+                        "content_type__id__exact": ContentType.objects.get_for_model(
+                            self.model
+                        ).pk,
+                        "object_id": object_id,
+                    }
+                ),
+            )
+
     def changelist_view(self, request, extra_context=None):
         """Override the base class method."""
         extra_context = extra_context or {}
@@ -176,11 +470,26 @@ class ModelAdmin(admin.ModelAdmin):
     @admin.action(description=_("Zatwierdź wybrane obiekty"))
     def approve_selected(self, request, queryset):
         """Approve the selected objects."""
-        for obj in queryset.filter(**{self.model.APPROVAL_STATUS_FIELD_NAME: False}):
-            obj.approve()
+        from apps.extras import audit
+
+        # Approve all at once, so that the changes are propagated once on commit
+        with transaction.atomic():
+            objs = list(
+                queryset.filter(**{self.model.APPROVAL_STATUS_FIELD_NAME: False})
+            )
+            for obj in objs:
+                obj.approve()
+            audit.log(request.user, objs, audit.approval_action(True))
 
     @admin.action(description=_("Oznacz wybrane obiekty jako niezatwierdzone"))
     def disapprove_selected(self, request, queryset):
         """Disapprove the selected objects."""
-        for obj in queryset.filter(**{self.model.APPROVAL_STATUS_FIELD_NAME: True}):
-            obj.disapprove()
+        from apps.extras import audit
+
+        with transaction.atomic():
+            objs = list(
+                queryset.filter(**{self.model.APPROVAL_STATUS_FIELD_NAME: True})
+            )
+            for obj in objs:
+                obj.disapprove()
+            audit.log(request.user, objs, audit.approval_action(False))
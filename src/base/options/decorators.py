@@ -12,3 +12,25 @@ def as_html(func):
         return format_html(value)
 
     return wrapper
+
+
+def run_in_request(func):
+    """Mark the admin action to be run within the request, never as a job."""
+    func.run_in_request = True
+    return func
+
+
+def run_as_job(func):
+    """Mark the admin action to be run as a job, however few the objects."""
+    func.run_as_job = True
+    return func
+
+
+def bulk_receiver(func):
+    """Mark the signal receiver as independent of the instance.
+
+    The set-based deletion sends the delete signals of such receivers once per
+    model instead of once per object, with no instance (see `deletion`).
+    """
+    func.bulk_receiver = True
+    return func
@@ -0,0 +1,202 @@
+"""Set-based deletion of the objects along with the objects depending on them.
+
+Django's collector loads all the objects deleted into memory, including the
+dependent ones, to send their signals and to delete them by their PKs. Here, the
+same relations are followed with the subqueries of the objects deleted instead,
+so that the objects are counted with a query per model, and deleted bottom up
+with the DELETE queries of the batches of their PKs.
+
+The models whose delete receivers depend on the objects are left to the
+collector. The receivers marked with `bulk_receiver` are sent once per model,
+and the files of the objects are removed once committed, as `django_cleanup`
+does.
+"""
+
+from collections import Counter, namedtuple
+
+from django.db import router
+from django.db.models import signals
+from django.db.models.deletion import Collector, get_candidate_relations_to_delete
+
+from . import models, transaction
+
+# Number of the objects deleted with a single query
+BATCH_SIZE = 5000
+
+# Module of the receivers removing the files of the objects deleted
+CLEANUP_MODULE = "django_cleanup.handlers"
+
+# Ways the objects of the steps are deleted
+RAW, COLLECT, COLLECTED = "raw", "collect", "collected"
+
+Step = namedtuple("Step", ["model", "queryset", "mode"])
+
+
+def delete_receivers(model):
+    """Return the receivers of the model's delete signals."""
+    return [
+        receiver
+        for signal in (signals.pre_delete, signals.post_delete)
+        for receiver in signal._live_receivers(model)
+    ]
+
+
+def requires_collector(model):
+    """Check if the objects of the model can only be deleted by the collector."""
+    return (
+        bool(model._meta.parents)
+        or any(
+            not getattr(receiver, "bulk_receiver", False)
+            and receiver.__module__ != CLEANUP_MODULE
+            for receiver in delete_receivers(model)
+        )
+        or any(
+            hasattr(field, "bulk_related_objects")
+            for field in model._meta.private_fields
+        )
+        or any(
+            related.field.remote_field.on_delete
+            not in (models.CASCADE, models.SET_NULL, models.PROTECT, models.DO_NOTHING)
+            for related in get_candidate_relations_to_delete(model._meta)
+        )
+    )
+
+
+class Deletion:
+    """A class to represent the deletion of the objects of the queryset."""
+
+    def __init__(self, queryset):
+        """Overwrite the base constructor."""
+        self.queryset = queryset
+        self.using = router.db_for_write(queryset.model)
+        self.steps = []  # bottom up
+        self.updates = []  # (field, queryset) of the fields set to null
+        self.protected = []
+        self._follow(queryset, path=(), collected=False)
+
+    def _follow(self, queryset, path, collected):
+        """Add the steps deleting the objects and the objects depending on them."""
+        model = queryset.model
+        if collected:
+            mode = COLLECTED
+        elif model in path or requires_collector(model):
+            mode = COLLECT
+        else:
+            mode = RAW
+
+        # The cycles are left to the collector
+        if model not in path:
+            for related in get_candidate_relations_to_delete(model._meta):
+                field = related.field
+                on_delete = field.remote_field.on_delete
+                if on_delete is models.DO_NOTHING:
+                    continue
+
+                dependent = related.related_model._base_manager.filter(
+                    **{f"{field.name}__in": queryset}
+                )
+                if on_delete is models.CASCADE:
+                    self._follow(dependent, (*path, model), mode != RAW)
+                elif on_delete is models.PROTECT:
+                    self.protected.append(dependent)
+                elif mode == RAW:
+                    self.updates.append((field, dependent))
+
+        self.steps.append(Step(model, queryset, mode))
+
+    @property
+    def is_set_based(self):
+        """Check if the objects of the queryset are deleted without the collector."""
+        return self.steps[-1].mode == RAW
+
+    def counts(self):
+        """Return the numbers of the objects deleted, by model."""
+        counts = Counter()
+        for step in self.steps:
+            counts[step.model] += step.queryset.count()
+        return {model: count for model, count in counts.items() if count}
+
+    def protected_counts(self):
+        """Return the numbers of the objects protecting the objects, by model."""
+        counts = Counter()
+        for queryset in self.protected:
+            counts[queryset.model] += queryset.count()
+        return {model: count for model, count in counts.items() if count}
+
+    def delete(self):
+        """Delete the objects; return the numbers of them, as `QuerySet.delete`."""
+        if self.protected_counts():
+            raise models.ProtectedError(
+                "Cannot delete the objects protected by the others.",
+                {obj for queryset in self.protected for obj in queryset[:100]},
+            )
+
+        counts = Counter()
+        with transaction.atomic(using=self.using, savepoint=False):
+            # The collector loads its objects while their ancestors still exist
+            collector = Collector(using=self.using, origin=self.queryset)
+            for step in self.steps:
+                if step.mode == COLLECT:
+                    collector.collect(step.queryset)
+            counts.update(collector.delete()[1])
+
+            for field, queryset in self.updates:
+                queryset.update(**{field.name: None})
+
+            for step in self.steps:
+                if step.mode == RAW:
+                    counts[step.model._meta.label] += self._delete(step)
+
+        return sum(counts.values()), {
+            label: count for label, count in counts.items() if count
+        }
+
+    def _delete(self, step):
+        """Delete the objects of the step in batches; return the number of them."""
+        model = step.model
+        receivers = delete_receivers(model)
+        file_fields = [
+            field
+            for field in model._meta.concrete_fields
+            if isinstance(field, models.FileField)
+            and any(receiver.__module__ == CLEANUP_MODULE for receiver in receivers)
+        ]
+
+        count, files = 0, []
+        while rows := list(
+            step.queryset.order_by().values_list(
+                "pk", *(field.attname for field in file_fields)
+            )[:BATCH_SIZE]
+        ):
+            if not count:
+                self._send(signals.pre_delete, model)
+            count += model._base_manager.filter(
+                pk__in=[pk for pk, *_names in rows]
+            )._raw_delete(self.using)
+            files += [
+                (field, name)
+                for _pk, *names in rows
+                for field, name in zip(file_fields, names)
+                if name
+            ]
+
+        if count:
+            self._send(signals.post_delete, model)
+        if files:
+            transaction.on_commit(
+                lambda: [field.storage.delete(name) for field, name in files],
+                using=self.using,
+            )
+        return count
+
+    def _send(self, signal, model):
+        """Send the signal to the model's bulk receivers, once."""
+        for receiver in signal._live_receivers(model):
+            if getattr(receiver, "bulk_receiver", False):
+                receiver(
+                    signal=signal,
+                    sender=model,
+                    instance=None,
+                    using=self.using,
+                    origin=self.queryset,
+                )
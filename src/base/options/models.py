@@ -1,7 +1,9 @@
+import copy
 import os
 
-from django.db import models
+from django.db import models, router
 from django.db.models import *  # NOQA
+from django.db.models import signals
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
@@ -14,6 +16,129 @@ class Model(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Override the base class method."""
+        instance = super().from_db(db, field_names, values)
+
+        # Remember the values loaded, to track the fields changed since then
+        instance._take_snapshot()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        """Override the base class method."""
+        super().refresh_from_db(using, fields)
+        self._take_snapshot(fields)
+
+    def save(self, *args, **kwargs):
+        """Override the base class method.
+
+        Unless the fields to update are given (or the update is forced), only the
+        fields changed since the object was loaded are saved; if none has changed,
+        nothing is written, but the `pre_save` and `post_save` signals are sent
+        all the same, with the empty `update_fields`.
+
+        The snapshot is taken before the signals are sent, while the fields saved
+        are still reported as changed to their receivers; so a receiver saving
+        the object again saves only the fields changed since.
+        """
+        changed = self._changed_since_snapshot()
+        if (
+            not args
+            and not {"force_insert", "force_update", "update_fields"} & set(kwargs)
+            and changed is not None
+            and self._meta.pk.name not in changed
+        ):
+            if not changed:
+                self._send_save_signals(kwargs.get("using"))
+                return
+
+            # The fields updated automatically are saved too
+            changed |= {
+                field.name
+                for field in self._meta.concrete_fields
+                if getattr(field, "auto_now", False)
+            }
+            kwargs["update_fields"] = changed
+
+        saving = self.__dict__.setdefault("_saving", [])
+        saving.append(changed)
+        self._take_snapshot(kwargs.get("update_fields"))
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            saving.pop()
+        self._take_snapshot(kwargs.get("update_fields"))
+
+    def _send_save_signals(self, using=None):
+        """Send the signals of saving the object with no fields updated."""
+        using = using or router.db_for_write(self.__class__, instance=self)
+        for signal, extra in (
+            (signals.pre_save, {}),
+            (signals.post_save, {"created": False}),
+        ):
+            signal.send(
+                sender=self.__class__,
+                instance=self,
+                raw=False,
+                using=using,
+                update_fields=frozenset(),
+                **extra,
+            )
+
+    def _field_value(self, field):
+        """Return the value of the field as comparable with the one loaded."""
+        value = self.__dict__[field.attname]
+        if isinstance(field, models.FileField):
+            # Compare the file names rather than the files
+            value = getattr(value, "name", value) or ""
+        return value
+
+    def _take_snapshot(self, fields=None):
+        """Remember the current values of the (given) fields loaded."""
+        snapshot = self.__dict__.setdefault("_snapshot", {})
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue  # deferred
+            if fields is None or field.name in fields or field.attname in fields:
+                value = self._field_value(field)
+                if isinstance(value, (dict, list)):
+                    value = copy.deepcopy(value)
+                snapshot[field.attname] = value
+
+    @property
+    def changed_fields(self):
+        """Return the set of the names of the fields changed since loaded.
+
+        None is returned for the objects neither loaded nor saved yet. While the
+        object is being saved, the fields saved are reported as changed too.
+        """
+        changed = self._changed_since_snapshot()
+        if saving := self.__dict__.get("_saving"):
+            return None if saving[-1] is None else saving[-1] | (changed or set())
+        return changed
+
+    def _changed_since_snapshot(self):
+        """Return the set of the names of the fields changed since the snapshot."""
+        if self._state.adding or "_snapshot" not in self.__dict__:
+            return None
+
+        snapshot = self._snapshot
+        return {
+            field.name
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+            and (
+                field.attname not in snapshot
+                or snapshot[field.attname] != self._field_value(field)
+            )
+        }
+
+    def has_changed(self, *fields):
+        """Check if any of the fields has (or might have) changed since loaded."""
+        changed = self.changed_fields
+        return changed is None or bool(changed.intersection(fields))
+
     @classmethod
     @property
     def pk_name(cls):
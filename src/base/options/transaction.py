@@ -0,0 +1,56 @@
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.transaction import *  # NOQA
+
+
+class _Hook:
+    """A commit hook passing its own buffer of items to the callback."""
+
+    def __init__(self, callback):
+        """Overwrite the base constructor."""
+        self.callback = callback
+        self.buffer = defaultdict(set)
+        self.pending = True
+
+    def __call__(self):
+        """Run the callback (unless the buffer is empty)."""
+        self.pending = False
+        if self.buffer:
+            self.callback(self.buffer)
+
+    def is_discarded(self, connection):
+        """Return whether the hook was discarded with a rolled back transaction."""
+        return not any(entry[1] is self for entry in connection.run_on_commit)
+
+
+class CommitBuffer:
+    """Collect keyed items within a transaction and process them once it commits.
+
+    The items added in the same transaction are deduplicated and passed to the
+    callback at once, as a dict of sets. Outside of a transaction (including
+    the commit hooks of another one) the callback is run immediately. The
+    buffers are kept per thread, as the connections are.
+    """
+
+    def __init__(self, callback):
+        """Overwrite the base constructor."""
+        self.callback = callback
+        self._local = threading.local()
+
+    def add(self, key, items):
+        """Add the items to the buffer under the key."""
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            self.callback(defaultdict(set, {key: set(items)}))
+            return
+
+        # Each hook flushes the buffer it was registered with, so a new buffer
+        # started while the previous hook is still to be run loses no items
+        hook = getattr(self._local, "hook", None)
+        if hook is None or not hook.pending or hook.is_discarded(connection):
+            hook = self._local.hook = _Hook(self.callback)
+            transaction.on_commit(hook)
+
+        hook.buffer[key].update(items)
@@ -0,0 +1,187 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_permission_codename
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+
+
+class ApiView(View):
+    """Project-wide template of the read-only JSON API views of the models.
+
+    The objects are listed in the order of their PKs, in pages of the objects
+    following the PK given as the cursor. The fields can be selected with the
+    `fields` parameter and the objects filtered by the `filters` fields. The
+    objects are read as dicts of values, and the related objects (see `related`)
+    with a single query per relation and page, whatever the number of objects.
+
+    The objects are served to the staff allowed to view all the models read.
+    The responses carry the ETag and Last-Modified headers of the change counters
+    of the models read, so that the conditional requests are answered with 304
+    (Not Modified) without reading any object.
+    """
+
+    model = None
+
+    # Names of the fields listed, some of which may be mapped to other lookups
+    fields = ("id",)
+    lookups = {}
+
+    # Names of the fields listing the related objects, mapped to the names of
+    # the reverse relations and of the related objects' fields
+    related = {}
+
+    # Names of the fields to filter the objects by, e.g. `?year=2020`
+    filters = ()
+
+    page_size = 100
+    max_page_size = 1000
+
+    def get(self, request, pk=None):
+        """Return the page of the objects or the object of the PK."""
+        from apps.extras import counters
+
+        if not self.has_permission(request):
+            return self.error(_("Brak uprawnień."), status=403)
+
+        etag, changed_at = counters.state(*self.get_models())
+        etag = quote_etag(etag)
+        last_modified = int(changed_at.timestamp()) if changed_at else None
+        if response := get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        ):
+            return response
+
+        try:
+            fields = self.get_fields(request)
+            queryset = self.get_queryset(request)
+            size = self.get_page_size(request)
+            cursor = int(request.GET.get("cursor", 0))
+        except (ValueError, ValidationError) as e:
+            return self.error(str(e))
+
+        if pk is not None:
+            _pks, objects = self.read(queryset.filter(pk=pk), fields)
+            if not objects:
+                return self.error(_("Nie znaleziono obiektu."), status=404)
+            response = JsonResponse(objects[0])
+        else:
+            # One more object is read to tell if there is a next page
+            pks, objects = self.read(queryset.filter(pk__gt=cursor), fields, size + 1)
+            response = JsonResponse(
+                {
+                    "results": objects[:size],
+                    "next": self.next_url(request, pks[size - 1])
+                    if len(objects) > size
+                    else None,
+                }
+            )
+
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def error(self, message, status=400):
+        """Return the response of the error."""
+        return JsonResponse({"error": str(message)}, status=status)
+
+    def has_permission(self, request):
+        """Check if the user may view the objects of all the models read."""
+        return request.user.is_staff and request.user.has_perms(
+            "%s.%s"
+            % (model._meta.app_label, get_permission_codename("view", model._meta))
+            for model in self.get_models()
+        )
+
+    def get_models(self):
+        """Return the models whose changes change the responses."""
+        return [
+            self.model,
+            *(
+                self.model._meta.get_field(relation).related_model
+                for relation, _fields in self.related.values()
+            ),
+        ]
+
+    def get_fields(self, request):
+        """Return the names of the fields selected."""
+        if "fields" not in request.GET:
+            return list(self.fields)
+
+        fields = request.GET["fields"].split(",")
+        if unknown := set(fields) - set(self.fields):
+            raise ValueError(_("Nieznane pola: %s.") % ", ".join(sorted(unknown)))
+        return [field for field in self.fields if field in fields]
+
+    def get_queryset(self, request):
+        """Return the queryset of the objects, filtered as requested."""
+        queryset = self.model._default_manager.all()
+        for name in self.filters:
+            if name in request.GET:
+                queryset = queryset.filter(
+                    **{self.lookups.get(name, name): request.GET[name]}
+                )
+        return queryset
+
+    def get_page_size(self, request):
+        """Return the number of the objects per page."""
+        size = int(request.GET.get("limit", self.page_size))
+        if not 0 < size <= self.max_page_size:
+            raise ValueError(
+                _("Liczba obiektów na stronie musi wynosić od 1 do %d.")
+                % self.max_page_size
+            )
+        return size
+
+    def read(self, queryset, fields, limit=None):
+        """Return the PKs of the objects and the objects as the dicts of the fields."""
+        values = [field for field in fields if field not in self.related]
+        objects = list(
+            queryset.order_by("pk").values(
+                "pk",
+                *(field for field in values if field not in self.lookups),
+                **{
+                    field: F(self.lookups[field])
+                    for field in values
+                    if field in self.lookups
+                },
+            )[:limit]
+        )
+
+        pks = [obj["pk"] for obj in objects]
+        related = {
+            field: self.read_related(*self.related[field], pks)
+            for field in fields
+            if field in self.related
+        }
+        return pks, [
+            {
+                field: related[field][obj["pk"]] if field in related else obj[field]
+                for field in fields
+            }
+            for obj in objects
+        ]
+
+    def read_related(self, relation, fields, pks):
+        """Return the lists of the related objects' fields, keyed by the PKs."""
+        field = self.model._meta.get_field(relation)
+        key = field.field.name
+        result = defaultdict(list)
+        for obj in (
+            field.related_model._default_manager.filter(**{f"{key}__in": pks})
+            .order_by("pk")
+            .values(key, *fields)
+        ):
+            result[obj.pop(key)].append(obj)
+        return result
+
+    def next_url(self, request, cursor):
+        """Return the URL of the page following the cursor."""
+        query = request.GET.copy()
+        query["cursor"] = cursor
+        return request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
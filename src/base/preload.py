@@ -0,0 +1,148 @@
+"""Preloading of the application before the WSGI server forks its workers.
+
+Each worker would otherwise import and initialize the lazily loaded parts of the
+project (the modules of the apps, the URL resolvers, the templates and the
+translations) on its own, with the first requests. Preloaded in the server's
+process, they are shared by the forked workers as long as the memory pages are
+not written to; so the garbage collector is disabled while loading (not to
+leave the freed gaps in the pages) and the objects loaded are then frozen,
+never to be tracked (and written to) by the collections of the workers.
+
+The memory of the workers (see `memory_usage`) shows how much of it is shared.
+"""
+
+import gc
+import importlib
+import os
+import pkgutil
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import get_resolver
+from django.utils import translation
+
+# Modules and packages not imported in advance
+SKIPPED_MODULES = ("migrations", "tests", "wsgi", "asgi")
+
+# Fields of the `smaps_rollup` files summed up by `memory_usage` (in kB)
+SMAPS_FIELDS = (
+    "Rss",
+    "Pss",
+    "Shared_Clean",
+    "Shared_Dirty",
+    "Private_Clean",
+    "Private_Dirty",
+)
+
+
+def import_modules():
+    """Import all the modules of the project; return the number of them."""
+    packages = [importlib.import_module("base")] + [
+        config.module
+        for config in apps.get_app_configs()
+        if config.name.startswith("apps.")
+    ]
+
+    count = 0
+    for package in packages:
+        for module in pkgutil.walk_packages(package.__path__, f"{package.__name__}."):
+            if not set(module.name.split(".")) & set(SKIPPED_MODULES):
+                importlib.import_module(module.name)
+                count += 1
+    return count
+
+
+def template_dirs(engine):
+    """Return the directories of the engine's templates, including the apps' ones.
+
+    The directories are those of the engine's loaders, if any, so that the apps'
+    templates are included also with the loaders set explicitly (no `APP_DIRS`).
+    """
+    dirs = list(engine.template_dirs)
+    for loader in getattr(getattr(engine, "engine", None), "template_loaders", ()):
+        if hasattr(loader, "get_dirs"):
+            dirs += loader.get_dirs()
+    return list(dict.fromkeys(os.fspath(directory) for directory in dirs))
+
+
+def load_templates():
+    """Compile all the templates into the cached loaders; return their number."""
+    count = 0
+    for engine in engines.all():
+        for directory in template_dirs(engine):
+            for root, _dirs, files in os.walk(directory):
+                for name in files:
+                    path = os.path.relpath(os.path.join(root, name), directory)
+                    try:
+                        engine.get_template(path.replace(os.sep, "/"))
+                    except (TemplateDoesNotExist, TemplateSyntaxError, UnicodeError):
+                        continue
+                    count += 1
+    return count
+
+
+def load_translations():
+    """Load the translation catalog of the project's language."""
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext("")
+
+
+def warm_up():
+    """Load the lazily loaded parts of the application in advance."""
+    import_modules()
+    get_resolver()._populate()
+    load_templates()
+    load_translations()
+
+    # The workers must not share the connections
+    connections.close_all()
+
+
+def preload():
+    """Warm up the application and freeze the objects loaded, to share them.
+
+    The garbage collector is enabled again in the forked workers.
+    """
+    gc.disable()
+    warm_up()
+    gc.freeze()
+    os.register_at_fork(after_in_child=gc.enable)
+
+
+def memory_usage(pid):
+    """Return the memory (in kB) used by the process: RSS, PSS, USS and shared.
+
+    The unique set size (USS) is the memory used by the process only, freed if
+    it exits; the rest of its resident set (RSS) is shared with the others.
+    """
+    values = dict.fromkeys(SMAPS_FIELDS, 0)
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _sep, value = line.partition(":")
+            if name in values:
+                values[name] = int(value.split()[0])
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+        "shared": values["Shared_Clean"] + values["Shared_Dirty"],
+    }
+
+
+def children(pid):
+    """Return the PIDs of the child processes of the process."""
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The parent PID follows the (parenthesized) command name
+                ppid = int(f.read().rpartition(")")[2].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            pids.append(int(entry))
+    return sorted(pids)
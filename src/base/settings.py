@@ -114,6 +114,19 @@ DATABASES = {
 DATABASES["default"] = DATABASES.get(getenv("DB_DEFAULT"))
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": getenv("CACHE_LOCATION", ""),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -140,6 +153,12 @@ AUTH_PASSWORD_VALIDATORS = [
 
 AUTH_USER_MODEL = "accounts.User"
 
+# The permissions of the users are cached across the requests (for seconds)
+# The permissions are cached only with a cache shared by the processes
+AUTHENTICATION_BACKENDS = ["apps.accounts.backends.CachedPermissionsBackend"]
+
+PERMISSIONS_CACHE_TIMEOUT = int(getenv("PERMISSIONS_CACHE_TIMEOUT", 300))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
@@ -170,6 +189,19 @@ MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "media/"
 
 
+# Data files (e.g. the compiled evaluation lists)
+
+DATA_ROOT = BASE_DIR / "data"
+
+JOURNAL_INDEX_DIR = DATA_ROOT / "journals"
+
+REPORTS_CACHE_DIR = DATA_ROOT / "reports"
+
+REPORTS_CACHE_DAYS = int(getenv("REPORTS_CACHE_DAYS", 30))
+
+SNAPSHOT_PATH = DATA_ROOT / "snapshot.sqlite3"
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
 
@@ -178,4 +210,45 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # E-mail settings
 
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+EMAIL_BACKEND = getenv(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+EMAIL_HOST = getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(getenv("EMAIL_PORT", 25))
+EMAIL_HOST_USER = getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = getenv("EMAIL_USE_TLS", "") == "1"
+EMAIL_TIMEOUT = int(getenv("EMAIL_TIMEOUT", 30))
+DEFAULT_FROM_EMAIL = getenv("DEFAULT_FROM_EMAIL", "webmaster@localhost")
+
+
+# Notifications (the events are sent to each recipient in digests, every
+# interval in seconds, by the `send_notifications` worker; the failed digests are
+# retried with the delays growing from the initial one in seconds)
+
+NOTIFICATIONS_DIGEST_INTERVAL = int(getenv("NOTIFICATIONS_DIGEST_INTERVAL", 900))
+NOTIFICATIONS_RETRIES = int(getenv("NOTIFICATIONS_RETRIES", 3))
+NOTIFICATIONS_ATTEMPTS = int(getenv("NOTIFICATIONS_ATTEMPTS", 10))
+NOTIFICATIONS_RETRY_DELAY = float(getenv("NOTIFICATIONS_RETRY_DELAY", 5))
+NOTIFICATIONS_BASE_URL = getenv("NOTIFICATIONS_BASE_URL", "")
+
+
+# Background jobs (the admin actions on more objects are queued and run by the
+# `run_jobs` workers)
+
+ADMIN_JOB_THRESHOLD = int(getenv("ADMIN_JOB_THRESHOLD", 1000))
+
+
+# Admin changelists (the counts of the filter options are cached for seconds)
+
+ADMIN_FACETS_CACHE_TIMEOUT = int(getenv("ADMIN_FACETS_CACHE_TIMEOUT", 30))
+
+
+# Audit log (the entries are buffered by each process and saved in bulk once the
+# buffer is full or its oldest entry is older than the interval in seconds; the
+# `compact_audit` command merges the old repeated entries and deletes the oldest)
+
+AUDIT_BUFFER_SIZE = int(getenv("AUDIT_BUFFER_SIZE", 500))
+AUDIT_FLUSH_INTERVAL = float(getenv("AUDIT_FLUSH_INTERVAL", 5))
+AUDIT_COMPACTION_DAYS = int(getenv("AUDIT_COMPACTION_DAYS", 90))
+AUDIT_RETENTION_DAYS = int(getenv("AUDIT_RETENTION_DAYS", 1825))
@@ -0,0 +1,23 @@
+import csv
+import itertools
+
+
+def chunked(iterable, size):
+    """Generate lists of (at most) `size` consecutive items of the iterable."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def csv_reader(file, delimiters=",;\t"):
+    """Return the reader of the CSV file (text), with its delimiter sniffed.
+
+    A comma is assumed if the delimiter cannot be sniffed, e.g. with one column.
+    """
+    sample = file.read(4096)
+    file.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=delimiters)
+    except csv.Error:
+        dialect = csv.excel
+    return csv.reader(file, dialect)
@@ -2,14 +2,29 @@
 
 It exposes the WSGI callable as a module-level variable named ``application``.
 
+With `WSGI_PRELOAD=1`, the application is fully loaded in advance, to be shared by
+the workers forked by the server (e.g. by `gunicorn --preload`), see `preload`.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/wsgi/
 """
 
+import gc
 import os
 
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "base.settings")
 
+PRELOAD = os.getenv("WSGI_PRELOAD", "") == "1"
+
+# Leave no gaps freed by the collector in the memory shared with the workers
+if PRELOAD:
+    gc.disable()
+
 application = get_wsgi_application()
+
+if PRELOAD:
+    from base import preload
+
+    preload.preload()